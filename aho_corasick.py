@@ -0,0 +1,71 @@
+"""
+Aho-Corasick multi-pattern matcher (case-insensitive).
+
+All patterns are found, overlapping ones included ("ship" inside "shipment"),
+in a single left-to-right pass over the text.
+"""
+from collections import deque
+
+
+class AhoCorasick:
+    def __init__(self, patterns):
+        # Patterns and text are both lowercased, so camelCase vocabulary such
+        # as "serviceType" matches "ServiceType", "servicetype", ...
+        self.patterns = list(dict.fromkeys(p.lower() for p in patterns if p))
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[tuple[str, ...]] = [()]
+
+        for pattern in self.patterns:
+            state = 0
+            for ch in pattern:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                    self._goto[state][ch] = nxt
+                state = nxt
+            self._out[state] = self._out[state] + (pattern,)
+
+        # Breadth-first failure links; outputs inherit their fallback's outputs.
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                if self._out[self._fail[nxt]]:
+                    self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def __bool__(self) -> bool:
+        return bool(self.patterns)
+
+    def count(self, text: str, lowered: bool = False) -> dict[str, int]:
+        """
+        Returns {pattern: occurrences} for the patterns present in text.
+        Pass lowered=True if text is already lowercase.
+        """
+        counts: dict[str, int] = {}
+        if not self.patterns:
+            return counts
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for ch in text if lowered else text.lower():
+            nxt = goto[state].get(ch)
+            while nxt is None and state:
+                state = fail[state]
+                nxt = goto[state].get(ch)
+            if nxt is None:
+                state = 0
+                continue
+            state = nxt
+            if out[state]:
+                for pattern in out[state]:
+                    counts[pattern] = counts.get(pattern, 0) + 1
+        return counts
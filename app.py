@@ -1,277 +1,71 @@
+import contextvars
 import os
-import re
-import json
+import queue
+import threading
 import streamlit as st
-from google import genai
 
-# Optional: only needed if you want PDF support
-# pip install pypdf
-try:
-    from pypdf import PdfReader
-    HAS_PDF = True
-except Exception:
-    HAS_PDF = False
-
-
-# ------------------------------------------------------------
-# 1) SOAP hints
-# ------------------------------------------------------------
-def extract_soap_hints(text: str) -> dict:
-    hints = {
-        "has_wsdl": False,
-        "has_soap_envelope": False,
-        "possible_operations": [],
-        "namespaces": [],
-    }
-
-    if not text:
-        return hints
-
-    t = text.lower()
-    hints["has_wsdl"] = "wsdl" in t or "definitions" in t
-    hints["has_soap_envelope"] = "soap:envelope" in t or "<envelope" in t
-
-    ns = re.findall(r'xmlns:([a-zA-Z0-9_]+)=["\']([^"\']+)["\']', text)
-    hints["namespaces"] = [f"{pfx}={uri}" for pfx, uri in ns][:20]
-
-    ops = re.findall(r'operation\s+name=["\']([^"\']+)["\']', text)
-    hints["possible_operations"] = list(dict.fromkeys(ops))[:20]
-
-    return hints
+from client_codegen import TARGET_STACKS, ClientCodegenError, generate_client_code
+from design_sections import OpenApiStreamExtractor, design_notes, extract_openapi_yaml
+from llm import gemini_generate, gemini_generate_stream
+from llm_backend import LLM_BACKEND, LlmBackendError, make_client
+from llm_cache import response_cache
+from openapi_compiler import WsdlCompileError, compile_openapi, render_design, to_yaml
+from openapi_validate import MAX_REPAIR_ATTEMPTS, validate_and_repair, validate_openapi
+from operation_design import design_per_operation
+from pdf_extract import HAS_PDF
+from pipeline import (
+    CODE_SYSTEM_PROMPT,
+    DESIGN_SYSTEM_PROMPT,
+    build_code_prompt,
+    build_design_prompt,
+    build_fedex_context_from_uploads,
+    build_refine_prompt,
+    extract_soap_hints,
+    parse_soap_model,
+)
+from rate_limit import limiter_stats
+from retrieval import fingerprint, prepare_query
+from token_budget import context_budget, estimate_tokens, make_token_counter
+from tracing import Trace, span
 
 
 # ------------------------------------------------------------
-# 2) Read uploaded FedEx docs/specs into text (NO SCRAPING)
+# Streamlit UI (steps 1-3 live in pipeline.py)
 # ------------------------------------------------------------
-def _read_pdf_bytes_to_text(file_bytes: bytes) -> str:
-    if not HAS_PDF:
-        return "[PDF upload received, but pypdf is not installed. Install pypdf to parse PDFs.]"
-    try:
-        reader = PdfReader(file_bytes)
-        out = []
-        for i, page in enumerate(reader.pages):
-            txt = page.extract_text() or ""
-            if txt.strip():
-                out.append(f"\n\n--- PDF PAGE {i+1} ---\n{txt}")
-        return "\n".join(out).strip()
-    except Exception as e:
-        return f"[Failed to parse PDF: {e}]"
-
-
-def read_uploaded_file_to_text(uploaded) -> str:
-    """
-    Supports:
-      - .json (OpenAPI, sample payloads, etc.)
-      - .yaml/.yml (OpenAPI)
-      - .txt/.md (notes)
-      - .pdf (optional, if pypdf installed)
-    """
-    name = uploaded.name.lower()
-    raw = uploaded.getvalue()
-
-    # PDF
-    if name.endswith(".pdf"):
-        return _read_pdf_bytes_to_text(raw)
-
-    # Text-ish
-    try:
-        text = raw.decode("utf-8", errors="ignore")
-    except Exception:
-        return f"[Could not decode {uploaded.name} as text.]"
-
-    # Pretty-print JSON for readability if it is JSON
-    if name.endswith(".json"):
-        try:
-            obj = json.loads(text)
-            return json.dumps(obj, indent=2)
-        except Exception:
-            return text
-
-    return text
+st.set_page_config(page_title="SOAP → REST Converter (Gemini)", layout="wide")
+st.title("🧼➡️🌐 SOAP → REST Converter Bot")
 
 
-def chunk_text(text: str, chunk_size: int = 900, overlap: int = 120) -> list[str]:
-    words = text.split()
-    chunks = []
-    i = 0
-    while i < len(words):
-        chunk = " ".join(words[i : i + chunk_size])
-        chunks.append(chunk)
-        i += max(1, chunk_size - overlap)
-    return chunks
+@st.cache_resource(show_spinner=False)
+def get_client(backend: str):
+    # One client per backend for the server process instead of one per rerun.
+    return make_client(backend)
 
 
-def score_chunk(chunk: str, query: str) -> float:
-    """
-    Cheap relevance scoring: keyword overlap + boosts for FedEx terms
-    """
-    q = query.lower()
-    c = chunk.lower()
-    score = 0.0
-    for term in set(re.findall(r"[a-zA-Z0-9_/-]{3,}", q)):
-        if term in c:
-            score += 1.0
-
-    boosts = [
-        "oauth", "client_credentials", "bearer", "token", "authorization",
-        "ship", "shipment", "label", "tracking", "accountnumber",
-        "meter", "serviceType", "packagingType", "requestedShipment",
-        "/ship/v1", "/shipments", "rate limit", "429"
-    ]
-    for b in boosts:
-        if b in c and b in q:
-            score += 3.0
-        elif b in c:
-            score += 0.5
-
-    return score
-
-
-def build_fedex_context_from_uploads(uploads, user_input: str, top_k: int = 6) -> str:
+@st.cache_data(show_spinner=False, max_entries=32)
+def cached_fedex_context(uploads_key: str, query_digest: str, budget: int, _uploads, _query) -> tuple[str, dict]:
     """
-    Creates a small “context pack” by:
-      - reading all uploaded docs/specs into text
-      - chunking
-      - ranking chunks vs user_input (SOAP text)
-      - returning top_k chunks with file source labels
+    Ranked + packed FedEx context, keyed by the uploads' content hash, the
+    query digest and the token budget. Returns (context, pack_stats).
     """
-    if not uploads:
-        return ""
-
-    all_chunks = []
-    for up in uploads:
-        text = read_uploaded_file_to_text(up)
-        if not text.strip():
-            continue
-        for ch in chunk_text(text):
-            all_chunks.append((up.name, ch))
-
-    ranked = sorted(all_chunks, key=lambda x: score_chunk(x[1], user_input), reverse=True)
-    picked = ranked[:top_k]
-
-    out = []
-    for fname, ch in picked:
-        out.append(f"[SOURCE FILE: {fname}]\n{ch}")
-    return "\n\n---\n\n".join(out)
-
-
-# ------------------------------------------------------------
-# 3) Gemini helper
-# ------------------------------------------------------------
-def gemini_generate(client, model: str, system_prompt: str, user_prompt: str) -> str:
-    response = client.models.generate_content(
-        model=model,
-        contents=[
-            {
-                "role": "user",
-                "parts": [{"text": f"{system_prompt}\n\nUSER_INPUT:\n{user_prompt}"}],
-            }
-        ],
-    )
-    return response.text or ""
-
-
-# ------------------------------------------------------------
-# 4) Prompts
-# ------------------------------------------------------------
-DESIGN_SYSTEM_PROMPT = """
-You are a migration assistant converting SOAP services to REST APIs.
-
-Rules:
-- First produce an OpenAPI 3.0 specification (YAML).
-- Then describe REST endpoints, schemas, and errors.
-- Provide a SOAP → REST mapping table.
-- Map SOAP Faults to HTTP status codes with a JSON error body.
-- If something is missing, list assumptions explicitly.
-- Prefer correctness and clarity over verbosity.
-
-Output sections (exact order):
-1) Assumptions
-2) REST Endpoints
-3) JSON Schemas
-4) Error Model
-5) SOAP → REST Mapping Table
-6) OpenAPI 3.0 YAML
-"""
-
-CODE_SYSTEM_PROMPT = """
-You are a code generator.
-
-Given an OpenAPI 3.0 YAML and migration notes:
-- Generate ONLY a client (NO server code)
-- Include TODOs for business logic
-- Include example requests
-
-Rules:
-- Code must match the OpenAPI exactly
-- No secrets or API keys in code
-- Keep code minimal but runnable
-
-Output sections:
-1) Client Skeleton
-2) Example Requests
-3) Validation Notes & Tests
-"""
-
-
-def build_design_prompt(target_stack, soap_text, hints, rest_prefs, fedex_context):
-    return f"""
-Target stack:
-{target_stack}
-
-REST preferences:
-{rest_prefs}
-
-AUTHORITATIVE FEDEX REFERENCE (uploaded files; treat as source of truth):
-{fedex_context}
-
-SOAP / WSDL / XML / Code:
-{soap_text}
-
-Extracted hints:
-- has_wsdl: {hints['has_wsdl']}
-- has_soap_envelope: {hints['has_soap_envelope']}
-- namespaces: {hints['namespaces']}
-- possible_operations: {hints['possible_operations']}
-
-Task:
-Design a REST API equivalent and produce OpenAPI 3.0 YAML.
-"""
-
-
-def build_code_prompt(target_stack, openapi_yaml, design_output, fedex_context):
-    return f"""
-Target stack:
-{target_stack}
+    stats = {}
+    context = build_fedex_context_from_uploads(_uploads, _query, token_budget=budget, stats=stats)
+    return context, stats
 
-AUTHORITATIVE FEDEX REFERENCE (uploaded files; treat as source of truth):
-{fedex_context}
 
-OpenAPI 3.0 YAML:
-{openapi_yaml}
-
-Design notes:
-{design_output}
-
-Generate ONLY the client code (no server).
-"""
-
-
-# ------------------------------------------------------------
-# 5) Streamlit UI
-# ------------------------------------------------------------
-st.set_page_config(page_title="SOAP → REST Converter (Gemini)", layout="wide")
-st.title("🧼➡️🌐 SOAP → REST Converter Bot")
-
-api_key = os.getenv("GEMINI_API_KEY")
-if not api_key:
+# The client (and with it the GenAI SDK import) is created on Convert, not
+# while the page renders.
+if LLM_BACKEND == "gemini" and not os.getenv("GEMINI_API_KEY"):
     st.error("GEMINI_API_KEY not found in environment variables.")
     st.stop()
 
-client = genai.Client(api_key=api_key)
+# Optional: append every conversion's spans to this JSON lines file.
+TRACE_JSONL = os.getenv("SOAP2REST_TRACE_JSONL")
 
 with st.sidebar:
     st.header("Settings")
+    if LLM_BACKEND == "fake":
+        st.info("Fake LLM backend (SOAP2REST_LLM_BACKEND=fake): canned answers, no network.")
 
     model = st.selectbox(
         "Gemini model",
@@ -279,14 +73,12 @@ with st.sidebar:
         index=0,
     )
 
-    target_stack = st.selectbox(
-        "Target stack",
-        [
-            "Python requests client",
-            "Node.js Axios client",
-            "Java HTTP client",
-            ".NET C# HttpClient",
-        ],
+    target_stack = st.selectbox("Target stack", TARGET_STACKS)
+    code_source = st.radio(
+        "Client code",
+        ["Local templates", "Local templates + Gemini TODO notes", "Gemini"],
+        help="Templates render the client from the validated OpenAPI in milliseconds. "
+        "TODO notes add one small Gemini call; Gemini writes the whole client.",
     )
 
     rest_prefs = st.text_area(
@@ -295,6 +87,68 @@ with st.sidebar:
         height=100,
     )
 
+    use_compiler = st.checkbox(
+        "Compile well-formed WSDLs locally",
+        value=True,
+        help="Builds the OpenAPI directly from the WSDL without a Gemini design call. "
+        "Falls back to Gemini when the WSDL can't be mapped mechanically.",
+    )
+    refine_compiled = st.checkbox(
+        "Refine compiled design with Gemini",
+        value=False,
+        disabled=not use_compiler,
+    )
+
+    use_llm_cache = st.checkbox(
+        "Cache Gemini responses",
+        value=False,
+        help="Reuse answers for identical model + prompts (local disk, with TTL).",
+    )
+    bypass_llm_cache = st.checkbox(
+        "Bypass cache for this run",
+        value=False,
+        disabled=not use_llm_cache,
+    )
+    llm_cache = response_cache if use_llm_cache else None
+
+    stream_output = st.checkbox(
+        "Stream Gemini output",
+        value=True,
+        help="Show design and code as they are generated; code generation starts "
+        "as soon as the OpenAPI YAML block is complete.",
+    )
+
+    repair_attempts = st.number_input(
+        "Max OpenAPI repair calls",
+        min_value=0,
+        max_value=5,
+        value=MAX_REPAIR_ATTEMPTS,
+        help="The design's OpenAPI is validated locally before code generation; when it fails, "
+        "Gemini gets up to this many targeted repair calls (errors + offending fragment only).",
+    )
+
+    per_operation = st.checkbox(
+        "Design each operation concurrently",
+        value=False,
+        help="For WSDLs with several operations: one smaller Gemini call per operation, "
+        "run in parallel and merged into one OpenAPI document.",
+    )
+    design_concurrency = st.slider("Max concurrent Gemini calls", 1, 16, 4, disabled=not per_operation)
+
+    context_cap = st.slider(
+        "FedEx context budget (tokens)",
+        min_value=1_000,
+        max_value=200_000,
+        value=8_000,
+        step=1_000,
+        help="Upper bound for uploaded reference text in the prompts; also limited by the model's context window.",
+    )
+    exact_token_counts = st.checkbox(
+        "Exact token counts (Gemini count_tokens)",
+        value=False,
+        help="Count the system prompt and SOAP input with the API instead of the local estimate.",
+    )
+
     st.subheader("FedEx reference (upload)")
     fedex_uploads = st.file_uploader(
         "Upload FedEx docs/specs (OpenAPI JSON/YAML, PDFs, txt)",
@@ -316,47 +170,288 @@ soap_text = st.text_area(
 
 st.divider()
 
-if st.button("🚀 Convert SOAP → REST", use_container_width=True):
-    if not soap_text.strip():
-        st.warning("Please paste some SOAP/WSDL content first.")
-        st.stop()
-
-    with st.spinner("Analyzing SOAP…"):
-        hints = extract_soap_hints(soap_text)
 
-    with st.spinner("Building FedEx context from uploaded docs…"):
-        fedex_context = build_fedex_context_from_uploads(fedex_uploads, soap_text) if fedex_uploads else ""
+def _stream_into_queue(chunks, out: queue.Queue) -> None:
+    # Runs in a worker thread; Streamlit elements are only touched by the script thread.
+    try:
+        for chunk in chunks:
+            out.put(chunk)
+    except Exception as e:
+        out.put(e)
+    finally:
+        out.put(None)
 
-    with st.spinner("Designing REST API + OpenAPI…"):
-        design_prompt = build_design_prompt(target_stack, soap_text, hints, rest_prefs, fedex_context)
-        design_output = gemini_generate(client, model, DESIGN_SYSTEM_PROMPT, design_prompt)
 
-    # extract OpenAPI section (best-effort)
-    openapi_yaml = design_output
-    match = re.search(r"6\)\s*OpenAPI 3\.0 YAML(.*)$", design_output, re.DOTALL | re.IGNORECASE)
-    if match:
-        openapi_yaml = match.group(1).strip()
+def _start_code_stream(code_prompt: str) -> queue.Queue:
+    out: queue.Queue = queue.Queue()
+    chunks = gemini_generate_stream(
+        client, model, CODE_SYSTEM_PROMPT, code_prompt, cache=llm_cache, bypass_cache=bypass_llm_cache
+    )
+    # copy_context so the worker's spans land in this run's trace.
+    threading.Thread(target=contextvars.copy_context().run, args=(_stream_into_queue, chunks, out), daemon=True).start()
+    return out
+
+
+def _result_tabs():
+    design_tab, code_tab, debug_tab, context_tab = st.tabs(["📐 Design + OpenAPI", "💻 Client Code", "🧠 Debug", "FedEx Context"])
+    with design_tab:
+        design_box = st.empty()
+        openapi_box = st.empty()
+    with code_tab:
+        code_box = st.empty()
+    return debug_tab, context_tab, design_box, openapi_box, code_box
+
+
+def _render_result(result: dict, debug_tab, context_tab, design_box, openapi_box, code_box) -> None:
+    design_box.text_area("Design output", result["design_output"], height=500)
+    openapi_box.code(result["openapi_yaml"], language="yaml")
+    code_box.text_area("Generated client code", result["code_output"], height=600)
+
+    token_budget = result["token_budget"]
+    fedex_context = result["fedex_context"]
+    trace = result["trace"]
+    with debug_tab:
+        st.caption(f"Design source: {result['design_source']}")
+        st.json(result["hints"])
+        st.caption("Token budget per stage (inputs: SOAP text for design, OpenAPI + design notes for code)")
+        st.table(
+            [
+                {
+                    "stage": "design",
+                    "system prompt": token_budget["system_prompt"],
+                    "inputs": token_budget["soap_input"],
+                    "FedEx context": estimate_tokens(fedex_context),
+                    "context budget": token_budget["fedex_context_budget"],
+                    "model input limit": token_budget["model_input_limit"],
+                },
+                {
+                    "stage": "code",
+                    "system prompt": estimate_tokens(CODE_SYSTEM_PROMPT),
+                    "inputs": estimate_tokens(result["openapi_yaml"]) + estimate_tokens(design_notes(result["design_output"])),
+                    "FedEx context": estimate_tokens(fedex_context),
+                    "context budget": token_budget["fedex_context_budget"],
+                    "model input limit": token_budget["model_input_limit"],
+                },
+            ]
+        )
+        if result["code_stats"]:
+            st.caption("Client code (local templates)")
+            st.json(result["code_stats"])
+        st.caption("OpenAPI validation (repair calls and their time)")
+        st.json(result["openapi_report"])
+        if result["pack_stats"]:
+            st.json({"context_packing": result["pack_stats"]})
+        if llm_cache is not None:
+            st.caption("Gemini response cache")
+            st.json(llm_cache.stats())
+        rate_stats = limiter_stats()
+        if rate_stats:
+            st.caption("Rate limiting (process-wide: throttle and retry waits)")
+            st.table([{"model": m, **s} for m, s in rate_stats.items()])
+        if LLM_BACKEND == "fake":
+            st.caption("Fake LLM backend")
+            st.json(get_client(LLM_BACKEND).stats())
+        st.caption("Stage timings (wall and CPU ms, bytes in/out, Gemini usage_metadata tokens)")
+        st.table(trace.rows())
+        st.download_button(
+            "Download spans (JSON lines)",
+            trace.to_jsonl(model=result["model"], target_stack=result["target_stack"], design_source=result["design_source"]),
+            file_name="soap2rest-spans.jsonl",
+            mime="application/jsonl",
+        )
+
+    with context_tab:
+        if fedex_context:
+            st.text_area("FedEx context pack used", fedex_context, height=600)
+        else:
+            st.info("No FedEx files uploaded — upload docs/specs to ground the generation.")
 
-    with st.spinner("Generating client code…"):
-        code_prompt = build_code_prompt(target_stack, openapi_yaml, design_output, fedex_context)
-        code_output = gemini_generate(client, model, CODE_SYSTEM_PROMPT, code_prompt)
 
-    st.success("Conversion complete!")
+if st.button("🚀 Convert SOAP → REST", use_container_width=True):
+    if not soap_text.strip():
+        st.warning("Please paste some SOAP/WSDL content first.")
+        st.stop()
 
-    tab1, tab2, tab3, tab4 = st.tabs(["📐 Design + OpenAPI", "💻 Client Code", "🧠 Debug", "FedEx Context"])
+    try:
+        client = get_client(LLM_BACKEND)
+    except LlmBackendError as e:
+        st.error(str(e))
+        st.stop()
 
-    with tab1:
-        st.text_area("Design output", design_output, height=500)
-        st.code(openapi_yaml, language="yaml")
+    trace = Trace().bind()
 
-    with tab2:
-        st.text_area("Generated client code", code_output, height=600)
+    with st.spinner("Analyzing SOAP…"):
+        soap_model = parse_soap_model(soap_text)
+        hints = extract_soap_hints(soap_text, soap_model)
+        retrieval_query = prepare_query(soap_text)
 
-    with tab3:
-        st.json(hints)
+    compiled, design_source = None, "gemini"
+    if use_compiler and soap_model is not None:
+        try:
+            with span("openapi.compile"):
+                compiled = compile_openapi(soap_model)
+        except WsdlCompileError as e:
+            design_source = f"gemini (local compiler skipped: {e})"
 
-    with tab4:
-        if fedex_context:
-            st.text_area("FedEx context pack used", fedex_context, height=600)
+    with st.spinner("Building FedEx context from uploaded docs…"):
+        count_tokens = make_token_counter(client, model) if exact_token_counts else estimate_tokens
+        token_budget = context_budget(
+            model, context_cap, {"system_prompt": DESIGN_SYSTEM_PROMPT, "soap_input": soap_text}, count_tokens
+        )
+        if fedex_uploads:
+            fedex_context, pack_stats = cached_fedex_context(
+                fingerprint((up.name, up.getvalue()) for up in fedex_uploads),
+                retrieval_query.digest,
+                token_budget["fedex_context_budget"],
+                fedex_uploads,
+                retrieval_query,
+            )
         else:
-            st.info("No FedEx files uploaded — upload docs/specs to ground the generation.")
+            fedex_context, pack_stats = "", {}
+
+    status = st.empty()
+    debug_tab, context_tab, design_box, openapi_box, code_box = _result_tabs()
+
+    code_queue = None
+    early_code_checked = False
+    code_output, code_stats = None, None
+    if compiled is not None and not refine_compiled:
+        design_source = "local compiler"
+        design_output = render_design(compiled, soap_model)
+        openapi_yaml = to_yaml(compiled)
+    elif per_operation and soap_model is not None and len(soap_model.operations()) > 1:
+        design_source = "gemini (per operation)"
+        with st.spinner(f"Designing {len(soap_model.operations())} operations concurrently…"):
+            design_output, openapi_yaml = design_per_operation(
+                client,
+                model,
+                soap_model,
+                target_stack,
+                rest_prefs,
+                fedex_context,
+                concurrency=design_concurrency,
+                cache=llm_cache,
+                bypass_cache=bypass_llm_cache,
+            )
+    else:
+        if compiled is not None:
+            design_source = "local compiler + gemini refinement"
+            design_prompt = build_refine_prompt(target_stack, to_yaml(compiled), hints, rest_prefs, fedex_context)
+        else:
+            design_prompt = build_design_prompt(target_stack, soap_text, hints, rest_prefs, fedex_context)
+
+        with st.spinner("Designing REST API + OpenAPI…"):
+            if stream_output:
+                extractor = OpenApiStreamExtractor()
+                for chunk in gemini_generate_stream(
+                    client, model, DESIGN_SYSTEM_PROMPT, design_prompt, cache=llm_cache, bypass_cache=bypass_llm_cache
+                ):
+                    if not extractor.feed(chunk):
+                        continue  # re-render on complete lines only
+                    design_box.code(extractor.lines, language="markdown")
+                    if extractor.openapi_yaml is not None:
+                        openapi_box.code(extractor.openapi_yaml, language="yaml")
+                    if extractor.complete and not early_code_checked and code_source == "Gemini":
+                        # Section 6 is last: everything the code prompt needs is here.
+                        # Start early only on a spec that already validates.
+                        early_code_checked = True
+                        if not validate_openapi(extractor.openapi_yaml):
+                            code_queue = _start_code_stream(
+                                build_code_prompt(target_stack, extractor.openapi_yaml, design_notes(extractor.text), fedex_context)
+                            )
+                design_output = extractor.text
+                with span("openapi.extract"):
+                    openapi_yaml = extractor.finish()
+            else:
+                design_output = gemini_generate(
+                    client, model, DESIGN_SYSTEM_PROMPT, design_prompt, cache=llm_cache, bypass_cache=bypass_llm_cache
+                )
+                with span("openapi.extract", bytes_in=len(design_output.encode("utf-8"))):
+                    openapi_yaml = extract_openapi_yaml(design_output)
+
+    if openapi_yaml is None:
+        design_box.code(design_output, language="markdown")
+        st.error("The design output has no OpenAPI section (6); nothing to validate or generate code from.")
+        st.stop()
+
+    with st.spinner("Validating OpenAPI…"):
+        openapi_yaml, openapi_report = validate_and_repair(
+            openapi_yaml,
+            lambda system_prompt, user_prompt: gemini_generate(
+                client, model, system_prompt, user_prompt, cache=llm_cache, bypass_cache=bypass_llm_cache
+            ),
+            max_attempts=int(repair_attempts),
+            doc=compiled if design_source == "local compiler" else None,
+        )
+
+    design_box.code(design_output, language="markdown")
+    openapi_box.code(openapi_yaml, language="yaml")
+
+    if not openapi_report.usable:
+        st.error(
+            f"The OpenAPI document is still invalid after {openapi_report.repair_calls} repair call(s); "
+            "skipped client code generation. See the Debug tab."
+        )
+        code_output = ""
+    else:
+        if not openapi_report.valid:
+            st.warning(f"OpenAPI has {len(openapi_report.errors)} validation error(s) left; see the Debug tab.")
+        if code_source != "Gemini":
+            todo_generate = (
+                (
+                    lambda system_prompt, user_prompt: gemini_generate(
+                        client, model, system_prompt, user_prompt, cache=llm_cache, bypass_cache=bypass_llm_cache
+                    )
+                )
+                if code_source == "Local templates + Gemini TODO notes"
+                else None
+            )
+            try:
+                with st.spinner("Rendering client code…"):
+                    code_output, code_stats = generate_client_code(openapi_report.doc, target_stack, design_output, todo_generate)
+            except ClientCodegenError as e:
+                st.info(f"Local client templates skipped ({e}); generating the client with Gemini.")
+        if code_output is None:
+            with st.spinner("Generating client code…"):
+                if stream_output:
+                    if code_queue is None:
+                        code_queue = _start_code_stream(build_code_prompt(target_stack, openapi_yaml, design_notes(design_output), fedex_context))
+                    code_parts = []
+                    while (item := code_queue.get()) is not None:
+                        if isinstance(item, Exception):
+                            raise item
+                        code_parts.append(item)
+                        code_box.code("".join(code_parts), language="markdown")
+                    code_output = "".join(code_parts)
+                else:
+                    code_prompt = build_code_prompt(target_stack, openapi_yaml, design_notes(design_output), fedex_context)
+                    code_output = gemini_generate(
+                        client, model, CODE_SYSTEM_PROMPT, code_prompt, cache=llm_cache, bypass_cache=bypass_llm_cache
+                    )
+
+    status.success("Conversion complete!")
+    if TRACE_JSONL:
+        trace.export_jsonl(TRACE_JSONL, model=model, target_stack=target_stack, design_source=design_source)
+
+    # Kept for reruns: switching tabs or touching a widget redraws this result
+    # instead of converting again.
+    st.session_state["last_result"] = {
+        "model": model,
+        "target_stack": target_stack,
+        "design_source": design_source,
+        "hints": hints,
+        "token_budget": token_budget,
+        "pack_stats": pack_stats,
+        "fedex_context": fedex_context,
+        "design_output": design_output,
+        "openapi_yaml": openapi_yaml,
+        "openapi_report": openapi_report.as_dict(),
+        "code_output": code_output,
+        "code_stats": code_stats,
+        "trace": trace,
+    }
+    _render_result(st.session_state["last_result"], debug_tab, context_tab, design_box, openapi_box, code_box)
+
+elif "last_result" in st.session_state:
+    st.caption("Last conversion; press Convert to run again with the current settings.")
+    _render_result(st.session_state["last_result"], *_result_tabs())
@@ -0,0 +1,403 @@
+"""
+Benchmarks for the local hot paths, on deterministic synthetic corpora.
+
+    python bench.py                          # run and print timings
+    python bench.py --save bench_baseline.json
+    python bench.py --compare bench_baseline.json   # exit 1 on regressions
+
+Corpora: small / medium / huge WSDLs and a multi-hundred-page reference text
+(PDF-style page markers) plus an OpenAPI spec, all generated from a fixed
+seed. Each benchmark reports the median and best of --repeat runs and the
+tracemalloc peak of one extra run. --save records each peak with
+--memory-tolerance headroom as the benchmark's memory ceiling (max_peak_kib).
+--compare flags a benchmark whose median is slower than the baseline by more
+than --tolerance, or whose peak memory exceeds that ceiling. Baselines
+are machine-specific; regenerate them with --save on the machine you compare on.
+
+    python bench.py --import-profile 20      # slowest imports of the app's modules
+
+import[...] benchmarks time a fresh interpreter importing the modules app.py
+loads (Streamlit itself excluded), i.e. the cold-start cost of a new server
+process; they have no peak memory figure.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Keep benchmark runs out of the real upload cache; must be set before the
+# pipeline modules read it.
+_BENCH_CACHE_DIR = tempfile.mkdtemp(prefix="soap2rest-bench-")
+os.environ["SOAP2REST_CACHE_DIR"] = _BENCH_CACHE_DIR
+
+import retrieval  # noqa: E402
+from client_codegen import TARGET_STACKS, generate_client_code  # noqa: E402
+from openapi_compiler import compile_openapi  # noqa: E402
+from pipeline import (  # noqa: E402
+    build_fedex_context_from_uploads,
+    chunk_text,
+    extract_soap_hints,
+    parse_soap_model,
+    read_uploaded_file_to_text,
+)
+from retrieval import prepare_query, score_chunk  # noqa: E402
+
+
+SEED = 20240601
+
+WSDL_SIZES = {"small": (5, 8), "medium": (60, 15), "huge": (800, 25)}  # (operations, fields per type)
+REFERENCE_PAGES = 300
+WORDS_PER_PAGE = 450
+OPENAPI_PATHS = 200
+
+# The project modules app.py imports at startup.
+APP_MODULES = (
+    "client_codegen",
+    "design_sections",
+    "llm",
+    "llm_backend",
+    "llm_cache",
+    "openapi_compiler",
+    "operation_design",
+    "pdf_extract",
+    "pipeline",
+    "rate_limit",
+    "retrieval",
+    "token_budget",
+    "tracing",
+)
+
+VOCABULARY = (
+    "shipment tracking label rate quote pickup address validation account number service type "
+    "packaging weight dimensions customs commodity invoice recipient shipper origin destination "
+    "oauth token bearer client_id client_secret transaction id locale x-customer-transaction-id "
+    "error code message severity notification status delivered in transit exception "
+    "/ship/v1/shipments /track/v1/trackingnumbers /rate/v1/rates/quotes /address/v1/addresses/resolve "
+    "serviceType packagingType trackingNumber accountNumber shipDatestamp requestedShipment "
+    "the a of to and for with in on is are be this that by from as at or"
+).split()
+
+
+# ------------------------------------------------------------
+# Corpora
+# ------------------------------------------------------------
+def make_wsdl(operations: int, fields: int, seed: int = SEED) -> str:
+    rnd = random.Random(seed + operations)
+    xsd_types = ["xs:string", "xs:int", "xs:decimal", "xs:boolean", "xs:dateTime"]
+    types, messages, port_ops, binding_ops = [], [], [], []
+    for i in range(operations):
+        op = f"Operation{i}"
+        for suffix in ("Request", "Reply"):
+            elements = []
+            for j in range(fields):
+                occurs = ' maxOccurs="unbounded"' if rnd.random() < 0.1 else ""
+                elements.append(f'<xs:element name="field{j}" type="{rnd.choice(xsd_types)}" minOccurs="0"{occurs}/>')
+            types.append(
+                f'<xs:element name="{op}{suffix}"><xs:complexType><xs:sequence>{"".join(elements)}'
+                f"</xs:sequence></xs:complexType></xs:element>"
+            )
+            messages.append(f'<message name="{op}{suffix}Msg"><part name="body" element="tns:{op}{suffix}"/></message>')
+        port_ops.append(
+            f'<operation name="{op}"><documentation>{" ".join(rnd.choices(VOCABULARY, k=12))}</documentation>'
+            f'<input message="tns:{op}RequestMsg"/><output message="tns:{op}ReplyMsg"/></operation>'
+        )
+        binding_ops.append(
+            f'<operation name="{op}"><soap:operation soapAction="urn:bench/{op}"/>'
+            f'<input><soap:body use="literal"/></input><output><soap:body use="literal"/></output></operation>'
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<definitions xmlns="http://schemas.xmlsoap.org/wsdl/" xmlns:soap="http://schemas.xmlsoap.org/wsdl/soap/" '
+        'xmlns:xs="http://www.w3.org/2001/XMLSchema" xmlns:tns="urn:bench" targetNamespace="urn:bench" name="BenchService">\n'
+        '<types><xs:schema targetNamespace="urn:bench" elementFormDefault="qualified">\n'
+        + "\n".join(types)
+        + "\n</xs:schema></types>\n"
+        + "\n".join(messages)
+        + '\n<portType name="BenchPort">'
+        + "".join(port_ops)
+        + '</portType>\n<binding name="BenchBinding" type="tns:BenchPort">'
+        '<soap:binding style="document" transport="http://schemas.xmlsoap.org/soap/http"/>'
+        + "".join(binding_ops)
+        + '</binding>\n<service name="BenchService"><port name="BenchPort" binding="tns:BenchBinding">'
+        '<soap:address location="https://ws.example.com/bench"/></port></service>\n</definitions>\n'
+    )
+
+
+def make_reference_text(pages: int = REFERENCE_PAGES, words_per_page: int = WORDS_PER_PAGE, seed: int = SEED) -> str:
+    rnd = random.Random(seed)
+    out = []
+    for page in range(pages):
+        words = rnd.choices(VOCABULARY, k=words_per_page)
+        lines = [" ".join(words[i : i + 15]) for i in range(0, len(words), 15)]
+        out.append(f"\n\n--- PDF PAGE {page + 1} ---\n" + "\n".join(lines))
+    return "".join(out).strip()
+
+
+def make_openapi_spec(paths: int = OPENAPI_PATHS, seed: int = SEED) -> str:
+    rnd = random.Random(seed)
+    doc = {"openapi": "3.0.3", "info": {"title": "Bench", "version": "1"}, "paths": {}, "components": {"schemas": {}}}
+    for i in range(paths):
+        name = f"Resource{i}"
+        doc["components"]["schemas"][name] = {
+            "type": "object",
+            "properties": {f"{rnd.choice(VOCABULARY)}{j}": {"type": "string"} for j in range(10)},
+        }
+        doc["paths"][f"/bench/v1/resource{i}"] = {
+            "post": {
+                "operationId": f"create{name}",
+                "summary": " ".join(rnd.choices(VOCABULARY, k=8)),
+                "requestBody": {"content": {"application/json": {"schema": {"$ref": f"#/components/schemas/{name}"}}}},
+                "responses": {"200": {"description": "ok"}},
+            }
+        }
+    return json.dumps(doc, indent=2)
+
+
+class MemoryUpload:
+    """
+    In-memory stand-in for Streamlit's UploadedFile (name, size, getvalue).
+    """
+
+    def __init__(self, name: str, data: bytes):
+        self.name = name
+        self.size = len(data)
+        self._data = data
+
+    def getvalue(self) -> bytes:
+        return self._data
+
+
+# ------------------------------------------------------------
+# Import time
+# ------------------------------------------------------------
+def _import_statement(modules) -> str:
+    return "import " + ", ".join(modules)
+
+
+def import_profile(modules=APP_MODULES) -> list[tuple[str, int, int]]:
+    """
+    (module, self_us, cumulative_us) for every module a fresh interpreter
+    imports to load `modules`, from python -X importtime.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _import_statement(modules)],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:") :].split("|")
+        try:
+            rows.append((parts[2].strip(), int(parts[0]), int(parts[1])))
+        except (IndexError, ValueError):
+            continue  # header line
+    return rows
+
+
+def _cold_import(modules):
+    def run(_):
+        subprocess.run(
+            [sys.executable, "-c", _import_statement(modules)],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            check=True,
+        )
+
+    return run
+
+
+# ------------------------------------------------------------
+# Benchmarks
+# ------------------------------------------------------------
+def _clear_caches() -> None:
+    shutil.rmtree(os.path.join(_BENCH_CACHE_DIR, "uploads"), ignore_errors=True)
+    retrieval._INDEX_CACHE.clear()
+    retrieval._QUERY_CACHE.clear()
+
+
+def build_benchmarks() -> dict:
+    """
+    name -> (setup, run). setup() runs before every timed call and returns
+    the argument passed to run().
+    """
+    wsdls = {size: make_wsdl(*dims) for size, dims in WSDL_SIZES.items()}
+    reference = make_reference_text()
+    reference_upload = MemoryUpload("reference.txt", reference.encode("utf-8"))
+    uploads = [reference_upload, MemoryUpload("openapi.json", make_openapi_spec().encode("utf-8"))]
+    chunks = chunk_text(reference)
+    query_text = wsdls["medium"]
+
+    def nothing():
+        return None
+
+    def cold():
+        _clear_caches()
+
+    def warm_context():
+        build_fedex_context_from_uploads(uploads, query_text, token_budget=8_000)
+
+    def warm_read():
+        read_uploaded_file_to_text(reference_upload)
+
+    benches = {
+        "import[app]": (nothing, _cold_import(APP_MODULES)),
+        "import[pipeline]": (nothing, _cold_import(("pipeline",))),
+    }
+    for size, text in wsdls.items():
+        benches[f"extract_soap_hints[{size}]"] = (nothing, lambda _, text=text: extract_soap_hints(text))
+    compiled = compile_openapi(parse_soap_model(wsdls["medium"]))
+    for stack in TARGET_STACKS:
+        benches[f"generate_client_code[{stack.split()[0]}]"] = (nothing, lambda _, stack=stack: generate_client_code(compiled, stack))
+    benches["chunk_text[reference]"] = (nothing, lambda _: chunk_text(reference))
+    benches["score_chunk[reference]"] = (
+        lambda: prepare_query(query_text),
+        lambda query: [score_chunk(ch, query) for ch in chunks],
+    )
+    benches["read_uploaded_file_to_text[cold]"] = (cold, lambda _: read_uploaded_file_to_text(reference_upload))
+    benches["read_uploaded_file_to_text[warm]"] = (warm_read, lambda _: read_uploaded_file_to_text(reference_upload))
+    benches["build_fedex_context_from_uploads[cold]"] = (
+        cold,
+        lambda _: build_fedex_context_from_uploads(uploads, query_text, token_budget=8_000),
+    )
+    benches["build_fedex_context_from_uploads[warm]"] = (
+        warm_context,
+        lambda _: build_fedex_context_from_uploads(uploads, query_text, token_budget=8_000),
+    )
+    return benches
+
+
+def measure(setup, run, repeat: int, track_memory: bool = True) -> dict:
+    times = []
+    for _ in range(repeat + 1):  # first run is a warm-up
+        arg = setup()
+        gc.collect()
+        t0 = time.perf_counter()
+        run(arg)
+        times.append(time.perf_counter() - t0)
+    times = times[1:]
+
+    peak_kib = None
+    if track_memory:
+        arg = setup()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            run(arg)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        peak_kib = round(peak / 1024, 1)
+
+    return {
+        "median_s": round(statistics.median(times), 6),
+        "best_s": round(min(times), 6),
+        "peak_kib": peak_kib,
+    }
+
+
+def save_baseline(path: str, results: dict, repeat: int, memory_tolerance: float) -> None:
+    """
+    Writes `results` as a baseline. Benchmarks with a peak memory figure also
+    get max_peak_kib, the ceiling --compare holds them to: the peak plus
+    memory_tolerance headroom.
+    """
+    benchmarks = {}
+    for name, r in results.items():
+        benchmarks[name] = dict(r)
+        if r["peak_kib"] is not None:
+            benchmarks[name]["max_peak_kib"] = round(r["peak_kib"] * (1 + memory_tolerance), 1)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "python": platform.python_version(),
+                "machine": f"{platform.system()} {platform.machine()}",
+                "repeat": repeat,
+                "benchmarks": benchmarks,
+            },
+            f,
+            indent=2,
+        )
+        f.write("\n")
+
+
+def compare(results: dict, baseline: dict, tolerance: float, memory_tolerance: float) -> list[str]:
+    """
+    Regressions against `baseline`. The memory ceiling is the baseline's
+    max_peak_kib; older baselines without one get peak_kib plus memory_tolerance.
+    """
+    regressions = []
+    for name, r in results.items():
+        b = baseline.get("benchmarks", {}).get(name)
+        if b is None:
+            continue
+        if r["median_s"] > b["median_s"] * (1 + tolerance):
+            regressions.append(f"{name}: median {r['median_s']:.4f}s vs baseline {b['median_s']:.4f}s")
+        if r["peak_kib"] is None or b.get("peak_kib") is None:
+            continue
+        ceiling = b.get("max_peak_kib") or b["peak_kib"] * (1 + memory_tolerance)
+        if r["peak_kib"] > ceiling:
+            regressions.append(f"{name}: peak {r['peak_kib']:.0f} KiB over ceiling {ceiling:.0f} KiB")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the SOAP -> REST local hot paths.")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark (default 5)")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--save", metavar="PATH", help="write results as a baseline file")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed median slowdown (default 0.25 = 25%%)")
+    parser.add_argument("--memory-tolerance", type=float, default=0.25, help="allowed peak memory growth (default 25%%)")
+    parser.add_argument("--import-profile", type=int, metavar="N", help="print the N slowest imports of the app's modules and exit")
+    args = parser.parse_args(argv)
+
+    if args.import_profile:
+        shutil.rmtree(_BENCH_CACHE_DIR, ignore_errors=True)
+        rows = sorted(import_profile(), key=lambda row: row[2], reverse=True)
+        for module, self_us, cumulative_us in rows[: args.import_profile]:
+            print(f"{module:45} cumulative {cumulative_us / 1000:8.1f} ms  self {self_us / 1000:8.1f} ms")
+        return 0
+
+    try:
+        benches = build_benchmarks()
+        results = {}
+        for name, (setup, run) in benches.items():
+            if args.filter not in name:
+                continue
+            results[name] = measure(setup, run, max(1, args.repeat), track_memory=not name.startswith("import["))
+            r = results[name]
+            peak = "" if r["peak_kib"] is None else f"  peak {r['peak_kib']:10.0f} KiB"
+            print(f"{name:45} median {r['median_s'] * 1000:10.2f} ms  best {r['best_s'] * 1000:10.2f} ms{peak}")
+    finally:
+        shutil.rmtree(_BENCH_CACHE_DIR, ignore_errors=True)
+
+    if args.save:
+        save_baseline(args.save, results, args.repeat, args.memory_tolerance)
+        print(f"baseline written to {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance, args.memory_tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print(f"no regressions against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,935 @@
+"""
+Deterministic client code generation from the validated OpenAPI document.
+
+Each target stack has a string template: a client class with one method per
+operation (path parameters positional, then the JSON body, then query and
+header parameters), plus example requests with bodies sampled from the
+schemas. Rendering takes milliseconds and needs no model call. Methods carry
+a generic TODO comment; on request, one small Gemini call (operation list
+and error model only, not the whole design) replaces them with TODO notes
+specific to each operation.
+"""
+import json
+import keyword
+import math
+import pprint
+import re
+import time
+from dataclasses import dataclass, field
+from urllib.parse import urljoin, urlparse
+
+from design_sections import split_design_sections, strip_code_fence
+from openapi_compiler import load_yaml
+from openapi_validate import HTTP_METHODS
+from tracing import span
+
+
+TARGET_STACKS = [
+    "Python requests client",
+    "Node.js Axios client",
+    "Java HTTP client",
+    ".NET C# HttpClient",
+]
+
+# template: local rendering only; template-todos: plus one Gemini call for the
+# TODO comments; gemini: the CODE_SYSTEM_PROMPT call writes the whole client.
+CODE_SOURCES = ("template", "template-todos", "gemini")
+
+DEFAULT_BASE_URL = "https://api.example.com"
+MAX_EXAMPLES = 3  # operations shown in the example requests
+MAX_TODO_LINES = 3
+MAX_EXAMPLE_DEPTH = 4
+MAX_EXAMPLE_PROPERTIES = 20
+
+WORD_RE = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+[0-9]*|[0-9]+")
+PATH_PARAM_RE = re.compile(r"\{([^{}/]+)\}")
+
+JS_RESERVED = {
+    "break", "case", "catch", "class", "const", "continue", "debugger", "default", "delete", "do", "else",
+    "enum", "export", "extends", "false", "finally", "for", "function", "if", "import", "in", "instanceof",
+    "new", "null", "return", "super", "switch", "this", "throw", "true", "try", "typeof", "var", "void",
+    "while", "with", "yield", "let", "static", "await", "implements", "interface", "package", "private",
+    "protected", "public", "arguments", "eval",
+}
+JAVA_RESERVED = {
+    "abstract", "assert", "boolean", "break", "byte", "case", "catch", "char", "class", "const", "continue",
+    "default", "do", "double", "else", "enum", "extends", "final", "finally", "float", "for", "goto", "if",
+    "implements", "import", "instanceof", "int", "interface", "long", "native", "new", "package", "private",
+    "protected", "public", "return", "short", "static", "strictfp", "super", "switch", "synchronized",
+    "this", "throw", "throws", "transient", "try", "void", "volatile", "while", "true", "false", "null",
+    "var", "record", "yield",
+}
+CSHARP_RESERVED = {
+    "abstract", "as", "base", "bool", "break", "byte", "case", "catch", "char", "checked", "class", "const",
+    "continue", "decimal", "default", "delegate", "do", "double", "else", "enum", "event", "explicit",
+    "extern", "false", "finally", "fixed", "float", "for", "foreach", "goto", "if", "implicit", "in", "int",
+    "interface", "internal", "is", "lock", "long", "namespace", "new", "null", "object", "operator", "out",
+    "override", "params", "private", "protected", "public", "readonly", "ref", "return", "sbyte", "sealed",
+    "short", "sizeof", "stackalloc", "static", "string", "struct", "switch", "this", "throw", "true", "try",
+    "typeof", "uint", "ulong", "unchecked", "unsafe", "ushort", "using", "virtual", "void", "volatile", "while",
+}
+
+
+class ClientCodegenError(ValueError):
+    """
+    The client can't be rendered locally (unknown stack, OpenAPI that doesn't
+    load). Callers fall back to the Gemini code call.
+    """
+
+
+@dataclass
+class ClientParam:
+    name: str  # as in the spec
+    location: str  # path, query or header
+    required: bool
+    type: str  # JSON Schema type, "string" when unknown
+    example: object = None
+
+
+@dataclass
+class ClientOperation:
+    operation_id: str
+    method: str
+    path: str
+    summary: str
+    params: list[ClientParam] = field(default_factory=list)
+    has_body: bool = False
+    body_required: bool = False
+    body_example: object = None
+    body_schema: str = ""  # component name of the request body, if a $ref
+    response_schema: str = ""  # component name of the 2xx response body, if a $ref
+
+
+@dataclass
+class ClientApi:
+    title: str
+    base_url: str
+    api_key_header: str | None
+    operations: list[ClientOperation]
+
+
+# ------------------------------------------------------------
+# OpenAPI -> operations
+# ------------------------------------------------------------
+def _words(name: str) -> list[str]:
+    return WORD_RE.findall(str(name)) or ["value"]
+
+
+def snake(name: str) -> str:
+    return "_".join(w.lower() for w in _words(name))
+
+
+def camel(name: str) -> str:
+    words = _words(name)
+    return words[0].lower() + "".join(w.capitalize() for w in words[1:])
+
+
+def pascal(name: str) -> str:
+    return "".join(w.capitalize() for w in _words(name))
+
+
+def _identifier(name: str, reserved: set, taken: set) -> str:
+    if name[:1].isdigit():
+        name = "p" + name
+    if name in reserved:
+        name += "_"
+    base, n = name, 2
+    while name in taken:
+        name, n = f"{base}{n}", n + 1
+    taken.add(name)
+    return name
+
+
+def _resolve(doc: dict, node):
+    # Follows local $refs (a few hops at most, so cycles can't hang).
+    for _ in range(8):
+        if not (isinstance(node, dict) and isinstance(node.get("$ref"), str) and node["$ref"].startswith("#/")):
+            return node
+        target = doc
+        for part in node["$ref"][2:].split("/"):
+            part = part.replace("~1", "/").replace("~0", "~")
+            target = target.get(part) if isinstance(target, dict) else None
+        node = target
+    return node
+
+
+def _ref_name(schema) -> str:
+    if isinstance(schema, dict) and isinstance(schema.get("$ref"), str):
+        return schema["$ref"].rsplit("/", 1)[-1]
+    return ""
+
+
+def example_value(doc: dict, schema, depth: int = 0):
+    """
+    A sample value for a JSON Schema: example / default / first enum value,
+    else a placeholder of the right type. Nested objects stop at a fixed depth.
+    """
+    schema = _resolve(doc, schema)
+    if not isinstance(schema, dict) or depth > MAX_EXAMPLE_DEPTH:
+        return None
+    for key in ("example", "default"):
+        if key in schema:
+            return schema[key]
+    if schema.get("enum"):
+        return schema["enum"][0]
+    for key in ("oneOf", "anyOf"):
+        if schema.get(key):
+            return example_value(doc, schema[key][0], depth + 1)
+
+    properties = dict(schema.get("properties") or {})
+    for part in schema.get("allOf") or []:
+        properties.update((_resolve(doc, part) or {}).get("properties") or {})
+    kind = schema.get("type") or ("object" if properties else "string")
+    if kind == "object":
+        return {
+            name: example_value(doc, sub, depth + 1)
+            for name, sub in list(properties.items())[:MAX_EXAMPLE_PROPERTIES]
+        }
+    if kind == "array":
+        item = example_value(doc, schema.get("items"), depth + 1)
+        return [] if item is None else [item]
+    if kind == "integer":
+        return 0
+    if kind == "number":
+        return 0.0
+    if kind == "boolean":
+        return False
+    return {"date-time": "2024-01-01T00:00:00Z", "date": "2024-01-01"}.get(schema.get("format"), "string")
+
+
+def _json_schema(doc: dict, holder) -> dict | None:
+    content = (_resolve(doc, holder) or {}).get("content")
+    if not isinstance(content, dict) or not content:
+        return None
+    media = content.get("application/json") or next(iter(content.values()))
+    return (media or {}).get("schema") if isinstance(media, dict) else None
+
+
+PARAM_PLACEHOLDERS = {"string": "string", "integer": 0, "number": 0.0, "boolean": False}
+
+
+def _typed_example(value, kind: str):
+    """
+    `value` as the parameter's declared type, so typed stacks get a literal
+    that fits the slot (an integer parameter with example 3.0 becomes 3).
+    Values that don't convert fall back to a placeholder of that type.
+    """
+    if value is None:
+        return PARAM_PLACEHOLDERS[kind]
+    if kind == "string":
+        return value
+    if kind == "boolean":
+        if isinstance(value, bool):
+            return value
+        return {"true": True, "false": False}.get(str(value).strip().lower(), False)
+    if isinstance(value, bool):
+        return PARAM_PLACEHOLDERS[kind]
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return PARAM_PLACEHOLDERS[kind]
+    if not math.isfinite(number):
+        return PARAM_PLACEHOLDERS[kind]
+    if kind == "integer":
+        return value if isinstance(value, int) else int(number)
+    return value if isinstance(value, (int, float)) else number
+
+
+def _params(doc: dict, path: str, path_item: dict, operation: dict) -> list[ClientParam]:
+    merged = {}
+    for raw in (path_item.get("parameters") or []) + (operation.get("parameters") or []):
+        param = _resolve(doc, raw)
+        if not isinstance(param, dict) or param.get("in") not in ("path", "query", "header") or not param.get("name"):
+            continue
+        schema = _resolve(doc, param.get("schema")) or {}
+        kind = schema.get("type") if schema.get("type") in PARAM_PLACEHOLDERS else "string"
+        merged[(param["name"], param["in"])] = ClientParam(
+            name=str(param["name"]),
+            location=param["in"],
+            required=param["in"] == "path" or bool(param.get("required")),
+            type=kind,
+            example=_typed_example(param.get("example", example_value(doc, schema)), kind),
+        )
+    # Path parameters in template order, so positional arguments follow the URL.
+    order = {name: i for i, name in enumerate(PATH_PARAM_RE.findall(path))}
+    path_params = sorted((p for p in merged.values() if p.location == "path"), key=lambda p: order.get(p.name, len(order)))
+    return path_params + [p for p in merged.values() if p.location != "path"]
+
+
+def client_api(doc: dict) -> ClientApi:
+    """
+    The operations of an OpenAPI document, in document order.
+    """
+    servers = doc.get("servers") or []
+    base_url = servers[0].get("url") if servers and isinstance(servers[0], dict) else None
+    if isinstance(base_url, str) and not urlparse(base_url).netloc:
+        # A relative server ("/v1", as the compiler writes without a soap:address)
+        # can't be requested on its own; resolve it against the placeholder host.
+        base_url = urljoin(DEFAULT_BASE_URL, base_url)
+
+    api_key_header = None
+    for scheme in ((doc.get("components") or {}).get("securitySchemes") or {}).values():
+        scheme = _resolve(doc, scheme)
+        if isinstance(scheme, dict) and scheme.get("type") == "apiKey" and scheme.get("in") == "header":
+            api_key_header = scheme.get("name")
+            break
+
+    operations = []
+    for path, item in (doc.get("paths") or {}).items():
+        item = _resolve(doc, item)
+        if not isinstance(item, dict):
+            continue
+        for method in HTTP_METHODS:
+            op = item.get(method)
+            if not isinstance(op, dict):
+                continue
+            body = _resolve(doc, op.get("requestBody"))
+            body_schema = _json_schema(doc, body) if body else None
+            response_schema = None
+            for code, response in (op.get("responses") or {}).items():
+                if str(code).startswith("2"):
+                    response_schema = _json_schema(doc, response)
+                    break
+            operations.append(
+                ClientOperation(
+                    operation_id=str(op.get("operationId") or f"{method} {path}"),
+                    method=method.upper(),
+                    path=str(path),
+                    summary=" ".join(str(op.get("summary") or op.get("description") or "").split()),
+                    params=_params(doc, str(path), item, op),
+                    has_body=body is not None,
+                    body_required=bool(body and body.get("required")),
+                    body_example=example_value(doc, body_schema) if body_schema else {},
+                    body_schema=_ref_name(body_schema),
+                    response_schema=_ref_name(response_schema),
+                )
+            )
+
+    title = str((doc.get("info") or {}).get("title") or "Api")
+    return ClientApi(title=title, base_url=base_url or DEFAULT_BASE_URL, api_key_header=api_key_header, operations=operations)
+
+
+# ------------------------------------------------------------
+# Renderers
+# ------------------------------------------------------------
+def _one_line(text: str) -> str:
+    return " ".join(str(text).split())
+
+
+def _doc_line(op: ClientOperation) -> str:
+    line = f"{op.method} {op.path}"
+    if op.summary:
+        line = f"{op.summary} ({line})"
+    if op.response_schema:
+        line += f" -> {op.response_schema}"
+    return line
+
+
+def _default_todos(op: ClientOperation) -> list[str]:
+    return [f"TODO: business logic for {op.operation_id} (input validation, response mapping, error handling)."]
+
+
+def _method_names(api: ClientApi, convert, reserved: set, members: set) -> list[str]:
+    # members: names the client class already uses for its helpers and fields
+    taken = set(members)
+    return [_identifier(convert(op.operation_id), reserved, taken) for op in api.operations]
+
+
+def _param_names(op: ClientOperation, convert, reserved: set, taken: set) -> list[str]:
+    return [_identifier(convert(p.name), reserved, taken) for p in op.params]
+
+
+def _class_name(api: ClientApi) -> str:
+    name = pascal(api.title)
+    if not name.endswith("Client"):
+        name += "Client"
+    return ("Api" + name) if name[:1].isdigit() else name
+
+
+def _indent(text: str, prefix: str) -> str:
+    return "\n".join(prefix + line if line else line for line in text.split("\n"))
+
+
+def _path_parts(path: str, names: dict, encode) -> list[tuple[bool, str]]:
+    """
+    (is_param, text) pieces of a path template; params mapped through names.
+    """
+    parts, pos = [], 0
+    for m in PATH_PARAM_RE.finditer(path):
+        if m.start() > pos:
+            parts.append((False, path[pos : m.start()]))
+        parts.append((True, encode(names.get(m.group(1), m.group(1)))))
+        pos = m.end()
+    if pos < len(path):
+        parts.append((False, path[pos:]))
+    return parts
+
+
+# Python -------------------------------------------------------
+PY_TYPES = {"string": "str", "integer": "int", "number": "float", "boolean": "bool"}
+PY_MEMBERS = {"base_url", "timeout", "session"}
+# Names a method body uses: parameters must not shadow them.
+PY_LOCALS = {"self", "body", "quote", "requests", "str"}
+
+
+def _render_python(api: ClientApi, todos: dict) -> tuple[str, str]:
+    cls = _class_name(api)
+    methods = []
+    for op, method in zip(api.operations, _method_names(api, snake, set(keyword.kwlist), PY_MEMBERS)):
+        names = _param_names(op, snake, set(keyword.kwlist), set(PY_LOCALS))
+        positional = [f"{n}: {PY_TYPES[p.type]}" for p, n in zip(op.params, names) if p.location == "path"]
+        if op.has_body:
+            positional.append("body: dict" if op.body_required else "body: dict | None = None")
+        keyword_only = [f"{n}: {PY_TYPES[p.type]}" for p, n in zip(op.params, names) if p.location != "path" and p.required]
+        keyword_only += [f"{n}: {PY_TYPES[p.type]} | None = None" for p, n in zip(op.params, names) if p.location != "path" and not p.required]
+        signature = ", ".join(["self", *positional, *(["*", *keyword_only] if keyword_only else [])])
+
+        path_names = {p.name: n for p, n in zip(op.params, names) if p.location == "path"}
+        parts = _path_parts(op.path, path_names, lambda n: f"{{quote(str({n}), safe='')}}")
+        if any(is_param for is_param, _ in parts):
+            url = 'f"' + "".join(text if is_param else text.replace("{", "{{").replace("}", "}}").replace('"', '\\"') for is_param, text in parts) + '"'
+        else:
+            url = json.dumps(op.path)
+        args = [json.dumps(op.method), url]
+        query = [f"{json.dumps(p.name)}: {n}" for p, n in zip(op.params, names) if p.location == "query"]
+        headers = [f"{json.dumps(p.name)}: {n}" for p, n in zip(op.params, names) if p.location == "header"]
+        if query:
+            args.append("params={" + ", ".join(query) + "}")
+        if headers:
+            args.append("headers={" + ", ".join(headers) + "}")
+        if op.has_body:
+            args.append("json=body")
+
+        doc = _doc_line(op).replace("\\", "/").replace('"""', "'''")
+        comments = "\n".join(f"        # {line}" for line in todos.get(op.operation_id) or _default_todos(op))
+        methods.append(
+            f"    def {method}({signature}) -> dict | list | None:\n"
+            f'        """\n        {doc}\n        """\n'
+            f"{comments}\n"
+            f"        return self._request({', '.join(args)})"
+        )
+
+    api_key = ""
+    if api.api_key_header:
+        api_key = (
+            f"        if api_key:\n"
+            f"            self.session.headers[{json.dumps(api.api_key_header)}] = api_key\n"
+        )
+    title = _one_line(api.title).replace('"""', "'''")
+    client = f'''"""
+{title} client, generated from the OpenAPI document.
+"""
+from urllib.parse import quote
+
+import requests
+
+
+class {cls}:
+    def __init__(self, base_url: str = {json.dumps(api.base_url)}, token: str | None = None, api_key: str | None = None, timeout: float = 30):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers["Accept"] = "application/json"
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {{token}}"
+{api_key}
+    def _request(self, method: str, path: str, params: dict | None = None, headers: dict | None = None, json=None):
+        params = {{k: v for k, v in (params or {{}}).items() if v is not None}}
+        headers = {{k: str(v) for k, v in (headers or {{}}).items() if v is not None}}
+        response = self.session.request(
+            method, self.base_url + path, params=params, headers=headers, json=json, timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json() if response.content else None
+
+''' + "\n\n".join(methods) + "\n"
+
+    examples = [
+        "import os",
+        "",
+        f"from client import {cls}",
+        "",
+        f'client = {cls}(token=os.environ.get("API_TOKEN"))',
+    ]
+    for op, method in list(zip(api.operations, _method_names(api, snake, set(keyword.kwlist), PY_MEMBERS)))[:MAX_EXAMPLES]:
+        names = _param_names(op, snake, set(keyword.kwlist), set(PY_LOCALS))
+        args = [repr(p.example) for p in op.params if p.location == "path"]
+        if op.has_body:
+            args.append(pprint.pformat(op.body_example, width=100, sort_dicts=False))
+        args += [f"{n}={p.example!r}" for p, n in zip(op.params, names) if p.location != "path" and p.required]
+        examples += ["", f"# {_one_line(op.method + ' ' + op.path)}", f"print(client.{method}({', '.join(args)}))"]
+    return client, "\n".join(examples) + "\n"
+
+
+# Node.js ------------------------------------------------------
+JS_MEMBERS = {"http", "constructor"}
+JS_LOCALS = {"body", "options", "data", "compact", "encodeURIComponent"}
+
+
+def _render_node(api: ClientApi, todos: dict) -> tuple[str, str]:
+    cls = _class_name(api)
+    methods = []
+    for op, method in zip(api.operations, _method_names(api, camel, JS_RESERVED, JS_MEMBERS)):
+        names = _param_names(op, camel, JS_RESERVED, set(JS_LOCALS))
+        positional = [n for p, n in zip(op.params, names) if p.location == "path"]
+        if op.has_body:
+            positional.append("body")
+        options = [n for p, n in zip(op.params, names) if p.location != "path"]
+        if options:
+            positional.append("{ " + ", ".join(options) + " } = {}")
+
+        path_names = {p.name: n for p, n in zip(op.params, names) if p.location == "path"}
+        parts = _path_parts(op.path, path_names, lambda n: f"${{encodeURIComponent({n})}}")
+        if any(is_param for is_param, _ in parts):
+            url = "`" + "".join(text if is_param else text.replace("`", "\\`").replace("${", "\\${") for is_param, text in parts) + "`"
+        else:
+            url = json.dumps(op.path)
+        fields = [f"method: {json.dumps(op.method.lower())}", f"url: {url}"]
+        query = [f"{json.dumps(p.name)}: {n}" for p, n in zip(op.params, names) if p.location == "query"]
+        headers = [f"{json.dumps(p.name)}: {n}" for p, n in zip(op.params, names) if p.location == "header"]
+        if query:
+            fields.append("params: compact({ " + ", ".join(query) + " })")
+        if headers:
+            fields.append("headers: compact({ " + ", ".join(headers) + " })")
+        if op.has_body:
+            fields.append("data: body")
+
+        comments = "\n".join(f"    // {line}" for line in todos.get(op.operation_id) or _default_todos(op))
+        methods.append(
+            f"  /**\n   * {_doc_line(op).replace('*/', '* /')}\n   */\n"
+            f"  async {method}({', '.join(positional)}) {{\n"
+            f"{comments}\n"
+            f"    const {{ data }} = await this.http.request({{\n"
+            + "".join(f"      {f},\n" for f in fields)
+            + "    });\n    return data;\n  }"
+        )
+
+    api_key = ""
+    if api.api_key_header:
+        api_key = f"    if (apiKey) headers[{json.dumps(api.api_key_header)}] = apiKey;\n"
+    client = f"""// {_one_line(api.title)} client, generated from the OpenAPI document.
+const axios = require("axios");
+
+// Drops undefined / null values so optional parameters are left out.
+function compact(values) {{
+  return Object.fromEntries(Object.entries(values).filter(([, v]) => v !== undefined && v !== null));
+}}
+
+class {cls} {{
+  constructor({{ baseURL = {json.dumps(api.base_url)}, token, apiKey, timeout = 30000 }} = {{}}) {{
+    const headers = {{ Accept: "application/json" }};
+    if (token) headers.Authorization = `Bearer ${{token}}`;
+{api_key}    this.http = axios.create({{ baseURL, timeout, headers }});
+  }}
+
+""" + "\n\n".join(methods) + f"\n}}\n\nmodule.exports = {{ {cls} }};\n"
+
+    examples = [
+        f'const {{ {cls} }} = require("./client");',
+        "",
+        f"const client = new {cls}({{ token: process.env.API_TOKEN }});",
+        "",
+        "(async () => {",
+    ]
+    for op, method in list(zip(api.operations, _method_names(api, camel, JS_RESERVED, JS_MEMBERS)))[:MAX_EXAMPLES]:
+        names = _param_names(op, camel, JS_RESERVED, set(JS_LOCALS))
+        args = [json.dumps(p.example) for p in op.params if p.location == "path"]
+        if op.has_body:
+            args.append(_indent(json.dumps(op.body_example, indent=2), "  ").lstrip())
+        required = [f"{n}: {json.dumps(p.example)}" for p, n in zip(op.params, names) if p.location != "path" and p.required]
+        if required:
+            args.append("{ " + ", ".join(required) + " }")
+        examples += [f"  // {_one_line(op.method + ' ' + op.path)}", f"  console.log(await client.{method}({', '.join(args)}));"]
+    examples.append("})();")
+    return client, "\n".join(examples) + "\n"
+
+
+# Java ---------------------------------------------------------
+JAVA_TYPES = {"string": "String", "integer": "Long", "number": "Double", "boolean": "Boolean"}
+JAVA_MEMBERS = {"enc", "queryString", "send"}
+JAVA_LOCALS = {"jsonBody", "query", "headers"}
+
+
+def _java_literal(p: ClientParam) -> str:
+    if p.type == "integer" and isinstance(p.example, int) and not isinstance(p.example, bool):
+        return f"{p.example}L"
+    if p.type == "number" and isinstance(p.example, (int, float)) and not isinstance(p.example, bool):
+        return f"{float(p.example)}"
+    if p.type == "boolean" and isinstance(p.example, bool):
+        return "true" if p.example else "false"
+    return json.dumps(str(p.example))
+
+
+def _render_java(api: ClientApi, todos: dict) -> tuple[str, str]:
+    cls = _class_name(api)
+    methods = []
+    for op, method in zip(api.operations, _method_names(api, camel, JAVA_RESERVED, JAVA_MEMBERS)):
+        names = _param_names(op, camel, JAVA_RESERVED, set(JAVA_LOCALS))
+        args = [f"{JAVA_TYPES[p.type]} {n}" for p, n in zip(op.params, names) if p.location == "path"]
+        if op.has_body:
+            args.append("String jsonBody")
+        args += [f"{JAVA_TYPES[p.type]} {n}" for p, n in zip(op.params, names) if p.location != "path"]
+
+        path_names = {p.name: n for p, n in zip(op.params, names) if p.location == "path"}
+        parts = _path_parts(op.path, path_names, lambda n: f"enc({n})")
+        url = " + ".join(text if is_param else json.dumps(text) for is_param, text in parts) or '""'
+        lines = ["        // " + line for line in todos.get(op.operation_id) or _default_todos(op)]
+        for location, var in (("query", "query"), ("header", "headers")):
+            entries = [(p, n) for p, n in zip(op.params, names) if p.location == location]
+            if entries:
+                lines.append(f"        Map<String, Object> {var} = new LinkedHashMap<>();")
+                lines += [f"        {var}.put({json.dumps(p.name)}, {n});" for p, n in entries]
+            else:
+                lines.append(f"        Map<String, Object> {var} = Map.of();")
+        lines.append(f"        return send({json.dumps(op.method)}, {url}, query, headers, {'jsonBody' if op.has_body else 'null'});")
+        methods.append(
+            f"    /** {_doc_line(op).replace('*/', '* /')} */\n"
+            f"    public String {method}({', '.join(args)}) throws IOException, InterruptedException {{\n"
+            + "\n".join(lines)
+            + "\n    }"
+        )
+
+    api_key_field = api_key_param = api_key_set = api_key_header = ""
+    if api.api_key_header:
+        api_key_field = "    private final String apiKey;\n"
+        api_key_param = ", String apiKey"
+        api_key_set = "        this.apiKey = apiKey;\n"
+        api_key_header = f"        if (apiKey != null) request.header({json.dumps(api.api_key_header)}, apiKey);\n"
+    client = f"""// {_one_line(api.title)} client, generated from the OpenAPI document. Java 11+, no dependencies.
+import java.io.IOException;
+import java.net.URI;
+import java.net.URLEncoder;
+import java.net.http.HttpClient;
+import java.net.http.HttpRequest;
+import java.net.http.HttpResponse;
+import java.nio.charset.StandardCharsets;
+import java.time.Duration;
+import java.util.LinkedHashMap;
+import java.util.Map;
+import java.util.StringJoiner;
+
+public class {cls} {{
+    public static final String DEFAULT_BASE_URL = {json.dumps(api.base_url)};
+
+    private final HttpClient http = HttpClient.newBuilder().connectTimeout(Duration.ofSeconds(30)).build();
+    private final String baseUrl;
+    private final String token;
+{api_key_field}
+    public {cls}(String baseUrl, String token{api_key_param}) {{
+        this.baseUrl = baseUrl.replaceAll("/+$", "");
+        this.token = token;
+{api_key_set}    }}
+
+    private static String enc(Object value) {{
+        return URLEncoder.encode(String.valueOf(value), StandardCharsets.UTF_8).replace("+", "%20");
+    }}
+
+    private static String queryString(Map<String, Object> query) {{
+        StringJoiner out = new StringJoiner("&", "?", "").setEmptyValue("");
+        query.forEach((k, v) -> {{
+            if (v != null) out.add(enc(k) + "=" + enc(v));
+        }});
+        return out.toString();
+    }}
+
+    private String send(String method, String path, Map<String, Object> query, Map<String, Object> headers, String jsonBody)
+            throws IOException, InterruptedException {{
+        HttpRequest.Builder request = HttpRequest.newBuilder(URI.create(baseUrl + path + queryString(query)))
+                .timeout(Duration.ofSeconds(30))
+                .header("Accept", "application/json");
+        if (token != null) request.header("Authorization", "Bearer " + token);
+{api_key_header}        headers.forEach((k, v) -> {{
+            if (v != null) request.header(k, String.valueOf(v));
+        }});
+        HttpRequest.BodyPublisher body = HttpRequest.BodyPublishers.noBody();
+        if (jsonBody != null) {{
+            request.header("Content-Type", "application/json");
+            body = HttpRequest.BodyPublishers.ofString(jsonBody);
+        }}
+        HttpResponse<String> response = http.send(request.method(method, body).build(), HttpResponse.BodyHandlers.ofString());
+        if (response.statusCode() >= 400) {{
+            throw new IOException("HTTP " + response.statusCode() + ": " + response.body());
+        }}
+        return response.body();
+    }}
+
+""" + "\n\n".join(methods) + "\n}\n"
+
+    key_arg = ', System.getenv("API_KEY")' if api.api_key_header else ""
+    examples = [
+        "public class Example {",
+        "    public static void main(String[] args) throws Exception {",
+        f'        {cls} client = new {cls}({cls}.DEFAULT_BASE_URL, System.getenv("API_TOKEN"){key_arg});',
+    ]
+    for op, method in list(zip(api.operations, _method_names(api, camel, JAVA_RESERVED, JAVA_MEMBERS)))[:MAX_EXAMPLES]:
+        args = [_java_literal(p) for p in op.params if p.location == "path"]
+        if op.has_body:
+            args.append(json.dumps(json.dumps(op.body_example)))
+        args += [_java_literal(p) if p.required else "null" for p in op.params if p.location != "path"]
+        examples += ["", f"        // {_one_line(op.method + ' ' + op.path)}", f"        System.out.println(client.{method}({', '.join(args)}));"]
+    examples += ["    }", "}"]
+    return client, "\n".join(examples) + "\n"
+
+
+# .NET ---------------------------------------------------------
+CSHARP_TYPES = {"string": "string", "integer": "long", "number": "double", "boolean": "bool"}
+CSHARP_MEMBERS = {"SendAsync"}
+CSHARP_LOCALS = {"jsonBody", "ct"}
+
+
+def _csharp_literal(p: ClientParam) -> str:
+    if p.type in ("integer", "number") and isinstance(p.example, (int, float)) and not isinstance(p.example, bool):
+        return str(p.example)
+    if p.type == "boolean" and isinstance(p.example, bool):
+        return "true" if p.example else "false"
+    return json.dumps(str(p.example))
+
+
+def _render_csharp(api: ClientApi, todos: dict) -> tuple[str, str]:
+    cls = _class_name(api)
+    methods = []
+    for op, method in zip(api.operations, _method_names(api, lambda n: pascal(n) + "Async", set(), CSHARP_MEMBERS)):
+        names = _param_names(op, camel, CSHARP_RESERVED, set(CSHARP_LOCALS))
+        required = [f"{CSHARP_TYPES[p.type]} {n}" for p, n in zip(op.params, names) if p.location == "path"]
+        optional = []
+        if op.has_body:
+            (required if op.body_required else optional).append("string jsonBody" if op.body_required else "string? jsonBody = null")
+        for p, n in zip(op.params, names):
+            if p.location == "path":
+                continue
+            if p.required:
+                required.append(f"{CSHARP_TYPES[p.type]} {n}")
+            else:
+                optional.append(f"{CSHARP_TYPES[p.type]}? {n} = null")
+        args = required + optional + ["CancellationToken ct = default"]
+
+        path_names = {p.name: n for p, n in zip(op.params, names) if p.location == "path"}
+        parts = _path_parts(op.path, path_names, lambda n: f"Segment({n})")
+        url = " + ".join(text if is_param else json.dumps(text) for is_param, text in parts) or '""'
+        query = [f"({json.dumps(p.name)}, {n})" for p, n in zip(op.params, names) if p.location == "query"]
+        if query:
+            url += " + Query(" + ", ".join(query) + ")"
+        headers = [f"({json.dumps(p.name)}, {n})" for p, n in zip(op.params, names) if p.location == "header"]
+        header_arg = "new (string, object?)[] { " + ", ".join(headers) + " }" if headers else "NoHeaders"
+
+        comments = "\n".join(f"        // {line}" for line in todos.get(op.operation_id) or _default_todos(op))
+        doc = _doc_line(op).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+        methods.append(
+            f"    /// <summary>{doc}</summary>\n"
+            f"    public Task<string> {method}({', '.join(args)})\n"
+            "    {\n"
+            f"{comments}\n"
+            f"        return SendAsync({json.dumps(op.method)}, {url}, {'jsonBody' if op.has_body else 'null'}, {header_arg}, ct);\n"
+            "    }"
+        )
+
+    api_key_param = api_key_set = ""
+    if api.api_key_header:
+        api_key_param = ", string? apiKey = null"
+        api_key_set = f"        if (apiKey != null) _http.DefaultRequestHeaders.Add({json.dumps(api.api_key_header)}, apiKey);\n"
+    client = f"""// {_one_line(api.title)} client, generated from the OpenAPI document. .NET 6+, no dependencies.
+using System;
+using System.Globalization;
+using System.Linq;
+using System.Net.Http;
+using System.Net.Http.Headers;
+using System.Text;
+using System.Threading;
+using System.Threading.Tasks;
+
+#nullable enable
+
+public class {cls}
+{{
+    public const string DefaultBaseUrl = {json.dumps(api.base_url)};
+    private static readonly (string, object?)[] NoHeaders = Array.Empty<(string, object?)>();
+    private readonly HttpClient _http;
+
+    public {cls}(HttpClient http, string baseUrl = DefaultBaseUrl, string? token = null{api_key_param})
+    {{
+        _http = http;
+        _http.BaseAddress = new Uri(baseUrl.TrimEnd('/') + "/");
+        _http.DefaultRequestHeaders.Accept.Add(new MediaTypeWithQualityHeaderValue("application/json"));
+        if (token != null) _http.DefaultRequestHeaders.Authorization = new AuthenticationHeaderValue("Bearer", token);
+{api_key_set}    }}
+
+    private static string Text(object value) => Convert.ToString(value, CultureInfo.InvariantCulture) ?? "";
+
+    private static string Segment(object value) => Uri.EscapeDataString(Text(value));
+
+    private static string Query(params (string Name, object? Value)[] items)
+    {{
+        var parts = items.Where(p => p.Value != null).Select(p => Uri.EscapeDataString(p.Name) + "=" + Uri.EscapeDataString(Text(p.Value!)));
+        var joined = string.Join("&", parts);
+        return joined.Length == 0 ? "" : "?" + joined;
+    }}
+
+    private async Task<string> SendAsync(string method, string path, string? jsonBody, (string Name, object? Value)[] headers, CancellationToken ct)
+    {{
+        using var request = new HttpRequestMessage(new HttpMethod(method), path.TrimStart('/'));
+        foreach (var (name, value) in headers)
+        {{
+            if (value != null) request.Headers.TryAddWithoutValidation(name, Text(value));
+        }}
+        if (jsonBody != null) request.Content = new StringContent(jsonBody, Encoding.UTF8, "application/json");
+        using var response = await _http.SendAsync(request, ct);
+        var body = await response.Content.ReadAsStringAsync(ct);
+        if (!response.IsSuccessStatusCode) throw new HttpRequestException($"HTTP {{(int)response.StatusCode}}: {{body}}");
+        return body;
+    }}
+
+""" + "\n\n".join(methods) + "\n}\n"
+
+    key_arg = ', apiKey: Environment.GetEnvironmentVariable("API_KEY")' if api.api_key_header else ""
+    examples = [
+        "using System;",
+        "using System.Net.Http;",
+        "",
+        f'var client = new {cls}(new HttpClient(), token: Environment.GetEnvironmentVariable("API_TOKEN"){key_arg});',
+    ]
+    for op, method in list(zip(api.operations, _method_names(api, lambda n: pascal(n) + "Async", set(), CSHARP_MEMBERS)))[:MAX_EXAMPLES]:
+        names = _param_names(op, camel, CSHARP_RESERVED, set(CSHARP_LOCALS))
+        args = [_csharp_literal(p) for p in op.params if p.location == "path"]
+        if op.has_body:
+            args.append(("" if op.body_required else "jsonBody: ") + json.dumps(json.dumps(op.body_example)))
+        args += [f"{n}: {_csharp_literal(p)}" for p, n in zip(op.params, names) if p.location != "path" and p.required]
+        examples += ["", f"// {_one_line(op.method + ' ' + op.path)}", f"Console.WriteLine(await client.{method}({', '.join(args)}));"]
+    return client, "\n".join(examples) + "\n"
+
+
+RENDERERS = {
+    "Python requests client": ("python", _render_python),
+    "Node.js Axios client": ("javascript", _render_node),
+    "Java HTTP client": ("java", _render_java),
+    ".NET C# HttpClient": ("csharp", _render_csharp),
+}
+
+
+def render_client(api: ClientApi, target_stack: str, todos: dict | None = None) -> str:
+    """
+    Client code for `target_stack` as markdown: "1) Client Skeleton" and
+    "2) Example Requests", each a fenced block.
+    """
+    if target_stack not in RENDERERS:
+        raise ClientCodegenError(f"No client template for {target_stack!r}")
+    language, render = RENDERERS[target_stack]
+    client, examples = render(api, todos or {})
+    return (
+        f"1) Client Skeleton\n```{language}\n{client.rstrip()}\n```\n\n"
+        f"2) Example Requests\n```{language}\n{examples.rstrip()}\n```\n"
+    )
+
+
+# ------------------------------------------------------------
+# TODO notes (optional Gemini call)
+# ------------------------------------------------------------
+TODO_SYSTEM_PROMPT = """
+You annotate a generated REST API client with TODO comments for business logic.
+
+Rules:
+- Answer with ONLY a JSON object: {"<operationId>": ["TODO: ...", ...], ...}
+- At most 3 short lines per operation: concrete validation, mapping or error handling to add.
+- Use only the operationIds you are given; skip operations with nothing specific to say.
+- No code, no secrets.
+"""
+
+
+def build_todo_prompt(target_stack: str, api: ClientApi, error_model: str) -> str:
+    operations = []
+    for op in api.operations:
+        params = ", ".join(f"{p.location} {p.name}{'' if p.required else '?'}" for p in op.params)
+        line = f"- {op.operation_id}: {op.method} {op.path}"
+        if op.summary:
+            line += f" | {op.summary}"
+        if params:
+            line += f" | params: {params}"
+        if op.has_body:
+            line += f" | body: {op.body_schema or 'object'}"
+        if op.response_schema:
+            line += f" | returns: {op.response_schema}"
+        operations.append(line)
+    operations_text = "\n".join(operations)
+    return f"""
+Target stack:
+{target_stack}
+
+Operations:
+{operations_text}
+
+Error model:
+{error_model or "(not given)"}
+
+Task:
+Write the TODO comments for these client methods.
+"""
+
+
+def parse_todos(answer: str, operation_ids) -> dict:
+    """
+    {operationId: [comment lines]} from the model's answer; anything that
+    isn't a known operation or a string is dropped.
+    """
+    text = strip_code_fence(answer)
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end <= start:
+        raise ValueError("no JSON object in the answer")
+    data = json.loads(text[start : end + 1])
+    if not isinstance(data, dict):
+        raise ValueError("answer is not a JSON object")
+    known = set(operation_ids)
+    todos = {}
+    for op_id, lines in data.items():
+        if op_id not in known:
+            continue
+        if isinstance(lines, str):
+            lines = [lines]
+        cleaned = []
+        for line in lines if isinstance(lines, list) else []:
+            line = _one_line(line).replace("*/", "* /")[:200]
+            if line:
+                cleaned.append(line if line.upper().startswith("TODO") else f"TODO: {line}")
+        if cleaned:
+            todos[op_id] = cleaned[:MAX_TODO_LINES]
+    return todos
+
+
+def generate_client_code(openapi: str | dict, target_stack: str, design_output: str = "", generate=None) -> tuple[str, dict]:
+    """
+    Renders the client for `target_stack` from `openapi` (YAML text, or the
+    document RepairReport.doc already loaded). With
+    `generate(system_prompt, user_prompt)`, one model call first writes the
+    per-operation TODO comments. Returns (markdown, stats). Raises
+    ClientCodegenError when the document can't be rendered locally.
+    """
+    if target_stack not in RENDERERS:
+        raise ClientCodegenError(f"No client template for {target_stack!r}")
+    doc = openapi
+    if isinstance(openapi, str):
+        try:
+            doc = load_yaml(strip_code_fence(openapi))
+        except Exception as e:
+            raise ClientCodegenError(f"OpenAPI doesn't load ({' '.join(str(e).split())[:200]})") from None
+    if not isinstance(doc, dict) or not isinstance(doc.get("paths"), dict):
+        raise ClientCodegenError("OpenAPI has no paths")
+
+    api = client_api(doc)
+    stats = {"source": "template", "operations": len(api.operations), "todo_calls": 0, "todo_seconds": 0.0, "notes": []}
+    todos = {}
+    if generate is not None:
+        started = time.perf_counter()
+        answer = generate(TODO_SYSTEM_PROMPT, build_todo_prompt(target_stack, api, split_design_sections(design_output).error_model))
+        stats["todo_calls"] = 1
+        stats["todo_seconds"] = round(time.perf_counter() - started, 3)
+        try:
+            todos = parse_todos(answer, (op.operation_id for op in api.operations))
+            stats["source"] = "template + gemini TODOs"
+        except ValueError as e:
+            stats["notes"].append(f"TODO answer ignored ({e}); kept the generic TODOs")
+
+    with span("codegen.render", target_stack=target_stack) as s:
+        started = time.perf_counter()
+        code = render_client(api, target_stack, todos)
+        stats["render_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        s.attrs["operations"] = len(api.operations)
+        s.bytes_out = len(code.encode("utf-8"))
+    return code, stats
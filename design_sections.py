@@ -0,0 +1,225 @@
+"""
+Post-processing of the design model output.
+
+The design prompts ask for six numbered sections, the last one an OpenAPI
+3.0 document in a fenced ```yaml block. split_design_sections() walks the
+output once, line by line, and returns each section separately plus the
+YAML inside the fence, so prose or further fences after the YAML don't end
+up in openapi.yaml and the code prompt only gets the notes it needs.
+"""
+import re
+from dataclasses import dataclass
+
+
+FENCE_RE = re.compile(r"^```[a-zA-Z]*\s*\n(.*?)\n```", re.DOTALL)
+
+# (field, first word of the title) in the order DESIGN_SYSTEM_PROMPT lists them.
+DESIGN_SECTIONS = (
+    ("assumptions", "assumptions"),
+    ("rest_endpoints", "rest"),
+    ("json_schemas", "json"),
+    ("error_model", "error"),
+    ("mapping_table", "soap"),
+    ("openapi", "openapi"),
+)
+
+# "6) OpenAPI 3.0 YAML", "## 6) OpenAPI…", "**6. OpenAPI…**". Anchored and
+# without nested repetition, so a line is matched in time linear in its length.
+SECTION_HEADER_RE = re.compile(r"[ \t]*(?:#{1,6}[ \t]*)?(?:\*\*)?([1-6])[).][ \t]*(?:\*\*)?[ \t]*([A-Za-z]+)")
+FENCE_LINE_RE = re.compile(r"[ \t]*(`{3,}|~{3,})[ \t]*([\w.+-]*)")
+YAML_FENCE_LANGS = {"", "yaml", "yml", "openapi"}
+
+
+@dataclass
+class DesignSections:
+    assumptions: str | None = None
+    rest_endpoints: str | None = None
+    json_schemas: str | None = None
+    error_model: str | None = None
+    mapping_table: str | None = None
+    openapi: str | None = None  # section 6 as written, fences and trailing prose included
+    openapi_yaml: str | None = None  # body of the first yaml fence in section 6
+    preamble: str = ""  # anything before section 1
+    notes_end: int = 0  # offset where section 6 starts (len(text) without one)
+
+
+class _SectionScanner:
+    """
+    The line-based state machine behind split_design_sections and
+    OpenApiStreamExtractor. Fed complete lines in order with their offsets.
+    """
+
+    def __init__(self):
+        self.bounds = []  # [field, body start, body end or None]
+        self.current = None
+        self.next_index = 0
+        self.fence = None  # closing marker of the open fence, if any
+        self.preamble_end = None
+        self.notes_end = None
+        self.yaml_start = self.yaml_end = None
+
+    def line(self, line: str, line_start: int) -> None:
+        pos = line_start + len(line)
+        fence_match = FENCE_LINE_RE.match(line)
+        if self.fence is not None:
+            if fence_match and fence_match.group(1).startswith(self.fence) and not fence_match.group(2):
+                self.fence = None
+                if self.yaml_start is not None and self.yaml_end is None:
+                    self.yaml_end = line_start
+            return
+        if fence_match:
+            self.fence = fence_match.group(1)
+            if self.current == "openapi" and self.yaml_start is None and fence_match.group(2).lower() in YAML_FENCE_LANGS:
+                self.yaml_start = pos
+            return
+
+        header = SECTION_HEADER_RE.match(line)
+        if header is None:
+            return
+        number = int(header.group(1)) - 1
+        if number < self.next_index or header.group(2).lower() != DESIGN_SECTIONS[number][1]:
+            return
+        if self.current is not None:
+            self.bounds[-1][2] = line_start
+        else:
+            self.preamble_end = line_start
+        self.current = DESIGN_SECTIONS[number][0]
+        self.next_index = number + 1
+        if self.current == "openapi":
+            self.notes_end = line_start
+        self.bounds.append([self.current, pos, None])
+
+
+def split_design_sections(text: str) -> DesignSections:
+    """
+    Splits a design output into its six sections in one pass. Headers are
+    only recognised at the start of a line, outside code fences, in
+    increasing order and with the expected title, so numbered lists inside a
+    section don't start a new one. Sections the output lacks stay None.
+    """
+    scanner = _SectionScanner()
+    pos = 0
+    for line in text.splitlines(keepends=True):
+        scanner.line(line, pos)
+        pos += len(line)
+
+    result = DesignSections(notes_end=len(text) if scanner.notes_end is None else scanner.notes_end)
+    if scanner.preamble_end is not None:
+        result.preamble = text[: scanner.preamble_end].strip()
+    for name, start, end in scanner.bounds:
+        setattr(result, name, text[start : len(text) if end is None else end].strip())
+    if scanner.yaml_start is not None:
+        # An unterminated fence (e.g. a truncated output) runs to the end.
+        end = scanner.yaml_end if scanner.yaml_end is not None else len(text)
+        result.openapi_yaml = text[scanner.yaml_start : end].strip("\n")
+    return result
+
+
+def split_openapi_section(design_output: str) -> tuple[str, str | None]:
+    """
+    Returns (text before the OpenAPI section, OpenAPI section body or None).
+    The body is the fenced YAML when section 6 has one.
+    """
+    sections = split_design_sections(design_output)
+    if sections.openapi is None:
+        return design_output, None
+    notes = design_output[: sections.notes_end].rstrip()
+    return notes, sections.openapi_yaml if sections.openapi_yaml is not None else sections.openapi
+
+
+def extract_openapi_yaml(design_output: str) -> str | None:
+    """
+    The OpenAPI section of a design output, or None when it has no section 6
+    header; callers report that instead of validating the prose.
+    """
+    return split_openapi_section(design_output)[1]
+
+
+def design_notes(design_output: str) -> str:
+    """
+    Sections 1-5 (everything before the OpenAPI section), for prompts that
+    already carry the YAML separately.
+    """
+    return split_openapi_section(design_output)[0]
+
+
+def strip_code_fence(text: str) -> str:
+    match = FENCE_RE.match(text.strip())
+    return match.group(1) if match else text
+
+
+class OpenApiStreamExtractor:
+    """
+    Follows a streamed design output chunk by chunk. `openapi_yaml` is available
+    as soon as the section 6 header appears and `complete` turns true when its
+    fenced block closes. Complete lines go through the same state machine as
+    split_design_sections, once each, so feeding stays linear in the output.
+
+    feed() returns True when it completed at least one line; `lines` (the
+    output up to the last newline) and `openapi_yaml` only change then, so a
+    caller that re-renders on those calls does one render per line instead of
+    one per chunk. Reading `openapi_yaml` slices the section so far (cached
+    until the next line), and `text` joins in the unfinished last line; both
+    cost as much as the text they return.
+    """
+
+    def __init__(self):
+        self._lines = ""  # every complete line so far; only ever appended to
+        self._pending: list[str] = []  # chunks after the last newline, not scanned yet
+        self._openapi_yaml = (-1, None)  # (len(_lines) it was sliced at, value)
+        self._scanner = _SectionScanner()
+
+    @property
+    def lines(self) -> str:
+        return self._lines
+
+    @property
+    def text(self) -> str:
+        return self._lines + "".join(self._pending)
+
+    @property
+    def complete(self) -> bool:
+        return self._scanner.yaml_end is not None
+
+    @property
+    def openapi_yaml(self) -> str | None:
+        scanned, value = self._openapi_yaml
+        if scanned != len(self._lines):
+            value = self._section_yaml()
+            self._openapi_yaml = (len(self._lines), value)
+        return value
+
+    def feed(self, chunk: str) -> bool:
+        if "\n" not in chunk:
+            if chunk:
+                self._pending.append(chunk)
+            return False
+        # Only the unscanned tail is joined and scanned.
+        tail = "".join(self._pending) + chunk
+        end = tail.rfind("\n") + 1
+        self._pending = [tail[end:]] if end < len(tail) else []
+        pos = len(self._lines)
+        for line in tail[:end].splitlines(keepends=True):
+            self._scanner.line(line, pos)
+            pos += len(line)
+        # Appended through a local so CPython can grow the string in place.
+        lines, self._lines = self._lines, ""
+        lines += tail[:end]
+        self._lines = lines
+        return True
+
+    def _section_yaml(self) -> str | None:
+        scanner = self._scanner
+        if scanner.yaml_start is not None:
+            end = scanner.yaml_end if scanner.yaml_end is not None else len(self._lines)
+            return self._lines[scanner.yaml_start : end].strip("\n")
+        if scanner.current == "openapi":
+            return self._lines[scanner.bounds[-1][1] :].strip()
+        return None
+
+    def finish(self) -> str | None:
+        """
+        OpenAPI YAML for the complete output, split like extract_openapi_yaml
+        (None without a section 6).
+        """
+        return extract_openapi_yaml(self.text)
@@ -0,0 +1,113 @@
+"""
+Small size-bounded on-disk cache (one file per entry, LRU by mtime).
+"""
+import hashlib
+import os
+import tempfile
+import threading
+
+
+CACHE_DIR = os.getenv("SOAP2REST_CACHE_DIR", ".soap2rest_cache")
+
+# An eviction pass trims the cache to this fraction of max_bytes, so the sets
+# right after it don't walk the directory again.
+EVICT_TO = 0.9
+
+
+def content_key(raw: bytes, *parts: str) -> str:
+    """
+    SHA-256 of the raw bytes, salted with parser name/version etc.
+    """
+    h = hashlib.sha256(raw)
+    for p in parts:
+        h.update(b"\0")
+        h.update(p.encode("utf-8"))
+    return h.hexdigest()
+
+
+class DiskCache:
+    """
+    Keeps a running total of the bytes stored, so the directory is only
+    walked when a set pushes the total past max_bytes.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._size: int | None = None  # counted on the first set
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key: str) -> bytes | None:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            pass
+        return data
+
+    def set(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        try:
+            replaced = os.path.getsize(path)
+        except OSError:
+            replaced = 0
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            return  # caching is best-effort
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._entries())
+            else:
+                self._size += len(data) - replaced
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def get_text(self, key: str) -> str | None:
+        data = self.get(key)
+        return data.decode("utf-8") if data is not None else None
+
+    def set_text(self, key: str, text: str) -> None:
+        self.set(key, text.encode("utf-8"))
+
+    def _entries(self):
+        for root, _dirs, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                yield st.st_mtime, st.st_size, path
+
+    def _evict(self) -> None:
+        # Also resyncs the running total with the directory, which other
+        # processes may write to as well.
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * EVICT_TO
+        for _mtime, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._size = total
@@ -0,0 +1,112 @@
+"""
+Gemini helpers shared by the Streamlit app and the per-operation designer.
+
+Every call goes through the model's shared rate limiter and is retried on
+quota / transient errors (see rate_limit).
+"""
+import itertools
+import time
+from contextlib import contextmanager
+
+from rate_limit import call_with_retries, limiter_for
+from token_budget import estimate_tokens
+from tracing import span
+
+
+def _contents(system_prompt: str, user_prompt: str) -> list[dict]:
+    return [
+        {
+            "role": "user",
+            "parts": [{"text": f"{system_prompt}\n\nUSER_INPUT:\n{user_prompt}"}],
+        }
+    ]
+
+
+def _usage_tokens(usage_metadata) -> int | None:
+    return getattr(usage_metadata, "total_token_count", None) if usage_metadata is not None else None
+
+
+class _Call:
+    """
+    Bookkeeping shared by gemini_generate and gemini_generate_stream: the cache
+    lookup, the limiter reservation and the usage accounting afterwards.
+    """
+
+    def __init__(self, s, contents: list[dict], model: str, system_prompt: str, user_prompt: str, cache, bypass_cache: bool):
+        self.span = s
+        self.contents = contents
+        self.cache = cache
+        self.key = cache.key(model, system_prompt, user_prompt) if cache is not None else None
+        self.cached = cache.get(self.key) if self.key is not None and not bypass_cache else None
+        if self.cached is not None:
+            s.attrs["cache"] = "hit"
+            s.bytes_out = len(self.cached.encode("utf-8"))
+        self.limiter = limiter_for(model)
+        self.tokens = estimate_tokens(self.contents[0]["parts"][0]["text"])
+
+    def run(self, fn):
+        return call_with_retries(self.limiter, self.tokens, fn)
+
+    def finish(self, usage, text: str) -> None:
+        self.limiter.record_usage(self.tokens, _usage_tokens(usage))
+        self.span.record_usage(usage)
+        if self.key is not None and text:
+            self.cache.put(self.key, text)
+
+
+@contextmanager
+def _llm_call(span_name: str, model: str, system_prompt: str, user_prompt: str, cache, bypass_cache: bool):
+    contents = _contents(system_prompt, user_prompt)
+    prompt = contents[0]["parts"][0]["text"]
+    with span(span_name, bytes_in=len(prompt.encode("utf-8")), model=model) as s:
+        yield _Call(s, contents, model, system_prompt, user_prompt, cache, bypass_cache)
+
+
+def gemini_generate(client, model: str, system_prompt: str, user_prompt: str, cache=None, bypass_cache: bool = False) -> str:
+    """
+    With `cache` (an LlmResponseCache), identical model + prompts are served
+    from disk. `bypass_cache` skips the lookup but still stores the fresh answer.
+    """
+    with _llm_call("gemini.generate", model, system_prompt, user_prompt, cache, bypass_cache) as call:
+        if call.cached is not None:
+            return call.cached
+        response = call.run(lambda: client.models.generate_content(model=model, contents=call.contents))
+        text = response.text or ""
+        call.span.bytes_out = len(text.encode("utf-8"))
+        call.finish(getattr(response, "usage_metadata", None), text)
+        return text
+
+
+def gemini_generate_stream(client, model: str, system_prompt: str, user_prompt: str, cache=None, bypass_cache: bool = False):
+    """
+    Yields text chunks from generate_content_stream as they arrive. A cache hit
+    is yielded as one chunk; the full text is cached once the stream ends.
+    Errors are retried until the first chunk arrives, not after. The span's
+    times include the caller's work between chunks, reported as consumer_ms.
+    """
+    with _llm_call("gemini.stream", model, system_prompt, user_prompt, cache, bypass_cache) as call:
+        if call.cached is not None:
+            yield call.cached
+            return
+
+        def start():
+            stream = iter(client.models.generate_content_stream(model=model, contents=call.contents))
+            return stream, next(stream, None)
+
+        started = time.perf_counter()
+        stream, first = call.run(start)
+        call.span.attrs["first_chunk_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        parts = []
+        usage = None
+        consumer = 0.0
+        for chunk in itertools.chain([first] if first is not None else [], stream):
+            usage = getattr(chunk, "usage_metadata", None) or usage
+            text = chunk.text or ""
+            if text:
+                parts.append(text)
+                call.span.bytes_out += len(text.encode("utf-8"))
+                paused = time.perf_counter()
+                yield text
+                consumer += time.perf_counter() - paused
+        call.span.attrs["consumer_ms"] = round(consumer * 1000, 1)
+        call.finish(usage, "".join(parts))
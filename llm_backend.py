@@ -0,0 +1,315 @@
+"""
+LLM backend selection: the real Gemini client, or a local fake for offline,
+load and latency testing.
+
+    SOAP2REST_LLM_BACKEND=gemini   (default) google-genai client, needs GEMINI_API_KEY
+    SOAP2REST_LLM_BACKEND=fake     FakeGeminiClient, no network
+
+The fake has the parts of genai.Client this app uses (models.generate_content,
+models.generate_content_stream, models.count_tokens) and returns canned
+design / code answers after a configurable latency, streams them in chunks at
+a configurable cadence and can inject 429s with a RetryInfo delay, so the
+pipeline, the response cache and the rate limiter can be exercised without an
+API key.
+"""
+import importlib.util
+import json
+import os
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+from token_budget import estimate_tokens
+
+
+def _genai_installed() -> bool:
+    try:
+        return importlib.util.find_spec("google.genai") is not None
+    except ImportError:
+        return False
+
+
+# Optional: only needed for the real backend. Only looked up here; the SDK is
+# imported by make_client, i.e. when a conversion first needs a client.
+HAS_GENAI = _genai_installed()
+
+LLM_BACKEND = os.getenv("SOAP2REST_LLM_BACKEND", "gemini")
+
+
+class LlmBackendError(RuntimeError):
+    pass
+
+
+class FakeApiError(Exception):
+    """
+    Shaped like google.genai.errors.APIError: `code` and `details`.
+    """
+
+    def __init__(self, code: int, message: str, details: dict | None = None):
+        super().__init__(f"{code} {message}")
+        self.code = code
+        self.details = details
+
+
+# ------------------------------------------------------------
+# Canned answers
+# ------------------------------------------------------------
+def _operations_in(prompt: str) -> list[str]:
+    m = re.search(r"possible_operations: \[([^\]]*)\]", prompt)
+    if m:
+        ops = re.findall(r"'([^']+)'", m.group(1))
+        if ops:
+            return ops
+    m = re.search(r"^Operation: (\S+)", prompt, re.MULTILINE)
+    if m:
+        return [m.group(1)]
+    ops = re.findall(r"operationId: (\S+)", prompt)
+    return list(dict.fromkeys(ops)) or ["Operation"]
+
+
+def _kebab(name: str) -> str:
+    return re.sub(r"([a-z0-9])([A-Z])", r"\1-\2", name).lower()
+
+
+def fake_design(prompt: str) -> str:
+    ops = _operations_in(prompt)
+    rows = "\n".join(f"| {op} | POST /v1/{_kebab(op)} |" for op in ops)
+    paths = "".join(
+        f"""  /v1/{_kebab(op)}:
+    post:
+      operationId: {op}
+      requestBody:
+        required: true
+        content:
+          application/json:
+            schema:
+              type: object
+      responses:
+        '200':
+          description: OK
+          content:
+            application/json:
+              schema:
+                type: object
+        '500':
+          description: SOAP fault
+          content:
+            application/json:
+              schema:
+                $ref: '#/components/schemas/Error'
+"""
+        for op in ops
+    )
+    return f"""1) Assumptions
+- Generated by the fake LLM backend; no model was called.
+
+2) REST Endpoints
+{chr(10).join(f"- POST /v1/{_kebab(op)}" for op in ops)}
+
+3) JSON Schemas
+- Request and response bodies are plain objects.
+
+4) Error Model
+- Error {{code, message}} for SOAP faults.
+
+5) SOAP → REST Mapping Table
+| SOAP operation | REST |
+|---|---|
+{rows}
+
+6) OpenAPI 3.0 YAML
+```yaml
+openapi: 3.0.3
+info:
+  title: Fake design
+  version: 1.0.0
+paths:
+{paths}components:
+  schemas:
+    Error:
+      type: object
+      required: [code, message]
+      properties:
+        code:
+          type: string
+        message:
+          type: string
+```
+"""
+
+
+def fake_code(prompt: str) -> str:
+    ops = _operations_in(prompt)
+    methods = "\n\n".join(
+        f"    def {_kebab(op).replace('-', '_')}(self, body: dict) -> dict:\n"
+        f"        return self._post(\"/v1/{_kebab(op)}\", body)"
+        for op in ops
+    )
+    return f"""```python
+# Generated by the fake LLM backend; no model was called.
+import requests
+
+
+class Client:
+    def __init__(self, base_url: str, token: str):
+        self.base_url = base_url.rstrip("/")
+        self.session = requests.Session()
+        self.session.headers["Authorization"] = f"Bearer {{token}}"
+
+    def _post(self, path: str, body: dict) -> dict:
+        r = self.session.post(self.base_url + path, json=body, timeout=30)
+        r.raise_for_status()
+        return r.json()
+
+{methods}
+```
+"""
+
+
+def fake_repair(prompt: str) -> str:
+    # Hands the fragment back unchanged, so the repair loop runs to its limit.
+    m = re.search(r"```yaml\n(.*?)\n```", prompt, re.DOTALL)
+    return f"```yaml\n{m.group(1) if m else ''}\n```\n"
+
+
+def fake_todos(prompt: str) -> str:
+    ops = re.findall(r"^- ([^:\n]+): [A-Z]+ ", prompt, re.MULTILINE)
+    return json.dumps({op: [f"TODO: business rules for {op} (fake backend; no model was called)."] for op in ops}, indent=2)
+
+
+def fake_answer(prompt: str) -> str:
+    if "Generate ONLY the client code" in prompt:
+        return fake_code(prompt)
+    if "You are fixing an OpenAPI 3.0 document" in prompt:
+        return fake_repair(prompt)
+    if "You annotate a generated REST API client" in prompt:
+        return fake_todos(prompt)
+    return fake_design(prompt)
+
+
+# ------------------------------------------------------------
+# Fake client
+# ------------------------------------------------------------
+class _FakeModels:
+    def __init__(self, backend: "FakeGeminiClient"):
+        self._backend = backend
+
+    def generate_content(self, model: str, contents):
+        b = self._backend
+        prompt = b.prompt_text(contents)
+        time.sleep(b.latency)
+        b.maybe_fail()
+        return b.response(prompt, b.answer(prompt))
+
+    def generate_content_stream(self, model: str, contents):
+        b = self._backend
+        prompt = b.prompt_text(contents)
+        time.sleep(b.latency)
+        b.maybe_fail()
+        return b.stream(prompt)
+
+    def count_tokens(self, model: str, contents):
+        return SimpleNamespace(total_tokens=estimate_tokens(contents if isinstance(contents, str) else self._backend.prompt_text(contents)))
+
+
+class FakeGeminiClient:
+    def __init__(
+        self,
+        latency_ms: float = 800,
+        chunk_ms: float = 50,
+        chunk_chars: int = 80,
+        error_rate: float = 0.0,
+        retry_after_s: float = 1.0,
+        seed: int | None = None,
+    ):
+        self.latency = latency_ms / 1000
+        self.chunk_delay = chunk_ms / 1000
+        self.chunk_chars = max(1, chunk_chars)
+        self.error_rate = error_rate
+        self.retry_after_s = retry_after_s
+        self.models = _FakeModels(self)
+        self._rnd = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.injected_errors = 0
+
+    @classmethod
+    def from_env(cls) -> "FakeGeminiClient":
+        seed = os.getenv("SOAP2REST_FAKE_SEED")
+        return cls(
+            latency_ms=float(os.getenv("SOAP2REST_FAKE_LATENCY_MS", "800")),
+            chunk_ms=float(os.getenv("SOAP2REST_FAKE_CHUNK_MS", "50")),
+            chunk_chars=int(os.getenv("SOAP2REST_FAKE_CHUNK_CHARS", "80")),
+            error_rate=float(os.getenv("SOAP2REST_FAKE_429_RATE", "0")),
+            retry_after_s=float(os.getenv("SOAP2REST_FAKE_RETRY_AFTER_S", "1")),
+            seed=int(seed) if seed else None,
+        )
+
+    @staticmethod
+    def prompt_text(contents) -> str:
+        if isinstance(contents, str):
+            return contents
+        return "".join(part.get("text", "") for content in contents for part in content.get("parts", []))
+
+    def answer(self, prompt: str) -> str:
+        return fake_answer(prompt)
+
+    def maybe_fail(self) -> None:
+        with self._lock:
+            self.calls += 1
+            fail = self.error_rate > 0 and self._rnd.random() < self.error_rate
+            if fail:
+                self.injected_errors += 1
+        if fail:
+            raise FakeApiError(
+                429,
+                "RESOURCE_EXHAUSTED (injected by the fake backend)",
+                {"error": {"details": [{"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": f"{self.retry_after_s:g}s"}]}},
+            )
+
+    @staticmethod
+    def _usage(prompt: str, text: str) -> SimpleNamespace:
+        prompt_tokens, output_tokens = estimate_tokens(prompt), estimate_tokens(text)
+        return SimpleNamespace(
+            prompt_token_count=prompt_tokens,
+            candidates_token_count=output_tokens,
+            total_token_count=prompt_tokens + output_tokens,
+        )
+
+    def response(self, prompt: str, text: str) -> SimpleNamespace:
+        return SimpleNamespace(text=text, usage_metadata=self._usage(prompt, text))
+
+    def stream(self, prompt: str):
+        text = self.answer(prompt)
+        pieces = [text[i : i + self.chunk_chars] for i in range(0, len(text), self.chunk_chars)]
+        for i, piece in enumerate(pieces):
+            if i:
+                time.sleep(self.chunk_delay)
+            last = i == len(pieces) - 1
+            yield SimpleNamespace(text=piece, usage_metadata=self._usage(prompt, text) if last else None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"calls": self.calls, "injected_429": self.injected_errors}
+
+
+def make_client(backend: str | None = None):
+    """
+    Returns the client for `backend` (default SOAP2REST_LLM_BACKEND). Raises
+    LlmBackendError when the real backend can't be set up.
+    """
+    backend = backend or LLM_BACKEND
+    if backend == "fake":
+        return FakeGeminiClient.from_env()
+    if backend != "gemini":
+        raise LlmBackendError(f"Unknown LLM backend {backend!r} (expected 'gemini' or 'fake').")
+    if not HAS_GENAI:
+        raise LlmBackendError("google-genai is not installed. Install it, or set SOAP2REST_LLM_BACKEND=fake.")
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        raise LlmBackendError("GEMINI_API_KEY not found in environment variables.")
+    from google import genai
+
+    return genai.Client(api_key=api_key)
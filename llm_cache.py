@@ -0,0 +1,62 @@
+"""
+Opt-in on-disk cache for Gemini responses, keyed by model + prompts.
+"""
+import json
+import os
+import time
+
+from disk_cache import CACHE_DIR, DiskCache, content_key
+
+
+# Bump if the cached payload format changes.
+LLM_CACHE_VERSION = "1"
+
+
+class LlmResponseCache:
+    def __init__(self, directory: str, max_bytes: int, ttl_seconds: float):
+        self.store = DiskCache(directory, max_bytes=max_bytes)
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    def key(self, model: str, system_prompt: str, user_prompt: str) -> str:
+        payload = json.dumps([model, system_prompt, user_prompt]).encode("utf-8")
+        return content_key(payload, "gemini-response", LLM_CACHE_VERSION)
+
+    def get(self, key: str) -> str | None:
+        data = self.store.get(key)
+        if data is None:
+            self.misses += 1
+            return None
+        try:
+            entry = json.loads(data)
+        except ValueError:
+            self.misses += 1
+            return None
+        if time.time() - entry.get("created", 0) > self.ttl_seconds:
+            self.expired += 1
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry["text"]
+
+    def put(self, key: str, text: str) -> None:
+        self.store.set(key, json.dumps({"created": time.time(), "text": text}).encode("utf-8"))
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+        }
+
+
+# Module-level so counters survive Streamlit reruns of app.py.
+response_cache = LlmResponseCache(
+    os.path.join(CACHE_DIR, "gemini"),
+    max_bytes=int(os.getenv("SOAP2REST_LLM_CACHE_MB", "256")) * 1024 * 1024,
+    ttl_seconds=float(os.getenv("SOAP2REST_LLM_CACHE_TTL_HOURS", "24")) * 3600,
+)
@@ -0,0 +1,120 @@
+"""
+Structure-aware chunking for OpenAPI / Swagger uploads.
+
+Instead of word windows over pretty-printed JSON, a spec becomes one unit per
+path + method, one per component (schema, parameter, response, ...) and one for
+the security schemes, each serialized as single-line JSON. Units are written
+into the upload text behind "--- OPENAPI <key> ---" markers together with the
+$ref pointers they use, so the text can be cached as-is and the units recovered
+later without re-parsing the spec.
+"""
+import json
+import re
+
+from openapi_compiler import load_yaml
+
+
+HTTP_METHODS = ("get", "put", "post", "delete", "options", "head", "patch", "trace")
+
+UNIT_RE = re.compile(r"^--- OPENAPI (.+) ---\nrefs:(.*)$", re.MULTILINE)
+
+
+def load_openapi(text: str) -> dict | None:
+    """
+    Returns the parsed document if text is an OpenAPI 3 or Swagger 2 spec
+    (JSON or YAML), else None.
+    """
+    try:
+        doc = json.loads(text)
+    except ValueError:
+        try:
+            doc = load_yaml(text)
+        except Exception:
+            return None
+    if not isinstance(doc, dict) or not ("openapi" in doc or "swagger" in doc):
+        return None
+    return doc
+
+
+def _refs(node, found: dict) -> dict:
+    if isinstance(node, dict):
+        ref = node.get("$ref")
+        if isinstance(ref, str):
+            found[ref] = None
+        for value in node.values():
+            _refs(value, found)
+    elif isinstance(node, list):
+        for value in node:
+            _refs(value, found)
+    return found
+
+
+def openapi_units(doc: dict) -> list[tuple[str, object]]:
+    """
+    Returns (key, body) pairs. Component keys are their JSON pointers
+    ("#/components/schemas/Address") so a $ref names the unit it depends on.
+    """
+    units = []
+
+    top = {k: v for k, v in doc.items() if k not in ("paths", "components", "definitions", "parameters", "responses", "securityDefinitions")}
+    if top:
+        units.append(("info", top))
+
+    for path, item in (doc.get("paths") or {}).items():
+        if not isinstance(item, dict):
+            continue
+        shared = item.get("parameters") or []
+        for method in HTTP_METHODS:
+            operation = item.get(method)
+            if not isinstance(operation, dict):
+                continue
+            if shared:
+                operation = {**operation, "parameters": shared + (operation.get("parameters") or [])}
+            units.append((f"{method.upper()} {path}", operation))
+
+    # OpenAPI 3 components and their Swagger 2 top-level equivalents.
+    sections = [(f"#/components/{name}/", entries) for name, entries in (doc.get("components") or {}).items() if name != "securitySchemes"]
+    sections += [(f"#/{name}/", doc.get(name)) for name in ("definitions", "parameters", "responses")]
+    for prefix, entries in sections:
+        if not isinstance(entries, dict):
+            continue
+        for name, body in entries.items():
+            units.append((prefix + name, body))
+
+    security = (doc.get("components") or {}).get("securitySchemes") or doc.get("securityDefinitions")
+    if security:
+        units.append(("securitySchemes", security))
+    return units
+
+
+def render_units(units: list[tuple[str, object]]) -> str:
+    out = []
+    for key, body in units:
+        refs = " ".join(_refs(body, {}))
+        out.append(f"--- OPENAPI {key} ---\nrefs:{' ' + refs if refs else ''}\n{json.dumps(body, ensure_ascii=False, default=str)}")
+    return "\n\n".join(out)
+
+
+def openapi_to_text(text: str) -> str | None:
+    """
+    Chunk-ready text for an OpenAPI upload, or None if text isn't a spec.
+    """
+    doc = load_openapi(text)
+    if doc is None:
+        return None
+    return render_units(openapi_units(doc))
+
+
+def unit_spans(text: str) -> list[tuple[int, int, str, tuple[str, ...]]]:
+    """
+    Recovers (start, end, key, refs) for each unit in text produced by
+    openapi_to_text. Empty for any other text.
+    """
+    matches = list(UNIT_RE.finditer(text))
+    spans = []
+    for i, m in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        while end > m.end() and text[end - 1].isspace():
+            end -= 1
+        spans.append((m.start(), end, m.group(1), tuple(m.group(2).split())))
+    return spans
@@ -0,0 +1,244 @@
+"""
+Deterministic WSDL -> OpenAPI 3.0 compiler.
+
+Well-formed document/literal services map mechanically: every portType
+operation becomes `POST /<kebab-operation>` with the input element as the JSON
+request body, the output element as the 200 response and SOAP faults folded
+into a shared JSON error model. XSD types become JSON Schema components via
+xsd_jsonschema. No LLM call is needed; the result is the same
+for the same WSDL.
+"""
+import json
+import re
+from urllib.parse import urlsplit
+
+from wsdl_parser import WsdlModel, local_name
+from xsd_jsonschema import XsdJsonSchema
+
+try:
+    import yaml
+
+    class _NoAliasDumper(yaml.SafeDumper):
+        # Shared sub-dicts would otherwise come out as &id001 anchors.
+        def ignore_aliases(self, data):
+            return True
+
+    # libyaml's loader is an order of magnitude faster on large specs; same safe subset.
+    _SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+    HAS_YAML = True
+except Exception:
+    HAS_YAML = False
+
+
+ERROR_SCHEMA = {
+    "type": "object",
+    "required": ["code", "message"],
+    "properties": {
+        "code": {"type": "string", "description": "SOAP fault code or fault element name"},
+        "message": {"type": "string", "description": "SOAP faultstring"},
+        "details": {"type": "object", "additionalProperties": True, "description": "SOAP fault detail, as JSON"},
+    },
+}
+
+
+class WsdlCompileError(ValueError):
+    """
+    The WSDL can't be compiled mechanically (not a WSDL, no operations,
+    unresolved messages or elements, ...). Callers fall back to the LLM design.
+    """
+
+
+def to_yaml(doc: dict) -> str:
+    if HAS_YAML:
+        return yaml.dump(doc, Dumper=_NoAliasDumper, sort_keys=False, allow_unicode=True, width=120)
+    # JSON is valid YAML; good enough when PyYAML isn't installed.
+    return json.dumps(doc, indent=2, ensure_ascii=False)
+
+
+def load_yaml(text: str):
+    if HAS_YAML:
+        return yaml.load(text, Loader=_SafeLoader)
+    return json.loads(text)
+
+
+def kebab(name: str) -> str:
+    s = re.sub(r"([a-z0-9])([A-Z])", r"\1-\2", name)
+    s = re.sub(r"([A-Z]+)([A-Z][a-z])", r"\1-\2", s)
+    return re.sub(r"[^a-zA-Z0-9]+", "-", s).strip("-").lower()
+
+
+def _message_schema(model: WsdlModel, msg_name: str | None, converter: XsdJsonSchema, problems: list, op_name: str) -> dict | None:
+    if not msg_name:
+        return None
+    msg = model.message(msg_name)
+    if msg is None:
+        problems.append(f"{op_name}: message {local_name(msg_name)} not found")
+        return None
+
+    refs = {}
+    for part in msg.parts:
+        if part.element:
+            refs[part.name] = converter.element_ref(part.element)
+        elif part.type:
+            refs[part.name] = converter.type_ref(part.type)
+        else:
+            problems.append(f"{op_name}: part {part.name} has neither element nor type")
+
+    if not refs:
+        return None
+    if len(refs) == 1:
+        return next(iter(refs.values()))
+    return {"type": "object", "properties": refs, "required": list(refs)}
+
+
+def _servers(model: WsdlModel) -> list[dict]:
+    for svc in model.services.values():
+        for port in svc.ports:
+            if port.address:
+                parts = urlsplit(port.address)
+                if parts.scheme and parts.netloc:
+                    return [{"url": f"{parts.scheme}://{parts.netloc}/v1", "description": f"Derived from SOAP endpoint {port.address}"}]
+    return [{"url": "/v1"}]
+
+
+def soap_operations(model: WsdlModel) -> list:
+    # .NET ASMX services repeat every operation on HttpGet/HttpPost portTypes
+    # next to the SOAP one; only portTypes with a SOAP binding are compiled,
+    # unless the WSDL has none (abstract WSDL, WSDL 2.0).
+    soap_types = {local_name(b.type) for b in model.bindings.values() if b.soap_version}
+    return [(pt, op) for pt, op in model.operations() if pt.name in soap_types] or model.operations()
+
+
+def _unused(name: str, taken, separator: str) -> str:
+    candidate, n = name, 1
+    while candidate in taken:
+        n += 1
+        candidate = f"{name}{separator}{n}"
+    return candidate
+
+
+def compile_openapi(model: WsdlModel) -> dict:
+    """
+    Returns an OpenAPI 3.0 document (as a dict) for the model, or raises
+    WsdlCompileError if the service doesn't map mechanically.
+    """
+    if not model.is_wsdl:
+        raise WsdlCompileError("input is not a WSDL document")
+    operations = soap_operations(model)
+    if not operations:
+        raise WsdlCompileError("WSDL has no portType operations")
+
+    service = next(iter(model.services.values()), None)
+    title = (service.name if service else None) or model.name or "Converted SOAP service"
+
+    converter = XsdJsonSchema(model)
+    paths: dict = {}
+    operation_ids: set[str] = set()
+    problems: list[str] = []
+
+    for port_type, op in operations:
+        # Operations repeated across portTypes get the portType as a prefix;
+        # overloads within one portType then a numeric suffix.
+        path = f"/{kebab(op.name)}"
+        if path in paths:
+            path = _unused(f"/{kebab(port_type.name)}{path}", paths, "-")
+        operation_id = op.name
+        if operation_id in operation_ids:
+            operation_id = _unused(f"{port_type.name}_{op.name}", operation_ids, "_")
+        operation_ids.add(operation_id)
+
+        body = _message_schema(model, op.input, converter, problems, op.name)
+        result = _message_schema(model, op.output, converter, problems, op.name)
+
+        operation = {
+            "operationId": operation_id,
+            "tags": [port_type.name],
+            "summary": op.documentation or f"{op.name} (SOAP operation)",
+        }
+        soap_action = model.soap_action(port_type, op.name)
+        if soap_action:
+            operation["x-soap-action"] = soap_action
+        if body:
+            operation["requestBody"] = {"required": True, "content": {"application/json": {"schema": body}}}
+
+        responses = {"200": {"description": f"{op.name} succeeded"}}
+        if result:
+            responses["200"]["content"] = {"application/json": {"schema": result}}
+        else:
+            responses = {"204": {"description": f"{op.name} succeeded (one-way operation)"}}
+        error_ref = {"content": {"application/json": {"schema": {"$ref": "#/components/schemas/Error"}}}}
+        responses["400"] = {"description": "Invalid request (SOAP Client fault)", **error_ref}
+        responses["500"] = {"description": "Service error (SOAP Server fault)", **error_ref}
+        if op.faults:
+            operation["x-soap-faults"] = [name for name, _ in op.faults]
+        operation["responses"] = responses
+
+        paths[path] = {"post": operation}
+
+    problems.extend(f"unresolved {what} (imported schema?)" for what in dict.fromkeys(converter.unresolved))
+    if problems:
+        raise WsdlCompileError("; ".join(problems))
+
+    components = {**converter.components, "Error": ERROR_SCHEMA}
+
+    info = {"title": title, "version": "1.0.0"}
+    if service and service.documentation:
+        info["description"] = service.documentation
+
+    return {
+        "openapi": "3.0.3",
+        "info": info,
+        "servers": _servers(model),
+        "paths": paths,
+        "components": {"schemas": components},
+    }
+
+
+def render_design(doc: dict, model: WsdlModel) -> str:
+    """
+    Renders the compiled document in the six sections DESIGN_SYSTEM_PROMPT asks for.
+    """
+    endpoints = []
+    mapping = ["| SOAP operation | SOAPAction | REST endpoint |", "|---|---|---|"]
+    for path, item in doc["paths"].items():
+        for method, op in item.items():
+            endpoints.append(f"- `{method.upper()} {path}` — {op['summary']}")
+            mapping.append(f"| {op['operationId']} | {op.get('x-soap-action', '')} | `{method.upper()} {path}` |")
+
+    schemas = []
+    for name, schema in doc["components"]["schemas"].items():
+        props = list(schema.get("properties", {}))
+        for part in schema.get("allOf", []):
+            props.extend(part.get("properties", {}))
+        schemas.append(f"- `{name}`" + (f": {', '.join(props)}" if props else ""))
+
+    binding_styles = sorted({b.style or "document" for b in model.bindings.values()}) or ["document"]
+    assumptions = [
+        "- Compiled locally from the WSDL; no LLM was used.",
+        "- Each SOAP operation maps 1:1 to a POST endpoint taking the input element as a JSON body.",
+        f"- Binding style(s): {', '.join(binding_styles)}; XML elements map to JSON properties of the same name.",
+        f"- Server URL: {doc['servers'][0]['url']} (adjust to the real REST gateway).",
+    ]
+
+    return "\n".join([
+        "1) Assumptions",
+        *assumptions,
+        "",
+        "2) REST Endpoints",
+        *endpoints,
+        "",
+        "3) JSON Schemas",
+        *schemas,
+        "",
+        "4) Error Model",
+        "- 400 for SOAP Client faults, 500 for SOAP Server faults; body is `Error` {code, message, details}.",
+        "",
+        "5) SOAP → REST Mapping Table",
+        *mapping,
+        "",
+        "6) OpenAPI 3.0 YAML",
+        "```yaml",
+        to_yaml(doc).rstrip(),
+        "```",
+    ])
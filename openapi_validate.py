@@ -0,0 +1,449 @@
+"""
+Local OpenAPI 3.0 validation and a bounded repair loop.
+
+The YAML from the design call is safe-loaded and checked structurally
+(version, info, paths and operations, responses, parameters, requestBody,
+operationId uniqueness, local $refs) before the code call sees it. When it
+fails, the model gets a repair prompt with only the errors and the part of
+the document they point at: the enclosing path item or component for
+structural errors, a window of lines around a YAML syntax error. At most
+`max_attempts` repair calls are made; their number and time are reported.
+"""
+import copy
+import os
+import re
+import time
+from dataclasses import dataclass, field
+
+from design_sections import strip_code_fence
+from openapi_compiler import load_yaml, to_yaml
+from tracing import span
+
+
+MAX_REPAIR_ATTEMPTS = int(os.getenv("SOAP2REST_OPENAPI_REPAIR_ATTEMPTS", "2"))
+
+# Upper bound on the fragment sent per repair call; further errors wait for
+# the next attempt.
+MAX_FRAGMENT_CHARS = 20_000
+SYNTAX_WINDOW_LINES = 15
+MAX_LISTED_ERRORS = 50
+
+HTTP_METHODS = ("get", "put", "post", "delete", "options", "head", "patch", "trace")
+PATH_ITEM_KEYS = {"$ref", "summary", "description", "servers", "parameters", *HTTP_METHODS}
+PARAMETER_LOCATIONS = {"query", "header", "path", "cookie"}
+RESPONSE_CODE_RE = re.compile(r"default|[1-5](?:[0-9]{2}|XX)")
+PATH_TEMPLATE_RE = re.compile(r"\{([^{}/]+)\}")
+
+
+@dataclass
+class Problem:
+    message: str
+    unit: tuple = ()  # keys from the root down to the path item / component it is in
+    line: int | None = None  # 0-based line of a YAML syntax error
+
+
+@dataclass
+class RepairReport:
+    valid: bool = False
+    usable: bool = False  # parsed into a mapping with at least one path
+    initial_errors: list[str] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+    repair_calls: int = 0
+    repair_seconds: float = 0.0
+    notes: list[str] = field(default_factory=list)
+    doc: object = None  # the loaded document behind the returned YAML; not reported
+
+    def as_dict(self) -> dict:
+        return {
+            "valid": self.valid,
+            "usable": self.usable,
+            "initial_errors": self.initial_errors[:MAX_LISTED_ERRORS],
+            "errors": self.errors[:MAX_LISTED_ERRORS],
+            "repair_calls": self.repair_calls,
+            "repair_seconds": round(self.repair_seconds, 3),
+            "notes": self.notes,
+        }
+
+
+class RepairError(ValueError):
+    """
+    The model's repair answer couldn't be applied.
+    """
+
+
+# ------------------------------------------------------------
+# Validation
+# ------------------------------------------------------------
+def _loc(keys) -> str:
+    return ".".join(str(k) for k in keys) or "(root)"
+
+
+def _resolve(doc: dict, ref: str):
+    node = doc
+    for part in ref[2:].split("/") if ref != "#" else []:
+        part = part.replace("~1", "/").replace("~0", "~")
+        if isinstance(node, dict) and part in node:
+            node = node[part]
+        elif isinstance(node, list) and part.isdigit() and int(part) < len(node):
+            node = node[int(part)]
+        else:
+            return None
+    return node
+
+
+def _iter_refs(node, keys):
+    stack = [(node, keys)]
+    while stack:
+        node, keys = stack.pop()
+        if isinstance(node, dict):
+            ref = node.get("$ref")
+            if isinstance(ref, str):
+                yield ref, keys
+            stack.extend((v, keys + (k,)) for k, v in node.items() if k != "$ref")
+        elif isinstance(node, list):
+            stack.extend((v, keys + (i,)) for i, v in enumerate(node))
+
+
+def _check_parameters(doc, params, unit, keys, problems) -> set:
+    """
+    Returns the names of the path parameters declared in `params`.
+    """
+    declared = set()
+    if params is None:
+        return declared
+    if not isinstance(params, list):
+        problems.append(Problem(f"{_loc(keys)}: must be a list", unit))
+        return declared
+    for i, param in enumerate(params):
+        where = keys + (i,)
+        if isinstance(param, dict) and isinstance(param.get("$ref"), str):
+            param = _resolve(doc, param["$ref"]) if param["$ref"].startswith("#") else None
+            if not isinstance(param, dict):
+                continue  # unresolved refs are reported with the other $refs
+        if not isinstance(param, dict):
+            problems.append(Problem(f"{_loc(where)}: must be a mapping", unit))
+            continue
+        if not param.get("name"):
+            problems.append(Problem(f"{_loc(where)}: missing name", unit))
+        if param.get("in") not in PARAMETER_LOCATIONS:
+            problems.append(Problem(f"{_loc(where)}: 'in' must be one of {sorted(PARAMETER_LOCATIONS)}, got {param.get('in')!r}", unit))
+        if param.get("in") == "path":
+            declared.add(param.get("name"))
+            if param.get("required") is not True:
+                problems.append(Problem(f"{_loc(where)}: path parameter {param.get('name')!r} must have required: true", unit))
+    return declared
+
+
+def _check_operation(doc, op, unit, keys, path_params, template_params, operation_ids, problems) -> None:
+    if not isinstance(op, dict):
+        problems.append(Problem(f"{_loc(keys)}: operation must be a mapping", unit))
+        return
+    declared = path_params | _check_parameters(doc, op.get("parameters"), unit, keys + ("parameters",), problems)
+    for name in sorted(template_params - declared):
+        problems.append(Problem(f"{_loc(keys)}: path parameter {{{name}}} is not declared in parameters", unit))
+
+    op_id = op.get("operationId")
+    if op_id is not None:
+        if op_id in operation_ids:
+            problems.append(Problem(f"{_loc(keys)}: operationId {op_id!r} already used by {operation_ids[op_id]}", unit))
+        else:
+            operation_ids[op_id] = _loc(keys)
+
+    body = op.get("requestBody")
+    if body is not None and not (isinstance(body, dict) and ("$ref" in body or isinstance(body.get("content"), dict))):
+        problems.append(Problem(f"{_loc(keys)}.requestBody: must be a mapping with content", unit))
+
+    responses = op.get("responses")
+    if not isinstance(responses, dict) or not responses:
+        problems.append(Problem(f"{_loc(keys)}.responses: missing or empty", unit))
+        return
+    for code, response in responses.items():
+        where = keys + ("responses", code)
+        if not RESPONSE_CODE_RE.fullmatch(str(code)):
+            problems.append(Problem(f"{_loc(where)}: not an HTTP status code, range (2XX) or 'default'", unit))
+        if not isinstance(response, dict):
+            problems.append(Problem(f"{_loc(where)}: must be a mapping", unit))
+        elif "$ref" not in response and not isinstance(response.get("description"), str):
+            problems.append(Problem(f"{_loc(where)}: missing description", unit))
+
+
+def check_openapi(doc) -> list[Problem]:
+    """
+    Structural OpenAPI 3.0 checks on a loaded document.
+    """
+    if not isinstance(doc, dict):
+        return [Problem(f"document must be a mapping, got {type(doc).__name__}", line=0)]
+    problems = []
+
+    version = doc.get("openapi")
+    if not (isinstance(version, str) and version.startswith("3.0")):
+        problems.append(Problem(f"openapi: must be a 3.0.x version string, got {version!r}", ("openapi",)))
+
+    info = doc.get("info")
+    if not isinstance(info, dict):
+        problems.append(Problem("info: missing or not a mapping", ("info",)))
+    else:
+        for key in ("title", "version"):
+            if not isinstance(info.get(key), str):
+                problems.append(Problem(f"info.{key}: missing or not a string", ("info",)))
+
+    paths = doc.get("paths")
+    operation_ids = {}
+    if not isinstance(paths, dict):
+        problems.append(Problem("paths: missing or not a mapping", ("paths",)))
+        paths = {}
+    for path, item in paths.items():
+        unit = ("paths", path)
+        if not str(path).startswith("/"):
+            problems.append(Problem(f"paths.{path}: path must start with '/'", unit))
+        if not isinstance(item, dict):
+            problems.append(Problem(f"paths.{path}: path item must be a mapping", unit))
+            continue
+        for key in item:
+            if key not in PATH_ITEM_KEYS and not str(key).startswith("x-"):
+                problems.append(Problem(f"paths.{path}.{key}: not a path item field", unit))
+        path_params = _check_parameters(doc, item.get("parameters"), unit, unit + ("parameters",), problems)
+        template_params = set(PATH_TEMPLATE_RE.findall(str(path)))
+        for method in HTTP_METHODS:
+            if method in item:
+                _check_operation(doc, item[method], unit, unit + (method,), path_params, template_params, operation_ids, problems)
+
+    components = doc.get("components")
+    if components is not None:
+        if not isinstance(components, dict):
+            problems.append(Problem("components: must be a mapping", ("components",)))
+        else:
+            for section, entries in components.items():
+                if not isinstance(entries, dict):
+                    problems.append(Problem(f"components.{section}: must be a mapping", ("components", section)))
+                    continue
+                for name, value in entries.items():
+                    if not isinstance(value, dict):
+                        problems.append(Problem(f"components.{section}.{name}: must be a mapping", ("components", section, name)))
+
+    for ref, keys in _iter_refs(doc, ()):
+        if ref.startswith("#") and _resolve(doc, ref) is None:
+            unit = keys[:3] if keys[:1] == ("components",) else keys[:2]
+            problems.append(Problem(f"{_loc(keys)}: $ref {ref!r} does not resolve", unit))
+    return problems
+
+
+def _parse(text: str):
+    """
+    Returns (document, problems). A YAML syntax error is one problem with
+    the line it was found on.
+    """
+    try:
+        return load_yaml(text), []
+    except Exception as e:
+        mark = getattr(e, "problem_mark", None) or getattr(e, "context_mark", None)
+        line = getattr(mark, "line", None)
+        if line is None and getattr(e, "lineno", None):  # json.JSONDecodeError without PyYAML
+            line = e.lineno - 1
+        message = " ".join(re.sub(r'\s*in "<unicode string>"', "", str(e)).split())
+        return None, [Problem(f"YAML syntax error: {message}", line=line or 0)]
+
+
+def _validate(text: str):
+    doc, problems = _parse(text)
+    if problems:
+        return None, problems
+    return doc, check_openapi(doc)
+
+
+def validate_openapi(openapi_yaml: str) -> list[str]:
+    """
+    Validation errors for an OpenAPI 3.0 YAML document (empty when valid).
+    """
+    return [p.message for p in _validate(strip_code_fence(openapi_yaml))[1]]
+
+
+# ------------------------------------------------------------
+# Repair
+# ------------------------------------------------------------
+OPENAPI_REPAIR_SYSTEM_PROMPT = """
+You are fixing an OpenAPI 3.0 document that failed validation.
+
+Rules:
+- You get the validation errors and only the part of the document they are in.
+- Fix every listed error; change nothing else.
+- Keep paths, operationIds, schema names and $refs unless an error is about them.
+- Return ONLY the corrected fragment, in a single ```yaml block, no commentary.
+"""
+
+
+def build_fragment_repair_prompt(errors: list[str], fragment_yaml: str) -> str:
+    listed = "\n".join(f"- {e}" for e in errors)
+    return f"""
+Validation errors:
+{listed}
+
+Fragment to fix (a subset of the document, same nesting from the root):
+```yaml
+{fragment_yaml.rstrip()}
+```
+
+Task:
+Return the corrected fragment with the same top-level keys. You may add
+components.schemas entries that a $ref needs.
+"""
+
+
+def build_lines_repair_prompt(errors: list[str], start: int, excerpt: str) -> str:
+    listed = "\n".join(f"- {e}" for e in errors)
+    return f"""
+Validation errors:
+{listed}
+
+Lines {start + 1}-{start + excerpt.count(chr(10)) + 1} of the document:
+```yaml
+{excerpt}
+```
+
+Task:
+Return corrected replacement text for exactly these lines, with the same
+indentation, so the whole document parses as YAML.
+"""
+
+
+def _get(doc, keys):
+    node = doc
+    for key in keys:
+        if not isinstance(node, dict) or key not in node:
+            return None
+        node = node[key]
+    return node
+
+
+def _set(doc: dict, keys, value) -> None:
+    node = doc
+    for key in keys[:-1]:
+        if not isinstance(node.get(key), dict):
+            node[key] = {}
+        node = node[key]
+    node[keys[-1]] = value
+
+
+def _answer_yaml(answer: str) -> str:
+    # The answer should be one fenced block; tolerate text around it.
+    fence = answer.find("```")
+    if fence == -1:
+        return answer.strip("\n")
+    start = answer.find("\n", fence) + 1
+    end = answer.find("\n```", start - 1)
+    return answer[start : end if end != -1 else len(answer)]
+
+
+def _repair_lines(text: str, problems: list[Problem], generate) -> str:
+    lines = text.split("\n")
+    line = min(max(0, problems[0].line or 0), max(0, len(lines) - 1))
+    start = max(0, line - SYNTAX_WINDOW_LINES)
+    end = min(len(lines), line + SYNTAX_WINDOW_LINES + 1)
+    excerpt = "\n".join(lines[start:end])
+    answer = generate(OPENAPI_REPAIR_SYSTEM_PROMPT, build_lines_repair_prompt([problems[0].message], start, excerpt))
+    replacement = _answer_yaml(answer)
+    if not replacement.strip():
+        raise RepairError("empty answer")
+    return "\n".join(lines[:start] + replacement.split("\n") + lines[end:])
+
+
+def _repair_units(doc: dict, problems: list[Problem], generate) -> str:
+    # The fix is applied to a copy: `doc` may be the caller's (e.g. the
+    # compiler's output) and the candidate may still be discarded.
+    doc = copy.deepcopy(doc)
+    units, errors, size = [], [], 0
+    for p in problems:
+        if p.unit not in units:
+            unit_size = len(to_yaml({"_": _get(doc, p.unit)}))
+            if units and size + unit_size > MAX_FRAGMENT_CHARS:
+                continue  # left for the next attempt
+            units.append(p.unit)
+            size += unit_size
+        errors.append(p.message)
+
+    fragment = {}
+    for unit in units:
+        _set(fragment, unit, _get(doc, unit))
+    answer = generate(OPENAPI_REPAIR_SYSTEM_PROMPT, build_fragment_repair_prompt(errors, to_yaml(fragment)))
+    try:
+        fixed = load_yaml(_answer_yaml(answer))
+    except Exception as e:
+        raise RepairError(f"answer is not YAML ({' '.join(str(e).split())[:200]})") from None
+    if not isinstance(fixed, dict):
+        raise RepairError("answer is not a mapping")
+
+    for unit in units:
+        value = _get(fixed, unit)
+        if value is not None:
+            _set(doc, unit, value)
+    # New schemas or other components a fixed $ref needs.
+    for section, entries in (fixed.get("components") or {}).items():
+        if isinstance(entries, dict):
+            target = doc.setdefault("components", {})
+            if not isinstance(target, dict):
+                break
+            target = target.setdefault(section, {})
+            if isinstance(target, dict):
+                for name, value in entries.items():
+                    target.setdefault(name, value)
+    return to_yaml(doc)
+
+
+def _improved(doc, problems, new_doc, new_problems) -> bool:
+    if doc is None:
+        # Was a syntax error: the fix must parse into a document with paths,
+        # or at least move the syntax error further down.
+        if new_doc is None:
+            return (new_problems[0].line or 0) > (problems[0].line or 0)
+        return isinstance(new_doc, dict) and isinstance(new_doc.get("paths"), dict) and bool(new_doc["paths"])
+    return new_doc is not None and len(new_problems) < len(problems)
+
+
+def validate_and_repair(openapi_yaml: str, generate, max_attempts: int | None = None, doc: dict | None = None) -> tuple[str, RepairReport]:
+    """
+    Validates `openapi_yaml` and, while it is invalid, makes up to
+    `max_attempts` repair calls through generate(system_prompt, user_prompt).
+    Returns (possibly repaired YAML, report). The YAML is returned unchanged
+    when it is valid or no repair call helped. Pass `doc` when the caller
+    already has the document the YAML was dumped from, to skip parsing it.
+    """
+    max_attempts = MAX_REPAIR_ATTEMPTS if max_attempts is None else max_attempts
+    text = strip_code_fence(openapi_yaml)
+    with span("openapi.validate", bytes_in=len(text.encode("utf-8"))) as s:
+        if doc is None:
+            doc, problems = _validate(text)
+        else:
+            problems = check_openapi(doc)
+        s.attrs["errors"] = len(problems)
+    report = RepairReport(initial_errors=[p.message for p in problems])
+
+    while problems and report.repair_calls < max_attempts:
+        report.repair_calls += 1
+        started = time.perf_counter()
+        with span("openapi.repair", attempt=report.repair_calls, errors=len(problems)) as s:
+            try:
+                # Root-level problems (e.g. a root $ref) have no unit to cut out;
+                # they get the line-based repair once the units are fixed.
+                unit_problems = [p for p in problems if p.unit] if isinstance(doc, dict) else []
+                if unit_problems:
+                    candidate = _repair_units(doc, unit_problems, generate)
+                else:
+                    candidate = _repair_lines(text, problems, generate)
+            except RepairError as e:
+                report.notes.append(f"repair call {report.repair_calls}: {e}")
+                candidate = None
+            finally:
+                report.repair_seconds += time.perf_counter() - started
+            if candidate is not None:
+                new_doc, new_problems = _validate(candidate)
+                s.attrs["errors_after"] = len(new_problems)
+                if _improved(doc, problems, new_doc, new_problems):
+                    text, doc, problems = candidate, new_doc, new_problems
+                else:
+                    report.notes.append(f"repair call {report.repair_calls}: no improvement ({len(new_problems)} errors), discarded")
+
+    report.valid = not problems
+    report.errors = [p.message for p in problems]
+    report.doc = doc
+    report.usable = isinstance(doc, dict) and isinstance(doc.get("paths"), dict) and bool(doc["paths"])
+    return (text if report.repair_calls else openapi_yaml), report
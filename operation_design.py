@@ -0,0 +1,209 @@
+"""
+Per-operation design: one Gemini call per WSDL operation, run concurrently in
+a bounded thread pool, then merged into a single OpenAPI document.
+
+Each call only sees its own operation (SOAPAction, messages and the JSON Schema
+of the types it reaches), so prompts stay small, outputs aren't truncated for
+large services and wall-clock time follows the slowest operation.
+"""
+import contextvars
+import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from design_sections import split_openapi_section, strip_code_fence
+from llm import gemini_generate
+from openapi_compiler import load_yaml, soap_operations, to_yaml
+from wsdl_parser import WsdlModel, local_name
+from xsd_jsonschema import XsdJsonSchema
+
+
+OPERATION_DESIGN_SYSTEM_PROMPT = """
+You are a migration assistant converting ONE operation of a SOAP service to REST.
+
+Rules:
+- Design only the operation you are given; other operations are handled separately.
+- Use the given JSON Schemas as components.schemas (same names) and reference them with $ref.
+- Map SOAP Faults to HTTP status codes with a JSON error body named Error.
+- If something is missing, list assumptions explicitly.
+- Prefer correctness and clarity over verbosity.
+
+Output sections (exact order):
+1) Assumptions
+2) REST Endpoints
+3) JSON Schemas
+4) Error Model
+5) SOAP → REST Mapping Table
+6) OpenAPI 3.0 YAML
+(a complete OpenAPI 3.0 document containing only this operation's paths and the components it uses)
+"""
+
+
+@dataclass
+class OperationSlice:
+    name: str
+    excerpt: str
+
+
+@dataclass
+class OperationDesign:
+    name: str
+    output: str
+    error: str | None = None
+
+
+def operation_slices(model: WsdlModel) -> list[OperationSlice]:
+    """
+    One self-contained excerpt per operation the compiler would map (SOAP-bound
+    portTypes only, see soap_operations).
+    """
+    slices = []
+    for port_type, op in soap_operations(model):
+        converter = XsdJsonSchema(model)
+        lines = [f"Service: {model.name or ''} (targetNamespace {model.target_namespace or ''})"]
+        lines.append(f"PortType: {port_type.name}")
+        lines.append(f"Operation: {op.name}")
+        if op.documentation:
+            lines.append(f"Documentation: {op.documentation}")
+        soap_action = model.soap_action(port_type, op.name)
+        if soap_action:
+            lines.append(f"SOAPAction: {soap_action}")
+
+        for label, msg_name in (("Input", op.input), ("Output", op.output), *(("Fault " + n, m) for n, m in op.faults)):
+            msg = model.message(msg_name)
+            if msg is None:
+                continue
+            parts = []
+            for part in msg.parts:
+                if part.element:
+                    parts.append(f"{part.name} -> element {local_name(part.element)} {json.dumps(converter.element_ref(part.element))}")
+                elif part.type:
+                    parts.append(f"{part.name} -> type {local_name(part.type)} {json.dumps(converter.type_ref(part.type))}")
+            lines.append(f"{label} message {msg.name}: " + "; ".join(parts))
+
+        if converter.components:
+            lines.append("JSON Schemas (components.schemas):")
+            lines.append(json.dumps(converter.components, separators=(",", ":")))
+        slices.append(OperationSlice(name=op.name, excerpt="\n".join(lines)))
+    return slices
+
+
+def build_operation_prompt(target_stack, op_slice: OperationSlice, rest_prefs, fedex_context):
+    return f"""
+Target stack:
+{target_stack}
+
+REST preferences:
+{rest_prefs}
+
+AUTHORITATIVE FEDEX REFERENCE (uploaded files; treat as source of truth):
+{fedex_context}
+
+SOAP operation:
+{op_slice.excerpt}
+
+Task:
+Design the REST equivalent of this single operation and produce OpenAPI 3.0 YAML.
+"""
+
+
+def _design_one(client, model, op_slice: OperationSlice, target_stack, rest_prefs, fedex_context, cache, bypass_cache) -> OperationDesign:
+    prompt = build_operation_prompt(target_stack, op_slice, rest_prefs, fedex_context)
+    try:
+        text = gemini_generate(client, model, OPERATION_DESIGN_SYSTEM_PROMPT, prompt, cache=cache, bypass_cache=bypass_cache)
+    except Exception as e:
+        return OperationDesign(name=op_slice.name, output="", error=str(e))
+    return OperationDesign(name=op_slice.name, output=text)
+
+
+def _design_all(client, model, slices, target_stack, rest_prefs, fedex_context, concurrency, cache, bypass_cache) -> list[OperationDesign]:
+    # Threads on the sync client rather than asyncio on client.aio: the
+    # client is shared process-wide, and its asyncio side belongs to the event
+    # loop that first used it, not to one asyncio.run per conversion from
+    # several CLI threads.
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="design") as pool:
+        # A context copy per call, so the spans land in the caller's trace.
+        futures = [
+            pool.submit(
+                contextvars.copy_context().run,
+                _design_one, client, model, s, target_stack, rest_prefs, fedex_context, cache, bypass_cache,
+            )
+            for s in slices
+        ]
+        return [f.result() for f in futures]
+
+
+def merge_openapi_fragments(fragments: list[tuple[str, dict]], title: str) -> tuple[dict, list[str]]:
+    """
+    Merges per-operation OpenAPI documents. First definition wins; clashes are
+    reported rather than silently overwritten.
+    """
+    merged = {"openapi": "3.0.3", "info": {"title": title, "version": "1.0.0"}, "paths": {}, "components": {}}
+    notes = []
+    for op_name, doc in fragments:
+        if "servers" in doc and "servers" not in merged:
+            merged["servers"] = doc["servers"]
+        for path, item in (doc.get("paths") or {}).items():
+            target = merged["paths"].setdefault(path, {})
+            for method, operation in (item or {}).items():
+                if method in target:
+                    notes.append(f"{op_name}: {method.upper()} {path} already defined by another operation; kept the first")
+                    continue
+                target[method] = operation
+        for section, entries in (doc.get("components") or {}).items():
+            target = merged["components"].setdefault(section, {})
+            for name, value in (entries or {}).items():
+                if name in target and target[name] != value:
+                    notes.append(f"{op_name}: components.{section}.{name} differs from another operation's; kept the first")
+                    continue
+                target.setdefault(name, value)
+    return merged, notes
+
+
+def design_per_operation(
+    client,
+    model: str,
+    soap_model: WsdlModel,
+    target_stack,
+    rest_prefs,
+    fedex_context,
+    concurrency: int = 4,
+    cache=None,
+    bypass_cache: bool = False,
+) -> tuple[str, str]:
+    """
+    Returns (design_output, openapi_yaml) built from concurrent per-operation calls.
+    """
+    slices = operation_slices(soap_model)
+    designs = _design_all(client, model, slices, target_stack, rest_prefs, fedex_context, concurrency, cache, bypass_cache)
+
+    fragments, notes, sections = [], [], []
+    for d in designs:
+        if d.error:
+            notes.append(f"{d.name}: design call failed ({d.error})")
+            continue
+        op_notes, section = split_openapi_section(d.output)
+        sections.append(f"### Operation: {d.name}\n{op_notes}")
+        if section is None:
+            notes.append(f"{d.name}: no OpenAPI section in the output")
+            continue
+        try:
+            doc = load_yaml(strip_code_fence(section))
+        except Exception as e:
+            notes.append(f"{d.name}: OpenAPI fragment didn't parse ({e})")
+            continue
+        if isinstance(doc, dict):
+            fragments.append((d.name, doc))
+        else:
+            notes.append(f"{d.name}: OpenAPI fragment is not a mapping")
+
+    service = next(iter(soap_model.services.values()), None)
+    merged, merge_notes = merge_openapi_fragments(fragments, (service.name if service else None) or soap_model.name or "Converted SOAP service")
+    notes.extend(merge_notes)
+
+    openapi_yaml = to_yaml(merged)
+    parts = sections
+    if notes:
+        parts.append("### Merge notes\n" + "\n".join(f"- {n}" for n in notes))
+    parts.append(f"6) OpenAPI 3.0 YAML\n```yaml\n{openapi_yaml.rstrip()}\n```")
+    return "\n\n".join(parts), openapi_yaml
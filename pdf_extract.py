@@ -0,0 +1,131 @@
+"""
+PDF text extraction. Large PDFs are split into page ranges and extracted in a
+process pool (pypdf is pure Python and CPU-bound).
+"""
+import importlib.util
+import io
+import math
+import os
+import time
+
+# Optional: only needed if you want PDF support
+# pip install pypdf
+# Only looked up here; pypdf is imported when the first PDF is parsed.
+HAS_PDF = importlib.util.find_spec("pypdf") is not None
+
+
+PDF_WORKERS = int(os.getenv("SOAP2REST_PDF_WORKERS", "0")) or (os.cpu_count() or 1)
+# Seconds per page a worker has to get through; the pool path turns this into
+# one deadline for the whole document, not a limit on each page.
+PDF_DEADLINE_PER_PAGE = float(os.getenv("SOAP2REST_PDF_DEADLINE_PER_PAGE", "20"))
+
+# Below this many pages the pool start-up costs more than it saves.
+PARALLEL_MIN_PAGES = 16
+
+_worker_reader = None
+
+
+def _pdf_reader(file_bytes: bytes):
+    from pypdf import PdfReader
+
+    return PdfReader(io.BytesIO(file_bytes))
+
+
+def _init_worker(file_bytes: bytes) -> None:
+    global _worker_reader
+    _worker_reader = _pdf_reader(file_bytes)
+
+
+def _page_text(page) -> tuple[str, bool]:
+    try:
+        return page.extract_text() or "", True
+    except Exception as e:
+        return f"[Page text extraction failed: {e}]", False
+
+
+def _extract_range(start: int, end: int) -> list[tuple[int, str, bool]]:
+    return [(i, *_page_text(_worker_reader.pages[i])) for i in range(start, end)]
+
+
+def _format_pages(pages) -> str:
+    out = []
+    for i, txt in pages:
+        if txt.strip():
+            out.append(f"\n\n--- PDF PAGE {i+1} ---\n{txt}")
+    return "\n".join(out).strip()
+
+
+def iter_pdf_pages(file_bytes: bytes):
+    """
+    Yields the text of each non-empty page in order, with the same
+    `--- PDF PAGE n ---` markers, one page at a time in this process.
+    """
+    reader = _pdf_reader(file_bytes)
+    for i, page in enumerate(reader.pages):
+        txt, _ok = _page_text(page)
+        if txt.strip():
+            yield f"\n\n--- PDF PAGE {i+1} ---\n{txt}"
+
+
+def extract_pdf_text(file_bytes: bytes, workers: int | None = None, deadline_per_page: float | None = None) -> tuple[str, int]:
+    """
+    Returns the text of every non-empty page, in page order, with
+    `--- PDF PAGE n ---` markers, and the number of pages that failed or timed
+    out. Those pages are replaced by a short bracketed note instead of failing
+    the whole document; callers shouldn't cache such a result.
+
+    In the pool, deadline_per_page buys the whole document one deadline:
+    deadline_per_page times the pages each worker has to get through. It is
+    not a per-page limit; one stuck page may use the whole budget, and the
+    ranges still unfinished at the deadline are reported as timed out.
+    """
+    workers = PDF_WORKERS if workers is None else workers
+    deadline_per_page = PDF_DEADLINE_PER_PAGE if deadline_per_page is None else deadline_per_page
+
+    reader = _pdf_reader(file_bytes)
+    n = len(reader.pages)
+    if workers <= 1 or n < PARALLEL_MIN_PAGES:
+        pages = [(i, *_page_text(page)) for i, page in enumerate(reader.pages)]
+        return _format_pages((i, txt) for i, txt, _ok in pages), sum(not ok for _i, _txt, ok in pages)
+
+    # Small ranges so one slow page only holds up a few neighbours.
+    step = max(1, math.ceil(n / (workers * 4)))
+    ranges = [(start, min(n, start + step)) for start in range(0, n, step)]
+
+    # Imported here: it pulls in multiprocessing, and most PDFs never need it.
+    # multiprocessing.Pool rather than ProcessPoolExecutor: terminate() is the
+    # public way to stop a worker stuck on a page.
+    from multiprocessing import Pool, TimeoutError as PoolTimeout
+
+    pages: dict[int, str] = {}
+    failed = 0
+    timed_out = False
+    pool = Pool(processes=workers, initializer=_init_worker, initargs=(file_bytes,))
+    try:
+        results = [((start, end), pool.apply_async(_extract_range, (start, end))) for start, end in ranges]
+        # One deadline from submission; waiting on one range doesn't restart
+        # the clock for the ranges queued behind it.
+        deadline = time.monotonic() + deadline_per_page * math.ceil(n / workers)
+        for (start, end), res in results:
+            try:
+                for i, txt, ok in res.get(timeout=max(0.0, deadline - time.monotonic())):
+                    pages[i] = txt
+                    failed += not ok
+            except PoolTimeout:
+                timed_out = True
+                failed += end - start
+                for i in range(start, end):
+                    pages[i] = f"[Page text extraction timed out (document deadline, {deadline_per_page:g}s per page)]"
+            except Exception as e:
+                failed += end - start
+                for i in range(start, end):
+                    pages[i] = f"[Page text extraction failed: {e}]"
+    finally:
+        # A page that timed out may never finish; don't leave its process behind.
+        if timed_out:
+            pool.terminate()
+        else:
+            pool.close()
+        pool.join()
+
+    return _format_pages(sorted(pages.items())), failed
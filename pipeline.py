@@ -0,0 +1,430 @@
+"""
+Conversion steps shared by the Streamlit UI (app.py) and the batch CLI
+(soap2rest.py): SOAP hints, FedEx reference retrieval and the prompts.
+"""
+import io
+import os
+import re
+import json
+import xml.etree.ElementTree as ET
+
+from disk_cache import CACHE_DIR, DiskCache, content_key
+from openapi_chunker import openapi_to_text, unit_spans
+from pdf_extract import HAS_PDF, extract_pdf_text, iter_pdf_pages
+from retrieval import chunk_spans, fingerprint, get_index, iter_chunks, materialize, prepare_query, stream_top_k
+from token_budget import pack_chunks
+from tracing import span
+from wsdl_parser import parse_wsdl
+
+
+# ------------------------------------------------------------
+# 1) SOAP hints
+# ------------------------------------------------------------
+def _extract_soap_hints_regex(text: str, hints: dict) -> dict:
+    # Fallback for input that isn't well-formed XML (code, several pasted messages, ...).
+    t = text.lower()
+    hints["has_wsdl"] = "wsdl" in t or "definitions" in t
+    hints["has_soap_envelope"] = "soap:envelope" in t or "<envelope" in t
+
+    ns = re.findall(r'xmlns:([a-zA-Z0-9_]+)=["\']([^"\']+)["\']', text)
+    hints["namespaces"] = list(dict.fromkeys(f"{pfx}={uri}" for pfx, uri in ns))
+
+    ops = re.findall(r'operation\s+name=["\']([^"\']+)["\']', text)
+    hints["possible_operations"] = list(dict.fromkeys(ops))
+
+    return hints
+
+
+def parse_soap_model(text: str):
+    """
+    Returns the parsed WsdlModel, or None if the text isn't well-formed XML.
+    """
+    with span("soap.parse", bytes_in=len(text.encode("utf-8"))) as s:
+        try:
+            model = parse_wsdl(text)
+        except ET.ParseError:
+            s.attrs["result"] = "not xml"
+            return None
+        s.attrs["operations"] = len(model.operations())
+        return model
+
+
+# Default for extract_soap_hints: None already means "parsed, not XML".
+_UNPARSED = object()
+
+
+def extract_soap_hints(text: str, model=_UNPARSED) -> dict:
+    """
+    `model` is the result of parse_soap_model, if the caller already has it.
+    """
+    hints = {
+        "has_wsdl": False,
+        "has_soap_envelope": False,
+        "possible_operations": [],
+        "namespaces": [],
+    }
+
+    if not text:
+        return hints
+
+    if model is _UNPARSED:
+        model = parse_soap_model(text)
+    with span("soap.hints", bytes_in=len(text.encode("utf-8"))) as s:
+        if model is None:
+            s.attrs["result"] = "regex fallback"
+            return _extract_soap_hints_regex(text, hints)
+
+        hints["has_wsdl"] = model.is_wsdl
+        hints["has_soap_envelope"] = model.is_soap_envelope
+        hints["namespaces"] = [f"{pfx}={uri}" for pfx, uri in model.namespaces]
+        hints["possible_operations"] = model.operation_names()
+        return hints
+
+
+# ------------------------------------------------------------
+# 2) Read uploaded FedEx docs/specs into text (NO SCRAPING)
+# ------------------------------------------------------------
+PDF_MISSING_NOTE = "[PDF upload received, but pypdf is not installed. Install pypdf to parse PDFs.]"
+
+
+def _read_pdf_bytes_to_text(file_bytes: bytes) -> tuple[str, bool]:
+    """
+    Returns the text and whether every page was read. Partial text (failed or
+    timed-out pages, an unreadable file) is still used, but not cached.
+    """
+    try:
+        text, failed_pages = extract_pdf_text(file_bytes)
+    except Exception as e:
+        return f"[Failed to parse PDF: {e}]", False
+    return text, not failed_pages
+
+
+# Bump when the text produced for an upload changes, to invalidate cached parses.
+UPLOAD_PARSER_VERSION = "4"
+
+upload_cache = DiskCache(
+    os.path.join(CACHE_DIR, "uploads"),
+    max_bytes=int(os.getenv("SOAP2REST_UPLOAD_CACHE_MB", "512")) * 1024 * 1024,
+)
+
+
+def _upload_kind(name: str) -> str:
+    if name.endswith(".pdf"):
+        return "pdf"
+    if name.endswith(".json"):
+        return "json"
+    if name.endswith((".yaml", ".yml")):
+        return "yaml"
+    return "text"
+
+
+def _parse_upload_bytes(kind: str, display_name: str, raw: bytes) -> tuple[str, bool]:
+    """
+    Returns the text and whether it may be cached.
+    """
+    # PDF
+    if kind == "pdf":
+        return _read_pdf_bytes_to_text(raw)
+
+    # Text-ish
+    try:
+        text = raw.decode("utf-8", errors="ignore")
+    except Exception:
+        return f"[Could not decode {display_name} as text.]", True
+
+    # OpenAPI specs: one unit per operation / component instead of word windows
+    if kind in ("json", "yaml"):
+        units = openapi_to_text(text)
+        if units is not None:
+            return units, True
+
+    # Other JSON on one line; indentation only costs tokens
+    if kind == "json":
+        try:
+            return json.dumps(json.loads(text), ensure_ascii=False), True
+        except Exception:
+            return text, True
+
+    return text, True
+
+
+def read_uploaded_file_to_text(uploaded) -> str:
+    """
+    Supports:
+      - .json (OpenAPI, sample payloads, etc.)
+      - .yaml/.yml (OpenAPI)
+      - .txt/.md (notes)
+      - .pdf (optional, if pypdf installed)
+
+    Parsed text is cached on disk by SHA-256 of the raw bytes + parser version,
+    so re-uploads and reruns skip the parse.
+    """
+    kind = _upload_kind(uploaded.name.lower())
+    raw = uploaded.getvalue()
+
+    with span("upload.read", bytes_in=len(raw), file=uploaded.name) as s:
+        # Don't cache the "pypdf missing" placeholder; it depends on the environment.
+        if kind == "pdf" and not HAS_PDF:
+            return PDF_MISSING_NOTE
+
+        key = content_key(raw, kind, UPLOAD_PARSER_VERSION)
+        cached = upload_cache.get_text(key)
+        if cached is not None:
+            s.attrs["cache"] = "hit"
+            s.bytes_out = len(cached.encode("utf-8"))
+            return cached
+
+        text, cacheable = _parse_upload_bytes(kind, uploaded.name, raw)
+        if cacheable:
+            upload_cache.set_text(key, text)
+        else:
+            # Failed or timed-out pages may read fine next time.
+            s.attrs["cache"] = "skipped (incomplete)"
+        s.bytes_out = len(text.encode("utf-8"))
+        return text
+
+
+def chunk_text(text: str, chunk_size: int = 900, overlap: int = 120) -> list[str]:
+    return [materialize(text, start, end) for start, end in chunk_spans(text, chunk_size, overlap)]
+
+
+def _iter_upload_docs(uploads):
+    for up in uploads:
+        text = read_uploaded_file_to_text(up)
+        if not text.strip():
+            continue
+        yield up.name, text, unit_spans(text)
+
+
+# Upload sets at least this large skip the cached index and are ranked in one
+# streaming pass, so memory doesn't grow with the size of the uploads.
+STREAM_MIN_BYTES = int(os.getenv("SOAP2REST_STREAM_MIN_MB", "64")) * 1024 * 1024
+# Candidates kept for token-budget packing in streaming mode.
+STREAM_POOL_SIZE = 64
+TEXT_SEGMENT_CHARS = 64 * 1024
+
+
+def _iter_upload_segments(uploaded, kind: str):
+    """
+    Text of a PDF or text upload in pieces: a page at a time for PDFs,
+    TEXT_SEGMENT_CHARS decoded at a time otherwise. Nothing here goes through
+    the upload cache, which stores whole texts.
+    """
+    raw = uploaded.getvalue()
+    if kind == "pdf":
+        if not HAS_PDF:
+            yield PDF_MISSING_NOTE
+            return
+        try:
+            yield from iter_pdf_pages(raw)
+        except Exception as e:
+            yield f"[Failed to parse PDF: {e}]"
+        return
+
+    reader = io.TextIOWrapper(io.BytesIO(raw), encoding="utf-8", errors="ignore")
+    while True:
+        segment = reader.read(TEXT_SEGMENT_CHARS)
+        if not segment:
+            return
+        yield segment
+
+
+def _stream_upload_chunks(uploads):
+    """
+    (source, chunk) pairs, one upload at a time. PDFs and text files are
+    chunked as they are read, holding one page or segment and one window.
+    JSON/YAML has to be parsed whole anyway, so it is read with
+    read_uploaded_file_to_text like on the indexed path (upload cache,
+    OpenAPI units, compact JSON) and only one such text is held at once.
+    """
+    for up in uploads:
+        kind = _upload_kind(up.name.lower())
+        if kind in ("json", "yaml"):
+            text = read_uploaded_file_to_text(up)
+            spans = unit_spans(text)
+            if spans:
+                for start, end, _key, _deps in spans:
+                    yield up.name, materialize(text, start, end)
+                continue
+            segments = [text]
+        else:
+            segments = _iter_upload_segments(up, kind)
+        for ch in iter_chunks(segments):
+            yield up.name, ch
+
+
+def _upload_index(uploads, upload_bytes: int):
+    # Reading and chunking happen here on an index cache miss.
+    with span("retrieval.index", bytes_in=upload_bytes) as s:
+        key = fingerprint((up.name, up.getvalue()) for up in uploads)
+        index = get_index(key, lambda: _iter_upload_docs(uploads))
+        s.attrs["chunks"] = len(index)
+    return index
+
+
+def warm_upload_index(uploads) -> None:
+    """
+    Builds the cached index for an upload set ahead of its first query, e.g.
+    before several workers share it. Sets that are streamed have no index,
+    so nothing is read for them.
+    """
+    upload_bytes = sum(up.size for up in uploads)
+    if uploads and upload_bytes < STREAM_MIN_BYTES:
+        _upload_index(uploads, upload_bytes)
+
+
+def build_fedex_context_from_uploads(uploads, user_input, top_k: int = 6, token_budget: int | None = None, stats: dict | None = None) -> str:
+    """
+    Creates a small “context pack” by:
+      - reading all uploaded docs/specs into text
+      - chunking and indexing them (once per upload set); OpenAPI specs are
+        chunked per operation / component, and a picked operation brings the
+        schemas it references
+      - BM25-ranking chunks vs user_input (SOAP text or a prepared RetrievalQuery)
+      - returning top_k chunks with file source labels, or, with token_budget,
+        greedily packing the best chunks that fit the budget
+
+    Upload sets over STREAM_MIN_BYTES are instead streamed file -> page ->
+    chunk -> score into a bounded heap, without building an index.
+
+    Packing statistics are written into `stats` when given.
+    """
+    if not uploads:
+        return ""
+
+    query = prepare_query(user_input)
+    upload_bytes = sum(up.size for up in uploads)
+    streaming = upload_bytes >= STREAM_MIN_BYTES
+    if streaming:
+        pool_size = top_k if token_budget is None else STREAM_POOL_SIZE
+        with span("retrieval.stream_rank", bytes_in=upload_bytes):
+            ranked = stream_top_k(_stream_upload_chunks(uploads), query, pool_size)
+    else:
+        index = _upload_index(uploads, upload_bytes)
+
+    with span("retrieval.rank") as s:
+        if token_budget is None:
+            picked = ranked if streaming else index.search(query, top_k=top_k)
+        else:
+            picked, pack_stats = pack_chunks(ranked if streaming else index.iter_ranked(query), token_budget)
+            if stats is not None:
+                stats.update(pack_stats, retrieval="streaming" if streaming else "index")
+
+        out = []
+        for _score, fname, ch in picked:
+            out.append(f"[SOURCE FILE: {fname}]\n{ch}")
+        context = "\n\n---\n\n".join(out)
+        s.attrs["chunks"] = len(picked)
+        s.bytes_out = len(context.encode("utf-8"))
+    return context
+
+
+# ------------------------------------------------------------
+# 3) Prompts
+# ------------------------------------------------------------
+DESIGN_SYSTEM_PROMPT = """
+You are a migration assistant converting SOAP services to REST APIs.
+
+Rules:
+- First produce an OpenAPI 3.0 specification (YAML).
+- Then describe REST endpoints, schemas, and errors.
+- Provide a SOAP → REST mapping table.
+- Map SOAP Faults to HTTP status codes with a JSON error body.
+- If something is missing, list assumptions explicitly.
+- Prefer correctness and clarity over verbosity.
+
+Output sections (exact order):
+1) Assumptions
+2) REST Endpoints
+3) JSON Schemas
+4) Error Model
+5) SOAP → REST Mapping Table
+6) OpenAPI 3.0 YAML
+"""
+
+CODE_SYSTEM_PROMPT = """
+You are a code generator.
+
+Given an OpenAPI 3.0 YAML and migration notes:
+- Generate ONLY a client (NO server code)
+- Include TODOs for business logic
+- Include example requests
+
+Rules:
+- Code must match the OpenAPI exactly
+- No secrets or API keys in code
+- Keep code minimal but runnable
+
+Output sections:
+1) Client Skeleton
+2) Example Requests
+3) Validation Notes & Tests
+"""
+
+
+def build_design_prompt(target_stack, soap_text, hints, rest_prefs, fedex_context):
+    return f"""
+Target stack:
+{target_stack}
+
+REST preferences:
+{rest_prefs}
+
+AUTHORITATIVE FEDEX REFERENCE (uploaded files; treat as source of truth):
+{fedex_context}
+
+SOAP / WSDL / XML / Code:
+{soap_text}
+
+Extracted hints:
+- has_wsdl: {hints['has_wsdl']}
+- has_soap_envelope: {hints['has_soap_envelope']}
+- namespaces: {hints['namespaces']}
+- possible_operations: {hints['possible_operations']}
+
+Task:
+Design a REST API equivalent and produce OpenAPI 3.0 YAML.
+"""
+
+
+def build_refine_prompt(target_stack, compiled_yaml, hints, rest_prefs, fedex_context):
+    return f"""
+Target stack:
+{target_stack}
+
+REST preferences:
+{rest_prefs}
+
+AUTHORITATIVE FEDEX REFERENCE (uploaded files; treat as source of truth):
+{fedex_context}
+
+OpenAPI 3.0 YAML compiled mechanically from the WSDL:
+{compiled_yaml}
+
+Extracted hints:
+- namespaces: {hints['namespaces']}
+- possible_operations: {hints['possible_operations']}
+
+Task:
+Refine this compiled design. Keep every operationId, schema and the error model;
+improve resource naming, descriptions and examples where the reference supports it,
+and produce the full OpenAPI 3.0 YAML.
+"""
+
+
+def build_code_prompt(target_stack, openapi_yaml, design_output, fedex_context):
+    return f"""
+Target stack:
+{target_stack}
+
+AUTHORITATIVE FEDEX REFERENCE (uploaded files; treat as source of truth):
+{fedex_context}
+
+OpenAPI 3.0 YAML:
+{openapi_yaml}
+
+Design notes:
+{design_output}
+
+Generate ONLY the client code (no server).
+"""
@@ -0,0 +1,202 @@
+"""
+Client-side rate limiting and retries for Gemini calls.
+
+One limiter per model, shared by every thread and session in the process:
+a requests/min and a tokens/min token bucket. Calls that fail with a quota
+or transient server error (429, 5xx), or a connection error or timeout
+(builtin or httpx, which google-genai sends requests through), are retried
+with exponential backoff and full jitter, or after the server's retry-after
+hint when it gives one (capped at BACKOFF_MAX_SECONDS). Time spent waiting
+is counted so the UI and CLI can report it.
+"""
+import json
+import math
+import os
+import random
+import re
+import sys
+import threading
+import time
+
+
+# Requests and tokens per minute (paid tier 1 defaults). 0 disables a bucket.
+# Override with SOAP2REST_RATE_LIMITS='{"gemini-2.5-flash": {"rpm": 500, "tpm": 500000}}'.
+MODEL_RATE_LIMITS = {
+    "gemini-2.5-flash": {"rpm": 1_000, "tpm": 1_000_000},
+    "gemini-2.5-flash-lite": {"rpm": 4_000, "tpm": 4_000_000},
+}
+DEFAULT_RATE_LIMITS = {"rpm": 1_000, "tpm": 1_000_000}
+MODEL_RATE_LIMITS.update(json.loads(os.getenv("SOAP2REST_RATE_LIMITS", "{}")))
+
+MAX_RETRIES = int(os.getenv("SOAP2REST_LLM_MAX_RETRIES", "5"))
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+RETRY_DELAY_RE = re.compile(r"retryDelay['\"]?\s*:\s*['\"]([0-9.]+)s")
+
+
+class TokenBucket:
+    """
+    Refills at per_minute / 60 per second up to per_minute. reserve() takes
+    the amount immediately (the level may go negative) and returns how long
+    the caller has to wait before using it, so waiting happens outside the lock.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float) -> float:
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            self._refill()
+            self.level -= min(amount, self.capacity)
+            return 0.0 if self.level >= 0 else -self.level / self.rate
+
+    def charge(self, amount: float) -> None:
+        """
+        Takes amount without waiting (e.g. output tokens known only afterwards).
+        """
+        if self.rate <= 0 or amount <= 0:
+            return
+        with self._lock:
+            self._refill()
+            self.level = max(-self.capacity, self.level - amount)
+
+
+class RateLimiter:
+    def __init__(self, rpm: float, tpm: float):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.throttled = 0
+        self.throttle_wait = 0.0
+        self.retries = 0
+        self.backoff_wait = 0.0
+
+    def _reserve(self, tokens: int) -> float:
+        wait = max(self.requests.reserve(1), self.tokens.reserve(tokens))
+        with self._lock:
+            self.calls += 1
+            if wait > 0:
+                self.throttled += 1
+                self.throttle_wait += wait
+        return wait
+
+    def acquire(self, tokens: int) -> None:
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    def record_usage(self, estimated: int, actual: int | None) -> None:
+        if actual:
+            self.tokens.charge(actual - estimated)
+
+    def record_retry(self, delay: float) -> None:
+        with self._lock:
+            self.retries += 1
+            self.backoff_wait += delay
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "throttled": self.throttled,
+                "throttle_wait_s": round(self.throttle_wait, 3),
+                "retries": self.retries,
+                "backoff_wait_s": round(self.backoff_wait, 3),
+            }
+
+
+_LIMITERS: dict[str, RateLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def limiter_for(model: str) -> RateLimiter:
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS.get(model)
+        if limiter is None:
+            limits = {**DEFAULT_RATE_LIMITS, **MODEL_RATE_LIMITS.get(model, {})}
+            limiter = _LIMITERS[model] = RateLimiter(limits["rpm"], limits["tpm"])
+        return limiter
+
+
+def limiter_stats() -> dict:
+    with _LIMITERS_LOCK:
+        return {model: limiter.stats() for model, limiter in _LIMITERS.items()}
+
+
+def _status_code(exc: Exception) -> int | None:
+    for obj in (exc, getattr(exc, "response", None)):
+        for attr in ("code", "status_code"):
+            value = getattr(obj, attr, None)
+            if isinstance(value, int):
+                return value
+    return None
+
+
+def retry_after_seconds(exc: Exception) -> float | None:
+    """
+    The server's hint: a Retry-After header, or RetryInfo.retryDelay ("12s")
+    in the error details.
+    """
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if headers is not None:
+        try:
+            return float(headers.get("retry-after"))
+        except (TypeError, ValueError):
+            pass
+    m = RETRY_DELAY_RE.search(f"{getattr(exc, 'details', '')} {exc}")
+    return float(m.group(1)) if m else None
+
+
+def _is_transport_error(exc: Exception) -> bool:
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    # httpx's ConnectError / ReadTimeout don't derive from the builtins. Looked
+    # up rather than imported: if httpx raised it, httpx is already loaded.
+    httpx = sys.modules.get("httpx")
+    return httpx is not None and isinstance(exc, httpx.TransportError)
+
+
+def retry_delay(exc: Exception, attempt: int) -> float | None:
+    """
+    Seconds to wait before retry number attempt + 1, or None if exc isn't
+    retryable or the retries are used up.
+    """
+    if attempt >= MAX_RETRIES:
+        return None
+    if not (_status_code(exc) in RETRYABLE_STATUS or _is_transport_error(exc)):
+        return None
+    hint = retry_after_seconds(exc)
+    if hint is not None and not math.isnan(hint):
+        # Capped so a bogus header can't park the worker; small jitter so
+        # callers told the same delay don't return together.
+        return min(max(hint, 0.0), BACKOFF_MAX_SECONDS) + random.uniform(0, BACKOFF_BASE_SECONDS)
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2**attempt))
+
+
+def call_with_retries(limiter: RateLimiter, tokens: int, call):
+    attempt = 0
+    while True:
+        limiter.acquire(tokens)
+        try:
+            return call()
+        except Exception as e:
+            delay = retry_delay(e, attempt)
+            if delay is None:
+                raise
+        limiter.record_retry(delay)
+        time.sleep(delay)
+        attempt += 1
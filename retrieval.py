@@ -0,0 +1,441 @@
+"""
+Ranking of uploaded FedEx reference chunks against the SOAP input.
+
+An inverted index (term -> postings with term frequencies) is built once per
+upload set and kept in a small in-process LRU, so reruns and repeated Convert
+clicks only pay for the query.
+
+Chunks are not stored as strings: each one is a (doc_id, start, end) span into
+its document's text, held in flat arrays, and only the chunks that are
+actually returned get materialized. Documents may bring their own unit spans
+(e.g. one per OpenAPI operation or schema) with the units they depend on.
+
+For upload sets too large to index, stream_top_k scores chunks one at a time
+from generators and keeps only a bounded heap of the best ones.
+"""
+import functools
+import hashlib
+import heapq
+import math
+import re
+import threading
+from array import array
+from collections import Counter, OrderedDict
+
+from aho_corasick import AhoCorasick
+
+
+TOKEN_RE = re.compile(r"[a-zA-Z0-9_/-]{3,}")
+WORD_RE = re.compile(r"\S+")
+
+CHUNK_SIZE = 900
+CHUNK_OVERLAP = 120
+
+# FedEx vocabulary used as term weights inside the index. A boost term found in
+# both the chunk and the query adds `weight` (BM25-saturated); found only in the
+# chunk it adds a flat BOOST_CHUNK_ONLY bonus.
+FEDEX_BOOST_TERMS = {
+    "oauth": 3.0,
+    "client_credentials": 3.0,
+    "bearer": 3.0,
+    "token": 3.0,
+    "authorization": 3.0,
+    "ship": 3.0,
+    "shipment": 3.0,
+    "label": 3.0,
+    "tracking": 3.0,
+    "accountnumber": 3.0,
+    "meter": 3.0,
+    "serviceType": 3.0,
+    "packagingType": 3.0,
+    "requestedShipment": 3.0,
+    "/ship/v1": 3.0,
+    "/shipments": 3.0,
+    "rate limit": 3.0,
+    "429": 3.0,
+}
+BOOST_CHUNK_ONLY = 0.5
+
+# Matching is case-insensitive; the camelCase spelling above is for readability.
+BOOST_WEIGHTS = {term.lower(): weight for term, weight in FEDEX_BOOST_TERMS.items()}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+INDEX_CACHE_SIZE = 4
+QUERY_CACHE_SIZE = 8
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+def chunk_spans(text: str, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP):
+    """
+    Yields (start, end) character offsets of overlapping windows of
+    chunk_size words. Word offsets are kept in arrays, not as word strings.
+    """
+    starts = array("Q")
+    ends = array("Q")
+    for m in WORD_RE.finditer(text):
+        starts.append(m.start())
+        ends.append(m.end())
+
+    n = len(starts)
+    step = max(1, chunk_size - overlap)
+    for i in range(0, n, step):
+        yield starts[i], ends[min(i + chunk_size, n) - 1]
+
+
+def materialize(text: str, start: int, end: int) -> str:
+    # Same whitespace normalization the old word-list chunker produced.
+    return " ".join(text[start:end].split())
+
+
+def iter_words(segments):
+    """
+    Words of a text that arrives in pieces (pages, reads); a word split
+    across two pieces is joined back.
+    """
+    carry = ""
+    for segment in segments:
+        if carry:
+            segment = carry + segment
+        words = segment.split()
+        carry = words.pop() if words and not segment[-1].isspace() else ""
+        yield from words
+    if carry:
+        yield carry
+
+
+def iter_chunks(segments, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP):
+    """
+    Same windows as chunk_spans + materialize, holding at most chunk_size words.
+    """
+    step = max(1, chunk_size - overlap)
+    window: list[str] = []
+    for word in iter_words(segments):
+        window.append(word)
+        if len(window) == chunk_size:
+            yield " ".join(window)
+            del window[:step]
+    # Windows that start before the end but never filled up.
+    while window:
+        yield " ".join(window)
+        del window[:step]
+
+
+class RetrievalQuery:
+    """
+    The SOAP input preprocessed once per conversion: normalized term set and
+    the FedEx boost terms it mentions (with their weights). Build it with
+    prepare_query() and pass it to ChunkIndex / score_chunk.
+    """
+
+    def __init__(self, text: str, digest: str):
+        q = text.lower()
+        self.digest = digest
+        self.terms: frozenset[str] = frozenset(TOKEN_RE.findall(q))
+        self.boost_weights: dict[str, float] = {b: w for b, w in BOOST_WEIGHTS.items() if b in q}
+
+    @functools.cached_property
+    def matcher(self) -> AhoCorasick:
+        # Only score_chunk needs it; the index looks terms up in its postings.
+        return AhoCorasick(self.terms | BOOST_WEIGHTS.keys())
+
+
+_QUERY_CACHE: "OrderedDict[str, RetrievalQuery]" = OrderedDict()
+# The batch CLI converts from several threads; OrderedDict moves and evictions
+# aren't safe to interleave.
+_QUERY_LOCK = threading.Lock()
+
+
+def prepare_query(query) -> RetrievalQuery:
+    """
+    Returns the RetrievalQuery for `query` (text or an existing RetrievalQuery),
+    reusing the one cached for the same content hash across reruns.
+    """
+    if isinstance(query, RetrievalQuery):
+        return query
+    digest = hashlib.sha256(query.encode("utf-8")).hexdigest()
+    with _QUERY_LOCK:
+        prepared = _QUERY_CACHE.get(digest)
+        if prepared is not None:
+            _QUERY_CACHE.move_to_end(digest)
+            return prepared
+    # Built outside the lock; two threads racing on the same text both get an
+    # equivalent query, and the first one stored is kept.
+    prepared = RetrievalQuery(query, digest)
+    with _QUERY_LOCK:
+        prepared = _QUERY_CACHE.setdefault(digest, prepared)
+        _QUERY_CACHE.move_to_end(digest)
+        while len(_QUERY_CACHE) > QUERY_CACHE_SIZE:
+            _QUERY_CACHE.popitem(last=False)
+    return prepared
+
+
+class ChunkIndex:
+    """
+    BM25 index over chunk spans of (source, text) documents.
+
+    Boost terms may be phrases or path fragments ("rate limit", "/ship/v1"), so
+    they are counted as substrings into a separate postings field rather than
+    going through the tokenizer.
+    """
+
+    def __init__(self):
+        self.sources: list[str] = []
+        self.texts: list[str] = []
+        self.span_doc = array("I")
+        self.span_start = array("Q")
+        self.span_end = array("Q")
+        self.doc_len = array("I")
+        # Unit chunks only: (doc_id, unit key) -> chunk_id, chunk_id -> keys it depends on.
+        self.unit_ids: dict[tuple[int, str], int] = {}
+        self.unit_deps: dict[int, tuple[str, ...]] = {}
+        self.postings: dict[str, list[tuple[int, int]]] = {}
+        self.boost_postings: dict[str, list[tuple[int, int]]] = {}
+        self.avgdl = 0.0
+
+    @classmethod
+    def build(cls, docs, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP) -> "ChunkIndex":
+        """
+        docs: (source, text, units) triples. units is a list of
+        (start, end, key, deps) spans, or empty to chunk text into word windows.
+        """
+        index = cls()
+        for source, text, units in docs:
+            index._add_doc(source, text, units, chunk_size, overlap)
+        n = len(index)
+        index.avgdl = (sum(index.doc_len) / n) if n else 0.0
+        return index
+
+    def _add_doc(self, source: str, text: str, units, chunk_size: int, overlap: int) -> None:
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # A few non-ASCII characters change length when lowercased; leave
+            # those alone so offsets into the lowered copy match the text.
+            lowered = "".join(c if len(c.lower()) != 1 else c.lower() for c in text)
+        doc_id = len(self.texts)
+        self.sources.append(source)
+        self.texts.append(text)
+
+        if units:
+            spans = []
+            for start, end, key, deps in units:
+                self.unit_ids[(doc_id, key)] = len(self.span_doc) + len(spans)
+                if deps:
+                    self.unit_deps[len(self.span_doc) + len(spans)] = tuple(deps)
+                spans.append((start, end))
+        else:
+            spans = chunk_spans(lowered, chunk_size, overlap)
+
+        for start, end in spans:
+            chunk_id = len(self.span_doc)
+            self.span_doc.append(doc_id)
+            self.span_start.append(start)
+            self.span_end.append(end)
+
+            tokens = TOKEN_RE.findall(lowered, start, end)
+            self.doc_len.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                self.postings.setdefault(term, []).append((chunk_id, tf))
+
+            # For this short list, one C-level count per term beats a pure-Python
+            # automaton pass; score_chunk uses the automaton for the query vocabulary.
+            for term in BOOST_WEIGHTS:
+                tf = lowered.count(term, start, end)
+                if tf:
+                    self.boost_postings.setdefault(term, []).append((chunk_id, tf))
+
+    def __len__(self) -> int:
+        return len(self.span_doc)
+
+    def chunk(self, chunk_id: int) -> tuple[str, str]:
+        """
+        Materializes one chunk as (source, text).
+        """
+        doc_id = self.span_doc[chunk_id]
+        return self.sources[doc_id], materialize(self.texts[doc_id], self.span_start[chunk_id], self.span_end[chunk_id])
+
+    def _idf(self, df: int) -> float:
+        n = len(self)
+        return math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+
+    def _bm25(self, postings, weight: float, scores: dict) -> None:
+        idf = self._idf(len(postings))
+        for chunk_id, tf in postings:
+            norm = 1.0 - BM25_B + BM25_B * (self.doc_len[chunk_id] / self.avgdl if self.avgdl else 1.0)
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + weight * idf * tf * (BM25_K1 + 1.0) / (tf + BM25_K1 * norm)
+
+    def _scores(self, query) -> dict[int, float]:
+        query = prepare_query(query)
+        scores: dict[int, float] = {}
+
+        for term in query.terms:
+            postings = self.postings.get(term)
+            if postings:
+                self._bm25(postings, 1.0, scores)
+
+        for term in BOOST_WEIGHTS:
+            postings = self.boost_postings.get(term)
+            if not postings:
+                continue
+            if term in query.boost_weights:
+                self._bm25(postings, query.boost_weights[term], scores)
+            else:
+                for chunk_id, _ in postings:
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + BOOST_CHUNK_ONLY
+        return scores
+
+    def search(self, query, top_k: int = 6) -> list[tuple[float, str, str]]:
+        """
+        Returns up to top_k (score, source, chunk) tuples, best first.
+        `query` is text or a RetrievalQuery.
+        """
+        if not len(self) or top_k <= 0:
+            return []
+
+        scores = self._scores(query)
+
+        # Unscored chunks keep their upload order after the scored ones, like the
+        # stable sort this replaces.
+        best = heapq.nlargest(top_k, scores.items(), key=lambda kv: (kv[1], -kv[0]))
+        picked = [(score, chunk_id) for chunk_id, score in best]
+        if len(picked) < top_k:
+            for chunk_id in range(len(self)):
+                if chunk_id not in scores:
+                    picked.append((0.0, chunk_id))
+                    if len(picked) == top_k:
+                        break
+
+        return [(score, *self.chunk(chunk_id)) for score, chunk_id in picked]
+
+    def dependencies(self, chunk_id: int) -> list[int]:
+        """
+        Unit chunks that chunk_id depends on, transitively, in discovery order.
+        """
+        doc_id = self.span_doc[chunk_id]
+        found: dict[int, None] = {}
+        stack = list(reversed(self.unit_deps.get(chunk_id, ())))
+        while stack:
+            dep = self.unit_ids.get((doc_id, stack.pop()))
+            if dep is None or dep == chunk_id or dep in found:
+                continue
+            found[dep] = None
+            stack.extend(reversed(self.unit_deps.get(dep, ())))
+        return list(found)
+
+    def iter_ranked(self, query, with_dependencies: bool = True):
+        """
+        Yields (score, source, chunk) for every scored chunk, best first. Lazy
+        (heap pops), so a consumer that stops early doesn't pay for a full sort.
+
+        With with_dependencies, a unit chunk is followed by the units it
+        depends on ($ref targets), at the same score, unless already yielded.
+        """
+        heap = [(-score, chunk_id) for chunk_id, score in self._scores(query).items()]
+        heapq.heapify(heap)
+        seen = set()
+        while heap:
+            neg_score, chunk_id = heapq.heappop(heap)
+            if chunk_id in seen:
+                continue
+            seen.add(chunk_id)
+            yield (-neg_score, *self.chunk(chunk_id))
+            if not with_dependencies or chunk_id not in self.unit_deps:
+                continue
+            for dep in self.dependencies(chunk_id):
+                if dep not in seen:
+                    seen.add(dep)
+                    yield (-neg_score, *self.chunk(dep))
+
+
+def score_chunk(chunk: str, query) -> float:
+    """
+    Cheap relevance scoring: keyword overlap + boosts for FedEx terms.
+
+    One Aho-Corasick pass over the chunk finds every query term and boost term;
+    the automaton is built once per query. `query` is text or a RetrievalQuery.
+    """
+    query = prepare_query(query)
+    hits = query.matcher.count(chunk)
+    score = float(len(query.terms & hits.keys()))
+
+    for b in BOOST_WEIGHTS:
+        if b in hits:
+            score += query.boost_weights.get(b, BOOST_CHUNK_ONLY)
+
+    return score
+
+
+def stream_top_k(chunks, query, top_k: int = 6) -> list[tuple[float, str, str]]:
+    """
+    Scores (source, chunk) pairs as they arrive and returns the top_k as
+    (score, source, chunk), best first; earlier chunks win ties. Only the
+    heap is kept, so memory doesn't grow with the number of chunks.
+
+    No corpus statistics exist in a single pass, so this uses score_chunk
+    rather than BM25.
+    """
+    if top_k <= 0:
+        return []
+    query = prepare_query(query)
+    heap: list[tuple[float, int, str, str]] = []
+    for seq, (source, chunk) in enumerate(chunks):
+        entry = (score_chunk(chunk, query), -seq, source, chunk)
+        if len(heap) < top_k:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+    return [(score, source, chunk) for score, _, source, chunk in sorted(heap, reverse=True)]
+
+
+_INDEX_CACHE: "OrderedDict[str, ChunkIndex]" = OrderedDict()
+_INDEX_LOCK = threading.Lock()
+# One lock per key being built, so concurrent misses on the same upload set
+# wait for a single build instead of each building their own.
+_INDEX_BUILDING: dict[str, threading.Lock] = {}
+
+
+def fingerprint(parts) -> str:
+    """
+    Stable key for an upload set, from (name, raw bytes) pairs.
+    """
+    h = hashlib.sha256()
+    for name, raw in parts:
+        h.update(name.encode("utf-8"))
+        h.update(b"\0")
+        h.update(hashlib.sha256(raw).digest())
+    return h.hexdigest()
+
+
+def get_index(key: str, docs_factory) -> ChunkIndex:
+    """
+    Returns the cached index for `key`, building it from docs_factory()
+    ((source, text, units) triples) on a miss. Safe to call from several
+    threads; a given key is built once.
+    """
+    with _INDEX_LOCK:
+        index = _INDEX_CACHE.get(key)
+        if index is not None:
+            _INDEX_CACHE.move_to_end(key)
+            return index
+        building = _INDEX_BUILDING.setdefault(key, threading.Lock())
+
+    with building:
+        with _INDEX_LOCK:
+            index = _INDEX_CACHE.get(key)
+        if index is not None:
+            return index
+        try:
+            index = ChunkIndex.build(docs_factory())
+            with _INDEX_LOCK:
+                _INDEX_CACHE[key] = index
+                while len(_INDEX_CACHE) > INDEX_CACHE_SIZE:
+                    _INDEX_CACHE.popitem(last=False)
+        finally:
+            with _INDEX_LOCK:
+                if _INDEX_BUILDING.get(key) is building:
+                    del _INDEX_BUILDING[key]
+    return index
@@ -0,0 +1,391 @@
+"""
+Headless batch converter.
+
+    python -m soap2rest convert ./wsdls --out ./openapi --jobs 8 --refs ./fedex-docs
+
+Each WSDL is converted like a Convert click in the UI (local compiler first,
+Gemini for the rest) and written to <out>/<service>/: design.md, openapi.yaml,
+client.md and result.json. result.json is written last and records a hash of
+the input and settings (backend included), so a rerun skips services that
+already finished and picks up where an interrupted run stopped. Runs that had
+to skip a Gemini step (no client) are recorded as "degraded" and redone.
+<out>/summary.json reports the run.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from client_codegen import CODE_SOURCES, TARGET_STACKS, ClientCodegenError, generate_client_code
+from design_sections import design_notes, extract_openapi_yaml
+from llm import gemini_generate
+from llm_backend import LLM_BACKEND, FakeGeminiClient, LlmBackendError, make_client
+from llm_cache import response_cache
+from openapi_compiler import WsdlCompileError, compile_openapi, render_design, to_yaml
+from openapi_validate import MAX_REPAIR_ATTEMPTS, validate_and_repair
+from operation_design import design_per_operation
+from pipeline import (
+    CODE_SYSTEM_PROMPT,
+    DESIGN_SYSTEM_PROMPT,
+    build_code_prompt,
+    build_design_prompt,
+    build_fedex_context_from_uploads,
+    build_refine_prompt,
+    extract_soap_hints,
+    parse_soap_model,
+    warm_upload_index,
+)
+from rate_limit import limiter_stats
+from retrieval import fingerprint, prepare_query
+from token_budget import context_budget
+from tracing import Trace, current_trace, span
+
+
+REFERENCE_SUFFIXES = (".json", ".yaml", ".yml", ".txt", ".md", ".pdf")
+
+# Bump when the artifacts written for a service change, to redo finished ones.
+CLI_RESULT_VERSION = "2"
+
+
+class LocalUpload:
+    """
+    A reference file on disk with the parts of Streamlit's UploadedFile that
+    the pipeline uses (name, size, getvalue).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.size = os.path.getsize(path)
+
+    def getvalue(self) -> bytes:
+        with open(self.path, "rb") as f:
+            return f.read()
+
+
+def _find_files(root: str, suffixes) -> list[str]:
+    if os.path.isfile(root):
+        return [root]
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.lower().endswith(suffixes):
+                found.append(os.path.join(dirpath, name))
+    return found
+
+
+def _service_dir_name(path: str, root: str) -> str:
+    rel = os.path.relpath(path, root) if os.path.isdir(root) else os.path.basename(path)
+    return os.path.splitext(rel)[0].replace(os.sep, "__")
+
+
+def _service_dir_names(paths: list[str], root: str) -> dict[str, str]:
+    """
+    Output directory name per source. A name already taken (a/b.wsdl vs
+    a__b.wsdl, svc.wsdl vs svc.xml, or a case-only difference) gets a short
+    hash of the source's path, so no two services share a directory; the
+    first source in order keeps the plain name.
+    """
+    names, taken = {}, set()
+    for path in paths:
+        name = _service_dir_name(path, root)
+        if name.lower() in taken:
+            name = f"{name}-{hashlib.sha256(os.path.relpath(path, root).encode('utf-8')).hexdigest()[:8]}"
+        taken.add(name.lower())
+        names[path] = name
+    return names
+
+
+def _write_atomic(path: str, text: str) -> None:
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def _read_result(out_dir: str) -> dict | None:
+    try:
+        with open(os.path.join(out_dir, "result.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _settings_key(args, refs_key: str, client_available: bool) -> str:
+    settings = [
+        CLI_RESULT_VERSION,
+        args.backend or LLM_BACKEND,
+        client_available,
+        args.model,
+        args.target_stack,
+        args.rest_prefs,
+        args.context_tokens,
+        args.compile,
+        args.refine,
+        args.per_operation,
+        args.code,
+        args.code_source,
+        args.repair_attempts,
+        refs_key,
+    ]
+    return hashlib.sha256(json.dumps(settings).encode("utf-8")).hexdigest()
+
+
+def _require_client(client):
+    if client is None:
+        raise RuntimeError("Gemini client unavailable (see the warning at start-up); only compilable WSDLs with template client code (or --no-code) work without it")
+    return client
+
+
+def convert_service(path: str, out_dir: str, input_key: str, args, client, refs) -> dict:
+    """
+    Converts one SOAP artifact and writes its artifacts. Returns the result record.
+    """
+    started = time.perf_counter()
+    with open(path, encoding="utf-8", errors="ignore") as f:
+        soap_text = f.read()
+
+    def generate(system_prompt, user_prompt):
+        return gemini_generate(_require_client(client), args.model, system_prompt, user_prompt, cache=args.llm_cache)
+
+    soap_model = parse_soap_model(soap_text)
+    hints = extract_soap_hints(soap_text, soap_model)
+
+    compiled, design_source = None, "gemini"
+    if args.compile and soap_model is not None:
+        try:
+            with span("openapi.compile"):
+                compiled = compile_openapi(soap_model)
+        except WsdlCompileError as e:
+            design_source = f"gemini (local compiler skipped: {e})"
+
+    fedex_context = ""
+    if refs:
+        budget = context_budget(args.model, args.context_tokens, {"system_prompt": DESIGN_SYSTEM_PROMPT, "soap_input": soap_text})
+        fedex_context = build_fedex_context_from_uploads(refs, prepare_query(soap_text), token_budget=budget["fedex_context_budget"])
+
+    if compiled is not None and not args.refine:
+        design_source = "local compiler"
+        design_output = render_design(compiled, soap_model)
+        openapi_yaml = to_yaml(compiled)
+    elif args.per_operation and soap_model is not None and len(soap_model.operations()) > 1:
+        design_source = "gemini (per operation)"
+        design_output, openapi_yaml = design_per_operation(
+            _require_client(client),
+            args.model,
+            soap_model,
+            args.target_stack,
+            args.rest_prefs,
+            fedex_context,
+            concurrency=args.operation_concurrency,
+            cache=args.llm_cache,
+        )
+    else:
+        if compiled is not None:
+            design_source = "local compiler + gemini refinement"
+            design_prompt = build_refine_prompt(args.target_stack, to_yaml(compiled), hints, args.rest_prefs, fedex_context)
+        else:
+            design_prompt = build_design_prompt(args.target_stack, soap_text, hints, args.rest_prefs, fedex_context)
+        design_output = generate(DESIGN_SYSTEM_PROMPT, design_prompt)
+        with span("openapi.extract", bytes_in=len(design_output.encode("utf-8"))):
+            openapi_yaml = extract_openapi_yaml(design_output)
+        if openapi_yaml is None:
+            raise RuntimeError("design output has no OpenAPI section (6)")
+
+    # Repairs need the model; without a client the spec is only validated and
+    # an invalid one marks the run degraded, so a later run with a client redoes it.
+    degraded = []
+    openapi_yaml, openapi_report = validate_and_repair(
+        openapi_yaml,
+        generate,
+        max_attempts=args.repair_attempts if client is not None else 0,
+        doc=compiled if design_source == "local compiler" else None,
+    )
+    if client is None and args.repair_attempts and not openapi_report.valid:
+        degraded.append("OpenAPI repair skipped (no Gemini client)")
+
+    os.makedirs(out_dir, exist_ok=True)
+    _write_atomic(os.path.join(out_dir, "design.md"), design_output)
+    _write_atomic(os.path.join(out_dir, "openapi.yaml"), openapi_yaml)
+
+    code = "skipped"
+    if args.code and not openapi_report.usable:
+        code = "skipped (OpenAPI still invalid)"
+    elif args.code:
+        code, client_code = "gemini", None
+        if args.code_source != "gemini":
+            # TODO notes need the model; without a client the plain template is written.
+            todo_generate = generate if args.code_source == "template-todos" and client is not None else None
+            if args.code_source == "template-todos" and client is None:
+                degraded.append("TODO notes skipped (no Gemini client)")
+            try:
+                client_code, code_stats = generate_client_code(openapi_report.doc, args.target_stack, design_output, todo_generate)
+                code = code_stats["source"]
+            except ClientCodegenError as e:
+                code = f"gemini (template skipped: {e})"
+        if client_code is None:
+            code_prompt = build_code_prompt(args.target_stack, openapi_yaml, design_notes(design_output), fedex_context)
+            client_code = generate(CODE_SYSTEM_PROMPT, code_prompt)
+        _write_atomic(os.path.join(out_dir, "client.md"), client_code)
+
+    result = {
+        "source": path,
+        "status": "degraded" if degraded else "ok",
+        "input_key": input_key,
+        "design_source": design_source,
+        "operations": hints["possible_operations"],
+        "openapi": openapi_report.as_dict(),
+        "code": code,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+    if degraded:
+        result["degraded"] = degraded
+    trace = current_trace()
+    if trace is not None:
+        result["spans"] = trace.rows()
+    # Written last: its presence marks the service as done for later runs.
+    _write_atomic(os.path.join(out_dir, "result.json"), json.dumps(result, indent=2))
+    return result
+
+
+def _convert_traced(path: str, out_dir: str, input_key: str, args, client, refs) -> dict:
+    trace = Trace()
+    status = "failed"
+    try:
+        with trace.activate():
+            result = convert_service(path, out_dir, input_key, args, client, refs)
+        status = result["status"]
+        return result
+    finally:
+        if args.trace_jsonl:
+            trace.export_jsonl(args.trace_jsonl, service=path, status=status)
+
+
+def cmd_convert(args) -> int:
+    args.suffix = args.suffix or [".wsdl"]
+    sources = _find_files(args.input, tuple(args.suffix))
+    if not sources:
+        print(f"No {', '.join(args.suffix)} files under {args.input}", file=sys.stderr)
+        return 2
+    os.makedirs(args.out, exist_ok=True)
+
+    refs = [LocalUpload(p) for p in _find_files(args.refs, REFERENCE_SUFFIXES)] if args.refs else []
+    try:
+        client = make_client(args.backend)
+    except LlmBackendError as e:
+        print(f"warning: {e}", file=sys.stderr)
+        client = None
+    refs_key = fingerprint((up.name, up.getvalue()) for up in refs)
+    settings_key = _settings_key(args, refs_key, client is not None)
+    # Build the shared reference index once, before the workers need it.
+    warm_upload_index(refs)
+    args.llm_cache = response_cache if args.llm_cache_enabled else None
+
+    results, todo = [], []
+    dir_names = _service_dir_names(sources, args.input)
+    for path in sources:
+        out_dir = os.path.join(args.out, dir_names[path])
+        with open(path, "rb") as f:
+            input_key = hashlib.sha256(f.read() + settings_key.encode("ascii")).hexdigest()
+        previous = _read_result(out_dir)
+        if args.resume and previous and previous.get("status") == "ok" and previous.get("input_key") == input_key:
+            results.append({**previous, "status": "skipped"})
+            continue
+        todo.append((path, out_dir, input_key))
+
+    print(f"{len(sources)} services: {len(todo)} to convert, {len(results)} already done", file=sys.stderr)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        futures = {
+            pool.submit(_convert_traced, path, out_dir, input_key, args, client, refs): path
+            for path, out_dir, input_key in todo
+        }
+        for done, fut in enumerate(as_completed(futures), 1):
+            path = futures[fut]
+            try:
+                result = fut.result()
+            except Exception as e:
+                result = {"source": path, "status": "failed", "error": f"{type(e).__name__}: {e}"}
+            results.append(result)
+            print(f"[{done}/{len(todo)}] {result['status']:8} {path}" + (f" ({result['error']})" if "error" in result else ""), file=sys.stderr)
+
+    totals = {status: sum(1 for r in results if r["status"] == status) for status in ("ok", "degraded", "skipped", "failed")}
+    summary = {
+        "input": args.input,
+        "out": args.out,
+        "model": args.model,
+        "target_stack": args.target_stack,
+        "wall_seconds": round(time.perf_counter() - started, 3),
+        "totals": totals,
+        "openapi_repair": {
+            "invalid_designs": sum(1 for r in results if r.get("openapi") and r["openapi"]["initial_errors"]),
+            "still_invalid": sum(1 for r in results if r.get("openapi") and not r["openapi"]["valid"]),
+            "repair_calls": sum(r["openapi"]["repair_calls"] for r in results if r.get("openapi")),
+            "repair_seconds": round(sum(r["openapi"]["repair_seconds"] for r in results if r.get("openapi")), 3),
+        },
+        "llm_cache": response_cache.stats() if args.llm_cache else None,
+        "rate_limiting": limiter_stats(),
+        "fake_backend": client.stats() if isinstance(client, FakeGeminiClient) else None,
+        "services": sorted(results, key=lambda r: r["source"]),
+    }
+    _write_atomic(os.path.join(args.out, "summary.json"), json.dumps(summary, indent=2))
+    print(f"ok {totals['ok']}, degraded {totals['degraded']}, skipped {totals['skipped']}, failed {totals['failed']} -> {os.path.join(args.out, 'summary.json')}", file=sys.stderr)
+    return 1 if totals["failed"] else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="soap2rest", description="Convert SOAP services to REST designs.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    convert = sub.add_parser("convert", help="convert a directory of WSDLs")
+    convert.add_argument("input", help="WSDL file or directory (searched recursively)")
+    convert.add_argument("--out", required=True, help="output directory")
+    convert.add_argument("--jobs", type=int, default=4, help="services converted concurrently (default 4)")
+    convert.add_argument("--suffix", action="append", default=None, help="input file suffix (repeatable; default .wsdl)")
+    convert.add_argument("--refs", help="directory of FedEx reference files (OpenAPI, PDF, txt, md)")
+    convert.add_argument("--model", default="gemini-2.5-flash")
+    convert.add_argument("--backend", choices=["gemini", "fake"], help="LLM backend (default: SOAP2REST_LLM_BACKEND or gemini)")
+    convert.add_argument("--target-stack", default=TARGET_STACKS[0], choices=TARGET_STACKS)
+    convert.add_argument("--rest-prefs", default="", help="REST preferences passed to the prompts")
+    convert.add_argument("--context-tokens", type=int, default=8_000, help="FedEx context budget per prompt")
+    convert.add_argument("--no-compile", dest="compile", action="store_false", help="always design with Gemini")
+    convert.add_argument("--refine", action="store_true", help="refine compiled designs with Gemini")
+    convert.add_argument("--per-operation", action="store_true", help="one concurrent Gemini design call per operation")
+    convert.add_argument("--operation-concurrency", type=int, default=4)
+    convert.add_argument(
+        "--repair-attempts",
+        type=int,
+        default=MAX_REPAIR_ATTEMPTS,
+        help=f"max Gemini repair calls for an OpenAPI that fails local validation (default {MAX_REPAIR_ATTEMPTS})",
+    )
+    convert.add_argument(
+        "--code-source",
+        default="template",
+        choices=CODE_SOURCES,
+        help="client code: local templates (default), templates plus Gemini TODO notes, or a full Gemini call",
+    )
+    convert.add_argument("--no-code", dest="code", action="store_false", help="skip client code generation")
+    convert.add_argument("--llm-cache", dest="llm_cache_enabled", action="store_true", help="reuse cached Gemini responses")
+    convert.add_argument("--trace-jsonl", help="append per-stage spans of every service to this JSON lines file")
+    convert.add_argument("--no-resume", dest="resume", action="store_false", help="redo services that already finished")
+    convert.set_defaults(func=cmd_convert)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
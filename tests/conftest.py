@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+# The modules live flat in the repository root.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Module-level caches (uploads, Gemini responses) go to a scratch directory.
+os.environ.setdefault("SOAP2REST_CACHE_DIR", tempfile.mkdtemp(prefix="soap2rest-tests-"))
@@ -0,0 +1,18 @@
+from aho_corasick import AhoCorasick
+
+
+def test_counts_overlapping_patterns_case_insensitively():
+    matcher = AhoCorasick(["ship", "shipment", "serviceType", "hip"])
+    counts = matcher.count("Create a Shipment; ship it. <ServiceType>")
+    assert counts == {"ship": 2, "hip": 2, "shipment": 1, "servicetype": 1}
+
+
+def test_failure_links_resume_mid_pattern():
+    matcher = AhoCorasick(["abcd", "bce", "c"])
+    assert matcher.count("xabcex") == {"bce": 1, "c": 1}
+
+
+def test_empty_matcher():
+    matcher = AhoCorasick(["", None])
+    assert not matcher
+    assert matcher.count("anything") == {}
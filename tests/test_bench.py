@@ -0,0 +1,22 @@
+import json
+
+import bench
+
+
+RESULTS = {
+    "import[app]": {"median_s": 0.1, "best_s": 0.09, "peak_kib": None},
+    "chunk_text[reference]": {"median_s": 0.05, "best_s": 0.04, "peak_kib": 1000.0},
+}
+
+
+def test_saved_baseline_round_trips_through_compare(tmp_path):
+    path = tmp_path / "baseline.json"
+    bench.save_baseline(str(path), RESULTS, repeat=5, memory_tolerance=0.25)
+    baseline = json.loads(path.read_text(encoding="utf-8"))
+    assert baseline["benchmarks"]["chunk_text[reference]"]["max_peak_kib"] == 1250.0
+    assert "max_peak_kib" not in baseline["benchmarks"]["import[app]"]
+    assert bench.compare(RESULTS, baseline, tolerance=0.25, memory_tolerance=0.25) == []
+
+    grown = {**RESULTS, "chunk_text[reference]": {**RESULTS["chunk_text[reference]"], "peak_kib": 1300.0}}
+    regressions = bench.compare(grown, baseline, tolerance=0.25, memory_tolerance=0.25)
+    assert len(regressions) == 1 and "ceiling 1250 KiB" in regressions[0]
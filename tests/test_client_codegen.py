@@ -0,0 +1,239 @@
+import ast
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+from client_codegen import RENDERERS, client_api, generate_client_code
+
+
+def _param(name: str, location: str, required: bool = False, schema: dict | None = None) -> dict:
+    return {"name": name, "in": location, "required": required or location == "path", "schema": schema or {"type": "string"}}
+
+
+SPEC = {
+    "openapi": "3.0.3",
+    "info": {"title": "Quote Service", "version": "1.0.0"},
+    "servers": [{"url": "https://api.example.com/v1"}],
+    "paths": {
+        "/quotes/{quoteId}": {
+            "post": {
+                "operationId": "createQuote",
+                "summary": "Creates a quote",
+                "parameters": [
+                    _param("quoteId", "path"),
+                    _param("currency", "query", required=True),
+                    _param("limit", "query", schema={"type": "integer"}),
+                    _param("X-Trace", "header"),
+                ],
+                "requestBody": {
+                    "required": True,
+                    "content": {"application/json": {"schema": {"$ref": "#/components/schemas/Quote"}}},
+                },
+                "responses": {"200": {"description": "ok"}},
+            }
+        },
+        "/quotes": {
+            "get": {"operationId": "listQuotes", "responses": {"200": {"description": "ok"}}},
+            "delete": {"responses": {"204": {"description": "done"}}},
+        },
+    },
+    "components": {
+        "schemas": {"Quote": {"type": "object", "properties": {"amount": {"type": "number"}, "note": {"type": "string"}}}},
+        "securitySchemes": {"key": {"type": "apiKey", "in": "header", "name": "X-Api-Key"}},
+    },
+}
+
+# Parameter and operation names that collide with what the templates use
+# themselves (locals, helpers, members, keywords) or with each other.
+ADVERSARIAL = {
+    "openapi": "3.0.3",
+    "info": {"title": 'Quote "Service" */ 1', "version": "1.0.0"},
+    "servers": [{"url": "https://api.example.com/v1"}],
+    "paths": {
+        "/quotes/{quote}/{requests}/{class}": {
+            "post": {
+                "operationId": "send",
+                "summary": 'Creates """ a */ quote',
+                "parameters": [
+                    _param("quote", "path"),
+                    _param("requests", "path"),
+                    _param("class", "path"),
+                    _param("data", "query", required=True),
+                    _param("compact", "query"),
+                    _param("str", "query"),
+                    _param("self", "query"),
+                    _param("body", "query"),
+                    _param("query", "query"),
+                    _param("jsonBody", "query"),
+                    _param("ct", "query", schema={"type": "integer"}),
+                    _param("encodeURIComponent", "query"),
+                    _param("1st", "query", schema={"type": "boolean"}),
+                    _param("data", "header"),
+                    _param("headers", "header"),
+                    _param("X-Trace", "header"),
+                ],
+                "requestBody": {
+                    "required": True,
+                    "content": {"application/json": {"schema": {"$ref": "#/components/schemas/Quote"}}},
+                },
+                "responses": {"200": {"description": "ok"}},
+            }
+        },
+        "/quotes": {
+            "get": {"operationId": "session", "parameters": [_param("default", "query")], "responses": {"200": {"description": "ok"}}},
+            "put": {"operationId": "SendAsync", "responses": {"204": {"description": "done"}}},
+            "delete": {"responses": {"204": {"description": "done"}}},
+        },
+    },
+    "components": {
+        "schemas": {"Quote": {"type": "object", "properties": {"amount": {"type": "number"}, "note": {"type": "string"}}}},
+        "securitySchemes": {"key": {"type": "apiKey", "in": "header", "name": "X-Api-Key"}},
+    },
+}
+
+# The generated examples call the first operations, so the stubs below let
+# them run without a server or the real HTTP libraries.
+STUB_PYTHON_REQUESTS = '''
+class Session:
+    def __init__(self):
+        self.headers = {}
+
+    def request(self, method, url, params=None, headers=None, json=None, timeout=None):
+        return Response({"method": method, "url": url, "params": params, "headers": headers, "json": json})
+
+
+class Response:
+    def __init__(self, data):
+        self.data = data
+        self.content = b"{}"
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+'''
+
+STUB_AXIOS = """
+module.exports = {
+  create: () => ({ request: async (config) => ({ data: config }) }),
+};
+"""
+
+
+# (spec, its first operation's required query parameter, operation count)
+SPECS = [(SPEC, "currency", 3), (ADVERSARIAL, "data", 4)]
+spec_ids = pytest.mark.parametrize("spec, query_name, operations", SPECS, ids=["plain", "adversarial"])
+
+
+def _render(stack: str, spec: dict) -> tuple[str, str]:
+    return RENDERERS[stack][1](client_api(spec), {})
+
+
+@spec_ids
+def test_every_stack_renders(spec, query_name, operations):
+    for stack in RENDERERS:
+        code, stats = generate_client_code(spec, stack)
+        assert stats["operations"] == operations
+        assert code.count("```") == 4
+
+
+@spec_ids
+def test_python_client_runs(tmp_path, spec, query_name, operations):
+    client, examples = _render("Python requests client", spec)
+    (tmp_path / "client.py").write_text(client)
+    (tmp_path / "example.py").write_text(examples)
+    (tmp_path / "requests.py").write_text(STUB_PYTHON_REQUESTS)
+    compile(client, "client.py", "exec")
+    out = subprocess.run([sys.executable, "example.py"], cwd=tmp_path, capture_output=True, text=True, timeout=60)
+    assert out.returncode == 0, out.stderr
+    first = ast.literal_eval(out.stdout.splitlines()[0])  # the stub echoes the request as a dict
+    assert first["method"] == "POST"
+    assert first["url"].startswith("https://api.example.com/v1/quotes/")
+    assert query_name in first["params"]
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node not installed")
+@spec_ids
+def test_node_client_runs(tmp_path, spec, query_name, operations):
+    client, examples = _render("Node.js Axios client", spec)
+    (tmp_path / "client.js").write_text(client)
+    (tmp_path / "example.js").write_text(examples)
+    (tmp_path / "node_modules" / "axios").mkdir(parents=True)
+    (tmp_path / "node_modules" / "axios" / "index.js").write_text(STUB_AXIOS)
+    for name in ("client.js", "example.js"):
+        check = subprocess.run(["node", "--check", name], cwd=tmp_path, capture_output=True, text=True, timeout=60)
+        assert check.returncode == 0, check.stderr
+    out = subprocess.run(["node", "example.js"], cwd=tmp_path, capture_output=True, text=True, timeout=60)
+    assert out.returncode == 0, out.stderr
+    assert "/quotes/" in out.stdout and query_name in out.stdout
+
+
+@pytest.mark.skipif(shutil.which("javac") is None, reason="no JDK installed")
+@spec_ids
+def test_java_client_compiles(tmp_path, spec, query_name, operations):
+    client, examples = _render("Java HTTP client", spec)
+    cls = client.split("public class ", 1)[1].split(" ", 1)[0]
+    (tmp_path / f"{cls}.java").write_text(client)
+    (tmp_path / "Example.java").write_text(examples)
+    out = subprocess.run(["javac", f"{cls}.java", "Example.java"], cwd=tmp_path, capture_output=True, text=True, timeout=300)
+    assert out.returncode == 0, out.stderr
+
+
+CSPROJ = """<Project Sdk="Microsoft.NET.Sdk">
+  <PropertyGroup>
+    <OutputType>Exe</OutputType>
+    <TargetFramework>net{version}</TargetFramework>
+    <Nullable>enable</Nullable>
+    <TreatWarningsAsErrors>true</TreatWarningsAsErrors>
+  </PropertyGroup>
+</Project>
+"""
+
+
+@pytest.mark.skipif(shutil.which("dotnet") is None, reason="no .NET SDK installed")
+@spec_ids
+def test_csharp_client_compiles(tmp_path, spec, query_name, operations):
+    client, examples = _render(".NET C# HttpClient", spec)
+    sdk = subprocess.run(["dotnet", "--version"], capture_output=True, text=True).stdout.strip()
+    (tmp_path / "Client.csproj").write_text(CSPROJ.format(version=".".join(sdk.split(".")[:1]) + ".0"))
+    (tmp_path / "Client.cs").write_text(client)
+    (tmp_path / "Program.cs").write_text(examples)
+    out = subprocess.run(
+        ["dotnet", "build", "--nologo", "-v", "q"], cwd=tmp_path, capture_output=True, text=True, timeout=600
+    )
+    assert out.returncode == 0, out.stdout + out.stderr
+
+
+def test_examples_take_the_declared_parameter_type():
+    spec = {
+        "openapi": "3.0.3",
+        "info": {"title": "Typed", "version": "1.0.0"},
+        "paths": {
+            "/items/{id}": {
+                "get": {
+                    "operationId": "getItem",
+                    "parameters": [
+                        {**_param("id", "path", schema={"type": "integer"}), "example": 3.0},
+                        {**_param("ratio", "query", required=True, schema={"type": "number"}), "example": "0.5"},
+                        {**_param("full", "query", required=True, schema={"type": "boolean"}), "example": "yes"},
+                    ],
+                    "responses": {"200": {"description": "ok"}},
+                }
+            }
+        },
+    }
+    examples = [p.example for p in client_api(spec).operations[0].params]
+    assert examples == [3, 0.5, False]
+    assert "GetItemAsync(3, ratio: 0.5, full: false)" in _render(".NET C# HttpClient", spec)[1]
+
+
+def test_relative_server_is_resolved_against_the_default_host():
+    spec = {**SPEC, "servers": [{"url": "/v1"}]}
+    assert client_api(spec).base_url == "https://api.example.com/v1"
+    for stack in RENDERERS:
+        client, _examples = _render(stack, spec)
+        assert '"https://api.example.com/v1"' in client
+        assert '"/v1"' not in client
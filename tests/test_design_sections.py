@@ -0,0 +1,117 @@
+import pytest
+
+from design_sections import OpenApiStreamExtractor, extract_openapi_yaml, split_design_sections, split_openapi_section, strip_code_fence
+
+DESIGN = """1) Assumptions
+- Rates are quoted in USD.
+
+2) REST endpoints
+- POST /rates
+
+6) OpenAPI 3.0 YAML
+```yaml
+openapi: 3.0.3
+paths: {}
+```
+"""
+
+
+PROSE_DESIGN = """Here is the design.
+
+1) Assumptions
+- The spec is in section 6) OpenAPI 3.0 YAML below.
+
+2) REST endpoints
+- POST /rates
+
+3) JSON Schemas
+```json
+{"type": "object"}
+```
+
+4) Error model
+Problem details.
+
+5) SOAP to REST mapping table
+| GetRates | POST /rates |
+
+6) OpenAPI 3.0 YAML
+```yaml
+openapi: 3.0.3
+paths: {}
+```
+
+Notes after the spec.
+"""
+
+
+def test_split_openapi_section():
+    notes, section = split_openapi_section(DESIGN)
+    assert notes.endswith("- POST /rates")
+    assert strip_code_fence(section) == "openapi: 3.0.3\npaths: {}"
+
+
+def test_split_without_openapi_section():
+    assert split_openapi_section("1) Assumptions") == ("1) Assumptions", None)
+
+
+def test_extract_without_openapi_section_is_none():
+    assert extract_openapi_yaml("1) Assumptions\n- none") is None
+    extractor = OpenApiStreamExtractor()
+    extractor.feed("1) Assumptions\n- none")
+    assert extractor.finish() is None
+
+
+def test_strip_code_fence_leaves_plain_text():
+    assert strip_code_fence("openapi: 3.0.3") == "openapi: 3.0.3"
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, len(DESIGN)])
+def test_stream_extractor_finds_the_spec(chunk_size):
+    extractor = OpenApiStreamExtractor()
+    for i in range(0, len(DESIGN), chunk_size):
+        extractor.feed(DESIGN[i : i + chunk_size])
+        if extractor.complete:
+            assert extractor.openapi_yaml == "openapi: 3.0.3\npaths: {}"
+    assert extractor.complete
+    assert extractor.text == DESIGN
+    assert extractor.finish() == "openapi: 3.0.3\npaths: {}"
+
+
+def test_stream_extractor_waits_for_the_section_header():
+    extractor = OpenApiStreamExtractor()
+    extractor.feed(DESIGN[: DESIGN.index("6) OpenAPI")])
+    assert extractor.openapi_yaml is None
+    assert not extractor.complete
+
+
+def test_split_ignores_prose_mentions_and_other_fences():
+    sections = split_design_sections(PROSE_DESIGN)
+    assert sections.json_schemas == '```json\n{"type": "object"}\n```'
+    assert sections.openapi_yaml == "openapi: 3.0.3\npaths: {}"
+    assert extract_openapi_yaml(PROSE_DESIGN) == sections.openapi_yaml
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, len(PROSE_DESIGN)])
+def test_stream_extractor_skips_prose_mentions(chunk_size):
+    extractor = OpenApiStreamExtractor()
+    seen = []
+    for i in range(0, len(PROSE_DESIGN), chunk_size):
+        extractor.feed(PROSE_DESIGN[i : i + chunk_size])
+        if extractor.openapi_yaml is not None:
+            seen.append(extractor.openapi_yaml)
+        if extractor.complete:
+            assert extractor.openapi_yaml == "openapi: 3.0.3\npaths: {}"
+    assert extractor.complete
+    # Nothing from sections 1-5 is ever offered as the spec.
+    assert all("json" not in yaml and "GetRates" not in yaml for yaml in seen)
+    assert extractor.finish() == split_design_sections(PROSE_DESIGN).openapi_yaml
+
+
+def test_stream_extractor_reports_complete_lines():
+    extractor = OpenApiStreamExtractor()
+    assert extractor.feed("1) Assump") is False
+    assert extractor.lines == ""
+    assert extractor.feed("tions\n- no") is True
+    assert extractor.lines == "1) Assumptions\n"
+    assert extractor.text == "1) Assumptions\n- no"
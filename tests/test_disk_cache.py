@@ -0,0 +1,63 @@
+import os
+import time
+
+from disk_cache import DiskCache, content_key
+
+
+def _key(i: int) -> str:
+    return f"{i:02d}" * 32
+
+
+def _age(cache: DiskCache, key: str, seconds: float) -> None:
+    past = time.time() - seconds
+    os.utime(cache._path(key), (past, past))
+
+
+def test_content_key_covers_bytes_and_parts():
+    assert content_key(b"abc", "pdf", "1") == content_key(b"abc", "pdf", "1")
+    assert content_key(b"abc", "pdf", "1") != content_key(b"abc", "pdf", "2")
+    assert content_key(b"abc", "pdf") != content_key(b"abd", "pdf")
+
+
+def test_text_round_trip(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=1 << 20)
+    assert cache.get_text(_key(1)) is None
+    cache.set_text(_key(1), "héllo")
+    assert cache.get_text(_key(1)) == "héllo"
+
+
+def test_evicts_least_recently_used_over_the_limit(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=250)
+    for i in range(2):
+        cache.set(_key(i), b"x" * 100)
+        _age(cache, _key(i), 100 - i)
+    cache.set(_key(2), b"x" * 100)
+    assert cache.get(_key(0)) is None
+    assert cache.get(_key(1)) is not None  # now the most recently used
+    _age(cache, _key(2), 50)
+
+    cache.set(_key(3), b"x" * 100)
+    assert cache.get(_key(2)) is None
+    assert cache.get(_key(1)) is not None and cache.get(_key(3)) is not None
+
+
+def test_entries_larger_than_the_cache_are_skipped(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=10)
+    cache.set(_key(1), b"x" * 11)
+    assert cache.get(_key(1)) is None
+
+
+def test_directory_is_walked_only_when_the_limit_trips(tmp_path, monkeypatch):
+    cache = DiskCache(str(tmp_path), max_bytes=250)
+    walks = []
+    entries = cache._entries
+    monkeypatch.setattr(cache, "_entries", lambda: walks.append(1) or entries())
+
+    for i in range(2):
+        cache.set(_key(i), b"x" * 100)
+    cache.set(_key(1), b"y" * 100)  # replacing an entry doesn't grow the total
+    assert len(walks) == 1  # the first set counts what's already there
+
+    cache.set(_key(2), b"x" * 100)
+    assert len(walks) == 2
+    assert sum(cache.get(_key(i)) is not None for i in range(3)) == 2
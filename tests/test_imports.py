@@ -0,0 +1,19 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Only needed once a PDF, a large PDF or a real Gemini call shows up.
+DEFERRED = ("pypdf", "multiprocessing", "concurrent.futures.process", "google.genai")
+
+
+def test_heavy_modules_are_not_imported_at_startup():
+    code = (
+        "import sys\n"
+        "import llm, llm_backend, operation_design, pipeline\n"
+        f"print(sorted(m for m in {DEFERRED!r} if m in sys.modules))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, timeout=60)
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.strip() == "[]"
@@ -0,0 +1,43 @@
+import pytest
+
+from design_sections import extract_openapi_yaml, strip_code_fence
+from llm import gemini_generate, gemini_generate_stream
+from llm_backend import FakeApiError, FakeGeminiClient, LlmBackendError, make_client
+from llm_cache import LlmResponseCache
+from rate_limit import retry_delay
+
+
+def test_fake_design_has_an_openapi_section():
+    client = FakeGeminiClient(latency_ms=0, chunk_ms=0)
+    design = gemini_generate(client, "fake-model", "system", "Operation: GetRates")
+    assert "openapi:" in strip_code_fence(extract_openapi_yaml(design))
+
+
+def test_fake_stream_reassembles_to_the_blocking_answer():
+    client = FakeGeminiClient(latency_ms=0, chunk_ms=0, chunk_chars=16)
+    chunks = list(gemini_generate_stream(client, "fake-model", "system", "user"))
+    assert len(chunks) > 1
+    assert "".join(chunks) == gemini_generate(client, "fake-model", "system", "user")
+
+
+def test_stream_and_blocking_calls_share_the_response_cache(tmp_path):
+    client = FakeGeminiClient(latency_ms=0, chunk_ms=0, chunk_chars=16)
+    cache = LlmResponseCache(str(tmp_path), max_bytes=1 << 20, ttl_seconds=60)
+    streamed = "".join(gemini_generate_stream(client, "fake-model", "system", "user", cache=cache))
+    assert gemini_generate(client, "fake-model", "system", "user", cache=cache) == streamed
+    assert list(gemini_generate_stream(client, "fake-model", "system", "user", cache=cache)) == [streamed]
+    assert client.stats()["calls"] == 1
+
+
+def test_injected_429_carries_a_retry_hint():
+    client = FakeGeminiClient(latency_ms=0, error_rate=1.0, retry_after_s=3, seed=1)
+    with pytest.raises(FakeApiError) as err:
+        client.maybe_fail()
+    assert retry_delay(err.value, attempt=0) >= 3
+    assert client.stats() == {"calls": 1, "injected_429": 1}
+
+
+def test_make_client():
+    assert isinstance(make_client("fake"), FakeGeminiClient)
+    with pytest.raises(LlmBackendError):
+        make_client("nope")
@@ -0,0 +1,18 @@
+import time
+
+from llm_cache import LlmResponseCache
+
+
+def test_hits_misses_and_expiry(tmp_path, monkeypatch):
+    cache = LlmResponseCache(str(tmp_path), max_bytes=1 << 20, ttl_seconds=60)
+    key = cache.key("gemini-2.5-flash", "system", "user")
+    assert key != cache.key("gemini-2.5-flash", "system", "other user")
+
+    assert cache.get(key) is None
+    cache.put(key, "answer")
+    assert cache.get(key) == "answer"
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert cache.get(key) is None
+    assert cache.stats() == {"hits": 1, "misses": 2, "expired": 1, "hit_rate": 0.333}
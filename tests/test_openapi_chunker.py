@@ -0,0 +1,55 @@
+import json
+
+from openapi_chunker import openapi_to_text, unit_spans
+from retrieval import ChunkIndex
+
+SPEC = {
+    "openapi": "3.0.3",
+    "info": {"title": "Ship", "version": "1"},
+    "paths": {
+        "/shipments": {
+            "post": {
+                "operationId": "createShipment",
+                "requestBody": {"content": {"application/json": {"schema": {"$ref": "#/components/schemas/Shipment"}}}},
+                "responses": {"200": {"description": "ok"}},
+            }
+        }
+    },
+    "components": {
+        "schemas": {
+            "Shipment": {"type": "object", "properties": {"address": {"$ref": "#/components/schemas/Address"}}},
+            "Address": {"type": "object", "properties": {"postalCode": {"type": "string"}}},
+        }
+    },
+}
+
+
+def test_one_unit_per_operation_and_component():
+    text = openapi_to_text(json.dumps(SPEC))
+    spans = unit_spans(text)
+    assert [key for _start, _end, key, _refs in spans] == [
+        "info",
+        "POST /shipments",
+        "#/components/schemas/Shipment",
+        "#/components/schemas/Address",
+    ]
+    assert spans[1][3] == ("#/components/schemas/Shipment",)
+    assert json.loads(text[spans[3][0] : spans[3][1]].split("\n", 2)[2]) == SPEC["components"]["schemas"]["Address"]
+
+
+def test_other_text_is_not_a_spec():
+    assert openapi_to_text('{"name": "payload"}') is None
+    assert openapi_to_text("plain notes") is None
+    assert unit_spans("plain notes") == []
+
+
+def test_ranked_operation_brings_its_schemas():
+    text = openapi_to_text(json.dumps(SPEC))
+    index = ChunkIndex.build([("spec.json", text, unit_spans(text))])
+    # Chunks come back whitespace-normalized, marker first.
+    ranked = [chunk[: chunk.index(" ---") + 4] for _score, _source, chunk in index.iter_ranked("createShipment")]
+    assert ranked[:3] == [
+        "--- OPENAPI POST /shipments ---",
+        "--- OPENAPI #/components/schemas/Shipment ---",
+        "--- OPENAPI #/components/schemas/Address ---",
+    ]
@@ -0,0 +1,140 @@
+import pytest
+
+from openapi_compiler import WsdlCompileError, compile_openapi, render_design, to_yaml
+from openapi_validate import validate_openapi
+from wsdl_parser import parse_wsdl
+
+
+def _calc_wsdl() -> str:
+    return """<?xml version="1.0"?>
+<wsdl:definitions xmlns:wsdl="http://schemas.xmlsoap.org/wsdl/"
+    xmlns:soap="http://schemas.xmlsoap.org/wsdl/soap/"
+    xmlns:s="http://www.w3.org/2001/XMLSchema"
+    xmlns:tns="http://example.com/calc" targetNamespace="http://example.com/calc">
+  <wsdl:types>
+    <s:schema elementFormDefault="qualified" targetNamespace="http://example.com/calc">
+      <s:element name="Add">
+        <s:complexType><s:sequence>
+          <s:element name="a" type="s:int"/><s:element name="b" type="s:int"/>
+        </s:sequence></s:complexType>
+      </s:element>
+      <s:element name="AddResponse">
+        <s:complexType><s:sequence><s:element name="AddResult" type="s:int"/></s:sequence></s:complexType>
+      </s:element>
+    </s:schema>
+  </wsdl:types>
+  <wsdl:message name="AddSoapIn"><wsdl:part name="parameters" element="tns:Add"/></wsdl:message>
+  <wsdl:message name="AddSoapOut"><wsdl:part name="parameters" element="tns:AddResponse"/></wsdl:message>
+  <wsdl:portType name="CalcSoap">
+    <wsdl:operation name="Add"><wsdl:input message="tns:AddSoapIn"/><wsdl:output message="tns:AddSoapOut"/></wsdl:operation>
+  </wsdl:portType>
+  <wsdl:binding name="CalcSoap" type="tns:CalcSoap">
+    <soap:binding transport="http://schemas.xmlsoap.org/soap/http"/>
+    <wsdl:operation name="Add">
+      <soap:operation soapAction="http://example.com/calc/Add" style="document"/>
+      <wsdl:input><soap:body use="literal"/></wsdl:input><wsdl:output><soap:body use="literal"/></wsdl:output>
+    </wsdl:operation>
+  </wsdl:binding>
+  <wsdl:service name="Calc">
+    <wsdl:port name="CalcSoap" binding="tns:CalcSoap"><soap:address location="http://example.com/calc.asmx"/></wsdl:port>
+  </wsdl:service>
+</wsdl:definitions>
+"""
+
+
+def _asmx_wsdl(http_binding: str = "http:binding verb=\"GET\"") -> str:
+    # The usual .NET ASMX layout: one operation set per Soap/HttpGet portType.
+    return f"""<?xml version="1.0"?>
+<wsdl:definitions xmlns:wsdl="http://schemas.xmlsoap.org/wsdl/"
+    xmlns:soap="http://schemas.xmlsoap.org/wsdl/soap/"
+    xmlns:http="http://schemas.xmlsoap.org/wsdl/http/"
+    xmlns:s="http://www.w3.org/2001/XMLSchema"
+    xmlns:tns="http://example.com/calc" targetNamespace="http://example.com/calc">
+  <wsdl:types>
+    <s:schema elementFormDefault="qualified" targetNamespace="http://example.com/calc">
+      <s:element name="Add">
+        <s:complexType><s:sequence>
+          <s:element name="a" type="s:int"/><s:element name="b" type="s:int"/>
+        </s:sequence></s:complexType>
+      </s:element>
+      <s:element name="AddResponse">
+        <s:complexType><s:sequence><s:element name="AddResult" type="s:int"/></s:sequence></s:complexType>
+      </s:element>
+      <s:element name="int" type="s:int"/>
+    </s:schema>
+  </wsdl:types>
+  <wsdl:message name="AddSoapIn"><wsdl:part name="parameters" element="tns:Add"/></wsdl:message>
+  <wsdl:message name="AddSoapOut"><wsdl:part name="parameters" element="tns:AddResponse"/></wsdl:message>
+  <wsdl:message name="AddHttpGetIn"><wsdl:part name="a" type="s:string"/><wsdl:part name="b" type="s:string"/></wsdl:message>
+  <wsdl:message name="AddHttpGetOut"><wsdl:part name="Body" element="tns:int"/></wsdl:message>
+  <wsdl:portType name="CalcSoap">
+    <wsdl:operation name="Add"><wsdl:input message="tns:AddSoapIn"/><wsdl:output message="tns:AddSoapOut"/></wsdl:operation>
+  </wsdl:portType>
+  <wsdl:portType name="CalcHttpGet">
+    <wsdl:operation name="Add"><wsdl:input message="tns:AddHttpGetIn"/><wsdl:output message="tns:AddHttpGetOut"/></wsdl:operation>
+  </wsdl:portType>
+  <wsdl:binding name="CalcSoap" type="tns:CalcSoap">
+    <soap:binding transport="http://schemas.xmlsoap.org/soap/http"/>
+    <wsdl:operation name="Add">
+      <soap:operation soapAction="http://example.com/calc/Add" style="document"/>
+      <wsdl:input><soap:body use="literal"/></wsdl:input><wsdl:output><soap:body use="literal"/></wsdl:output>
+    </wsdl:operation>
+  </wsdl:binding>
+  <wsdl:binding name="CalcHttpGet" type="tns:CalcHttpGet">
+    <{http_binding}/>
+    <wsdl:operation name="Add"><http:operation location="/Add"/></wsdl:operation>
+  </wsdl:binding>
+  <wsdl:service name="Calc">
+    <wsdl:port name="CalcSoap" binding="tns:CalcSoap"><soap:address location="http://example.com/calc.asmx"/></wsdl:port>
+  </wsdl:service>
+</wsdl:definitions>
+"""
+
+
+def test_one_post_endpoint_per_operation():
+    doc = compile_openapi(parse_wsdl(_calc_wsdl()))
+    assert list(doc["paths"]) == ["/add"]
+    operation = doc["paths"]["/add"]["post"]
+    assert operation["operationId"] == "Add"
+    assert operation["x-soap-action"] == "http://example.com/calc/Add"
+    assert list(operation["responses"]) == ["200", "400", "500"]
+    assert "Error" in doc["components"]["schemas"]
+
+
+def test_design_ends_with_the_openapi_section():
+    model = parse_wsdl(_calc_wsdl())
+    design = render_design(compile_openapi(model), model)
+    assert "6) OpenAPI 3.0 YAML" in design
+    assert "`POST /add`" in design
+
+
+def test_non_wsdl_input_is_rejected():
+    with pytest.raises(WsdlCompileError):
+        compile_openapi(parse_wsdl("<root/>"))
+
+
+def test_asmx_http_port_types_are_skipped():
+    doc = compile_openapi(parse_wsdl(_asmx_wsdl()))
+    assert list(doc["paths"]) == ["/add"]
+    assert doc["paths"]["/add"]["post"]["operationId"] == "Add"
+    assert validate_openapi(to_yaml(doc)) == []
+
+
+def test_repeated_operations_get_distinct_operation_ids():
+    # Both portTypes SOAP-bound: both are compiled, with prefixed ids.
+    wsdl = _asmx_wsdl('soap:binding transport="http://schemas.xmlsoap.org/soap/http"')
+    doc = compile_openapi(parse_wsdl(wsdl))
+    ids = [item["post"]["operationId"] for item in doc["paths"].values()]
+    assert ids == ["Add", "CalcHttpGet_Add"]
+    assert validate_openapi(to_yaml(doc)) == []
+
+
+def test_overloaded_operations_keep_their_own_endpoints():
+    # WSDL 1.1 allows one portType to overload an operation name.
+    add = '<wsdl:operation name="Add"><wsdl:input message="tns:AddSoapIn"/><wsdl:output message="tns:AddSoapOut"/></wsdl:operation>'
+    wsdl = _calc_wsdl().replace(add, add * 3)
+    doc = compile_openapi(parse_wsdl(wsdl))
+    assert list(doc["paths"]) == ["/add", "/calc-soap/add", "/calc-soap/add-2"]
+    ids = [item["post"]["operationId"] for item in doc["paths"].values()]
+    assert ids == ["Add", "CalcSoap_Add", "CalcSoap_Add_2"]
+    assert validate_openapi(to_yaml(doc)) == []
@@ -0,0 +1,82 @@
+import copy
+
+from openapi_compiler import to_yaml
+from openapi_validate import validate_and_repair, validate_openapi
+
+
+def _doc() -> dict:
+    op = {"operationId": "Add", "responses": {"200": {"description": "ok"}}}
+    return {
+        "openapi": "3.0.3",
+        "info": {"title": "Calc", "version": "1.0.0"},
+        "paths": {"/add": {"post": dict(op)}, "/calc/add": {"post": dict(op)}},
+    }
+
+
+def _answer(operation_id: str):
+    def generate(system_prompt, user_prompt):
+        op = {"operationId": operation_id, "summary": "Adds", "responses": {"200": {"description": "ok"}}}
+        fixed = {"paths": {"/calc/add": {"post": op}}}
+        return f"```yaml\n{to_yaml(fixed)}```"
+
+    return generate
+
+
+def test_duplicate_operation_ids_are_reported():
+    errors = validate_openapi(to_yaml(_doc()))
+    assert len(errors) == 1
+    assert "Add" in errors[0]
+
+
+def test_yaml_syntax_errors_are_reported():
+    assert validate_openapi("openapi: 3.0.3\npaths: [unclosed\n")
+
+
+def test_repair_replaces_the_broken_operation():
+    text, report = validate_and_repair(to_yaml(_doc()), _answer("CalcAdd"), max_attempts=1)
+    assert report.valid and report.repair_calls == 1
+    assert validate_openapi(text) == []
+    assert "CalcAdd" in text
+
+
+def test_valid_yaml_is_returned_unchanged():
+    doc = _doc()
+    del doc["paths"]["/calc/add"]
+    original = to_yaml(doc)
+    text, report = validate_and_repair(original, _answer("Unused"), max_attempts=1)
+    assert text == original
+    assert report.valid and report.repair_calls == 0
+
+
+def test_accepted_repair_leaves_the_callers_doc_alone():
+    doc = _doc()
+    before = copy.deepcopy(doc)
+    text, report = validate_and_repair(to_yaml(doc), _answer("CalcAdd"), max_attempts=1, doc=doc)
+    assert report.valid and report.repair_calls == 1
+    assert "CalcAdd" in text
+    assert doc == before
+
+
+def test_discarded_repair_leaves_the_callers_doc_alone():
+    doc = _doc()
+    before = copy.deepcopy(doc)
+    text, report = validate_and_repair(to_yaml(doc), _answer("Add"), max_attempts=1, doc=doc)
+    assert not report.valid
+    assert "discarded" in report.notes[0]
+    assert doc == before
+    assert report.doc == before
+
+
+def test_root_level_problems_get_the_line_repair():
+    doc = _doc()
+    del doc["paths"]["/calc/add"]
+    doc["$ref"] = "#/missing"
+    prompts = []
+
+    def generate(system_prompt, user_prompt):
+        prompts.append(user_prompt)
+        return "```yaml\nopenapi: 3.0.3\n```"
+
+    text, report = validate_and_repair(to_yaml(doc), generate, max_attempts=1)
+    assert report.repair_calls == 1 and len(prompts) == 1
+    assert not report.valid
@@ -0,0 +1,100 @@
+from llm_backend import FakeGeminiClient
+from openapi_compiler import load_yaml
+from operation_design import design_per_operation, merge_openapi_fragments, operation_slices
+from tracing import Trace
+from wsdl_parser import parse_wsdl
+
+
+CALC_WSDL = """<?xml version="1.0"?>
+<wsdl:definitions xmlns:wsdl="http://schemas.xmlsoap.org/wsdl/"
+    xmlns:soap="http://schemas.xmlsoap.org/wsdl/soap/"
+    xmlns:s="http://www.w3.org/2001/XMLSchema"
+    xmlns:tns="http://example.com/calc" targetNamespace="http://example.com/calc">
+  <wsdl:types>
+    <s:schema elementFormDefault="qualified" targetNamespace="http://example.com/calc">
+      <s:element name="Add">
+        <s:complexType><s:sequence>
+          <s:element name="a" type="s:int"/><s:element name="b" type="s:int"/>
+        </s:sequence></s:complexType>
+      </s:element>
+      <s:element name="AddResponse">
+        <s:complexType><s:sequence><s:element name="AddResult" type="s:int"/></s:sequence></s:complexType>
+      </s:element>
+      <s:element name="Negate">
+        <s:complexType><s:sequence><s:element name="a" type="s:int"/></s:sequence></s:complexType>
+      </s:element>
+    </s:schema>
+  </wsdl:types>
+  <wsdl:message name="AddSoapIn"><wsdl:part name="parameters" element="tns:Add"/></wsdl:message>
+  <wsdl:message name="AddSoapOut"><wsdl:part name="parameters" element="tns:AddResponse"/></wsdl:message>
+  <wsdl:message name="NegateSoapIn"><wsdl:part name="parameters" element="tns:Negate"/></wsdl:message>
+  <wsdl:portType name="CalcSoap">
+    <wsdl:operation name="Add"><wsdl:input message="tns:AddSoapIn"/><wsdl:output message="tns:AddSoapOut"/></wsdl:operation>
+    <wsdl:operation name="Negate"><wsdl:input message="tns:NegateSoapIn"/></wsdl:operation>
+  </wsdl:portType>
+  <wsdl:binding name="CalcSoap" type="tns:CalcSoap">
+    <soap:binding transport="http://schemas.xmlsoap.org/soap/http"/>
+    <wsdl:operation name="Add">
+      <soap:operation soapAction="http://example.com/calc/Add" style="document"/>
+    </wsdl:operation>
+    <wsdl:operation name="Negate">
+      <soap:operation soapAction="http://example.com/calc/Negate" style="document"/>
+    </wsdl:operation>
+  </wsdl:binding>
+</wsdl:definitions>
+"""
+
+# The ASMX layout: the same operations again on an HttpGet-bound portType.
+ASMX_WSDL = CALC_WSDL.replace(
+    "</wsdl:definitions>",
+    """  <wsdl:portType name="CalcHttpGet">
+    <wsdl:operation name="Add"><wsdl:input message="tns:AddSoapIn"/><wsdl:output message="tns:AddSoapOut"/></wsdl:operation>
+  </wsdl:portType>
+  <wsdl:binding name="CalcHttpGet" type="tns:CalcHttpGet">
+    <http:binding xmlns:http="http://schemas.xmlsoap.org/wsdl/http/" verb="GET"/>
+  </wsdl:binding>
+</wsdl:definitions>""",
+)
+
+
+def test_one_slice_per_operation_with_only_its_types():
+    add, negate = operation_slices(parse_wsdl(CALC_WSDL))
+    assert (add.name, negate.name) == ("Add", "Negate")
+    assert "SOAPAction: http://example.com/calc/Add" in add.excerpt
+    assert "AddResponse" in add.excerpt
+    assert "AddResponse" not in negate.excerpt
+    assert "JSON Schemas (components.schemas):" in negate.excerpt
+
+
+def test_merge_keeps_the_first_definition_and_reports_clashes():
+    first = {"paths": {"/add": {"post": {"operationId": "Add"}}}, "components": {"schemas": {"Error": {"type": "object"}}}}
+    second = {
+        "paths": {"/add": {"post": {"operationId": "AddAgain"}}, "/negate": {"post": {"operationId": "Negate"}}},
+        "components": {"schemas": {"Error": {"type": "string"}}},
+    }
+    merged, notes = merge_openapi_fragments([("Add", first), ("Negate", second)], "Calc")
+    assert merged["paths"]["/add"]["post"]["operationId"] == "Add"
+    assert list(merged["paths"]) == ["/add", "/negate"]
+    assert merged["components"]["schemas"]["Error"] == {"type": "object"}
+    assert len(notes) == 2
+
+
+def test_design_per_operation_on_the_fake_backend():
+    client = FakeGeminiClient(latency_ms=0, chunk_ms=0)
+    design, openapi_yaml = design_per_operation(client, "fake-model", parse_wsdl(CALC_WSDL), "Python", "", "", concurrency=2)
+    assert client.stats()["calls"] == 2
+    assert [op["post"]["operationId"] for op in load_yaml(openapi_yaml)["paths"].values()] == ["Add", "Negate"]
+    assert "### Operation: Add" in design and "### Operation: Negate" in design
+
+
+def test_http_port_types_get_no_slices():
+    slices = operation_slices(parse_wsdl(ASMX_WSDL))
+    assert [s.name for s in slices] == ["Add", "Negate"]
+    assert all("PortType: CalcSoap" in s.excerpt for s in slices)
+
+
+def test_per_operation_calls_are_traced_from_the_pool():
+    trace = Trace()
+    with trace.activate():
+        design_per_operation(FakeGeminiClient(latency_ms=0), "fake-model", parse_wsdl(CALC_WSDL), "Python", "", "", concurrency=2)
+    assert [row["span"] for row in trace.rows()] == ["gemini.generate", "gemini.generate"]
@@ -0,0 +1,96 @@
+import io
+import time
+
+import pytest
+
+pypdf = pytest.importorskip("pypdf")
+
+import pdf_extract
+import pipeline
+from disk_cache import DiskCache
+
+
+def _blank_pdf(pages: int) -> bytes:
+    writer = pypdf.PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=200, height=200)
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+
+class _Upload:
+    def __init__(self, name: str, raw: bytes):
+        self.name = name
+        self._raw = raw
+
+    def getvalue(self) -> bytes:
+        return self._raw
+
+
+def _text_or_fail(self, *args, **kwargs):
+    if self.page_number == 1:
+        raise ValueError("broken content stream")
+    return f"page {self.page_number + 1}"
+
+
+def test_serial_path_survives_a_bad_page(monkeypatch):
+    monkeypatch.setattr(pypdf.PageObject, "extract_text", _text_or_fail)
+    text, failed = pdf_extract.extract_pdf_text(_blank_pdf(3), workers=1)
+    assert failed == 1
+    assert "page 1" in text and "page 3" in text
+    assert "[Page text extraction failed: broken content stream]" in text
+
+
+def test_pool_path_times_out_a_stuck_page(monkeypatch):
+    def page_text(page):
+        if page.page_number == 0:
+            time.sleep(30)
+        return f"page {page.page_number + 1}", True
+
+    # Patched before the pool forks, so the workers see it too.
+    monkeypatch.setattr(pdf_extract, "_page_text", page_text)
+    monkeypatch.setattr(pdf_extract, "PARALLEL_MIN_PAGES", 1)
+    started = time.monotonic()
+    text, failed = pdf_extract.extract_pdf_text(_blank_pdf(8), workers=4, deadline_per_page=0.5)
+    assert time.monotonic() - started < 10
+    assert failed >= 1
+    assert "timed out" in text
+    assert "page 8" in text
+
+
+def test_pool_deadline_covers_the_whole_document(monkeypatch):
+    def page_text(page):
+        time.sleep(30)
+        return "never", True
+
+    monkeypatch.setattr(pdf_extract, "_page_text", page_text)
+    monkeypatch.setattr(pdf_extract, "PARALLEL_MIN_PAGES", 1)
+    started = time.monotonic()
+    # 2 workers x 12 pages x 0.25s: one 3s deadline, not 0.75s per queued range.
+    text, failed = pdf_extract.extract_pdf_text(_blank_pdf(24), workers=2, deadline_per_page=0.25)
+    assert time.monotonic() - started < 4.5
+    assert failed == 24
+    assert text.count("timed out") == 24
+
+
+def test_incomplete_pdf_text_is_not_cached(monkeypatch, tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=1 << 20)
+    monkeypatch.setattr(pipeline, "upload_cache", cache)
+    monkeypatch.setattr(pypdf.PageObject, "extract_text", _text_or_fail)
+    upload = _Upload("guide.pdf", _blank_pdf(3))
+
+    assert "extraction failed" in pipeline.read_uploaded_file_to_text(upload)
+    assert not list(tmp_path.rglob("*"))
+
+    monkeypatch.setattr(pypdf.PageObject, "extract_text", lambda self, *a, **k: "ok")
+    assert "extraction failed" not in pipeline.read_uploaded_file_to_text(upload)
+    assert list(tmp_path.rglob("*"))
+
+
+def test_unreadable_pdf_is_not_cached(monkeypatch, tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=1 << 20)
+    monkeypatch.setattr(pipeline, "upload_cache", cache)
+    text = pipeline.read_uploaded_file_to_text(_Upload("broken.pdf", b"not a pdf"))
+    assert text.startswith("[Failed to parse PDF:")
+    assert not list(tmp_path.rglob("*"))
@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+import pipeline
+from disk_cache import DiskCache
+
+
+class _Upload:
+    def __init__(self, name: str, raw: bytes):
+        self.name = name
+        self.size = len(raw)
+        self._raw = raw
+
+    def getvalue(self) -> bytes:
+        return self._raw
+
+
+def test_soap_hints_reuse_a_failed_parse(monkeypatch):
+    calls = []
+    monkeypatch.setattr(pipeline, "parse_wsdl", lambda text: calls.append(text))
+    hints = pipeline.extract_soap_hints("operation name='GetRate' not xml", None)
+    assert calls == []
+    assert hints["possible_operations"] == ["GetRate"]
+
+
+def test_soap_hints_parse_when_no_model_given():
+    hints = pipeline.extract_soap_hints("<definitions xmlns='http://schemas.xmlsoap.org/wsdl/'/>")
+    assert hints["has_wsdl"] is True
+
+
+def test_soap_hints_fall_back_to_regex_for_non_xml():
+    hints = pipeline.extract_soap_hints("<soap:Envelope> operation name='GetRate' xmlns:r=\"urn:rate\"")
+    assert hints["has_soap_envelope"] is True
+    assert hints["possible_operations"] == ["GetRate"]
+    assert hints["namespaces"] == ["r=urn:rate"]
+
+
+def test_json_uploads_are_compacted_and_cached(monkeypatch, tmp_path):
+    monkeypatch.setattr(pipeline, "upload_cache", DiskCache(str(tmp_path), max_bytes=1 << 20))
+    upload = _Upload("sample.json", json.dumps({"a": [1, 2]}, indent=4).encode("utf-8"))
+    assert pipeline.read_uploaded_file_to_text(upload) == '{"a": [1, 2]}'
+    assert list(tmp_path.rglob("*"))
+
+    # A second read is served from the cache without parsing.
+    monkeypatch.setattr(pipeline, "_parse_upload_bytes", lambda *a: "reparsed")
+    assert pipeline.read_uploaded_file_to_text(upload) == '{"a": [1, 2]}'
+
+
+def test_context_picks_the_matching_upload(monkeypatch, tmp_path):
+    monkeypatch.setattr(pipeline, "upload_cache", DiskCache(str(tmp_path), max_bytes=1 << 20))
+    uploads = [
+        _Upload("notes.txt", b"Office hours and holiday schedule."),
+        _Upload("ship.md", b"POST /ship/v1/shipments creates a shipment and returns the label."),
+    ]
+    context = pipeline.build_fedex_context_from_uploads(uploads, "CreateShipment label", top_k=1)
+    assert "ship.md" in context
+    assert "notes.txt" not in context
+
+
+def test_streamed_uploads_use_the_upload_cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(pipeline, "upload_cache", DiskCache(str(tmp_path), max_bytes=1 << 20))
+    monkeypatch.setattr(pipeline, "STREAM_MIN_BYTES", 0)
+    uploads = [_Upload("sample.json", json.dumps({"shipment": {"label": "PDF"}}, indent=4).encode("utf-8"))]
+    stats = {}
+    context = pipeline.build_fedex_context_from_uploads(uploads, "shipment label", token_budget=1000, stats=stats)
+    assert stats["retrieval"] == "streaming"
+    assert '{"shipment": {"label": "PDF"}}' in context
+    assert list(tmp_path.rglob("*"))
+
+    monkeypatch.setattr(pipeline, "_parse_upload_bytes", lambda *a: ("reparsed", True))
+    assert pipeline.build_fedex_context_from_uploads(uploads, "shipment label", token_budget=1000) == context
+
+
+def test_streamed_text_is_read_in_segments(monkeypatch):
+    monkeypatch.setattr(pipeline, "TEXT_SEGMENT_CHARS", 7)
+    monkeypatch.setattr(pipeline, "read_uploaded_file_to_text", lambda up: pytest.fail("whole text read"))
+    monkeypatch.setattr(pipeline, "unit_spans", lambda text: pytest.fail("unit spans on a text upload"))
+    words = " ".join(f"w{i}" for i in range(50))
+    chunks = list(pipeline._stream_upload_chunks([_Upload("notes.txt", ("é " + words).encode("utf-8"))]))
+    assert chunks == [("notes.txt", "é " + words)]
@@ -0,0 +1,69 @@
+import types
+
+import pytest
+
+import rate_limit
+from rate_limit import RateLimiter, TokenBucket, call_with_retries, retry_delay
+
+
+class _ApiError(Exception):
+    def __init__(self, code: int, details: str = ""):
+        super().__init__(f"{code} error")
+        self.code = code
+        self.details = details
+
+
+def test_bucket_waits_once_it_is_empty():
+    bucket = TokenBucket(per_minute=60)
+    assert bucket.reserve(60) == 0.0
+    assert bucket.reserve(1) == pytest.approx(1.0, abs=0.05)
+
+
+def test_server_retry_delay_is_honoured():
+    delay = retry_delay(_ApiError(429, "{'retryDelay': '12s'}"), attempt=0)
+    assert 12.0 <= delay <= 12.0 + rate_limit.BACKOFF_BASE_SECONDS
+
+
+def test_server_retry_delay_is_capped():
+    delay = retry_delay(_ApiError(503, "{'retryDelay': '86400s'}"), attempt=0)
+    assert delay <= rate_limit.BACKOFF_MAX_SECONDS + rate_limit.BACKOFF_BASE_SECONDS
+
+
+def test_client_errors_and_exhausted_retries_are_not_retried():
+    assert retry_delay(_ApiError(400), attempt=0) is None
+    assert retry_delay(_ApiError(503), attempt=rate_limit.MAX_RETRIES) is None
+
+
+def test_httpx_transport_errors_are_retried(monkeypatch):
+    class TransportError(Exception):
+        pass
+
+    class ConnectError(TransportError):
+        pass
+
+    monkeypatch.setitem(rate_limit.sys.modules, "httpx", types.SimpleNamespace(TransportError=TransportError))
+    assert retry_delay(ConnectError("connection refused"), attempt=0) is not None
+    assert retry_delay(ValueError("bad request"), attempt=0) is None
+
+
+def test_real_httpx_timeouts_are_retried():
+    httpx = pytest.importorskip("httpx")
+    assert retry_delay(httpx.ReadTimeout("timed out"), attempt=0) is not None
+
+
+def test_call_with_retries_recovers_from_a_429(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(rate_limit.time, "sleep", sleeps.append)
+    answers = iter([_ApiError(429, "retryDelay: '2s'"), "ok"])
+
+    def call():
+        answer = next(answers)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    limiter = RateLimiter(rpm=1_000, tpm=1_000_000)
+    assert call_with_retries(limiter, 10, call) == "ok"
+    assert len(sleeps) == 1 and sleeps[0] >= 2.0
+    assert limiter.stats()["calls"] == 2
+    assert limiter.stats()["retries"] == 1
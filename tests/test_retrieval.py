@@ -0,0 +1,96 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import retrieval
+from retrieval import ChunkIndex, chunk_spans, fingerprint, get_index, iter_chunks, materialize, prepare_query, stream_top_k
+
+DOCS = [
+    ("notes.txt", "General notes about the project timeline and meeting minutes."),
+    ("auth.md", "Use OAuth client_credentials to get a bearer token before calling the API."),
+    ("ship.md", "POST /ship/v1/shipments creates a shipment and returns the label and tracking number."),
+]
+
+
+def _docs():
+    # No unit spans: each text is chunked into word windows.
+    return [(source, text, []) for source, text in DOCS]
+
+
+def test_search_ranks_matching_chunks_first():
+    index = ChunkIndex.build(_docs())
+    results = index.search("create shipment label", top_k=2)
+    assert [source for _score, source, _chunk in results] == ["ship.md", "auth.md"]
+    assert results[0][0] > results[1][0] > 0
+
+
+def test_unscored_chunks_come_last():
+    index = ChunkIndex.build(_docs())
+    results = index.search("zebra", top_k=3)
+    assert len(results) == 3
+    assert results[-1][:2] == (0.0, "notes.txt")
+
+
+def test_get_index_builds_once_per_key():
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return _docs()
+
+    key = fingerprint([("a.txt", b"one"), ("b.txt", b"two")])
+    assert get_index(key, factory) is get_index(key, factory)
+    assert len(calls) == 1
+    assert fingerprint([("a.txt", b"one")]) != fingerprint([("a.txt", b"uno")])
+
+
+def test_concurrent_misses_share_one_index_build():
+    calls = []
+
+    def slow_factory():
+        calls.append(1)
+        time.sleep(0.1)
+        return _docs()
+
+    key = fingerprint([("concurrent.txt", b"one")])
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        indexes = list(pool.map(lambda _: get_index(key, slow_factory), range(4)))
+    assert len(calls) == 1
+    assert all(index is indexes[0] for index in indexes)
+
+
+def test_prepare_query_is_reused_for_the_same_text():
+    query = prepare_query("GetRates <serviceType>PRIORITY_OVERNIGHT</serviceType>")
+    assert prepare_query("GetRates <serviceType>PRIORITY_OVERNIGHT</serviceType>") is query
+    assert prepare_query(query) is query
+    assert "getrates" in query.terms
+    assert "servicetype" in query.boost_weights
+
+
+def test_prepare_query_waits_for_the_cache_lock():
+    # CLI threads share the cache; a lookup must not run while another thread
+    # is moving or evicting entries.
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        with retrieval._QUERY_LOCK:
+            pending = pool.submit(prepare_query, "GetRates behind the lock")
+            time.sleep(0.05)
+            assert not pending.done()
+        assert "getrates" in pending.result(timeout=5).terms
+
+
+def test_chunk_spans_are_overlapping_word_windows():
+    text = "  ".join(f"w{i}" for i in range(10))
+    chunks = [materialize(text, start, end) for start, end in chunk_spans(text, chunk_size=4, overlap=1)]
+    assert chunks == ["w0 w1 w2 w3", "w3 w4 w5 w6", "w6 w7 w8 w9", "w9"]
+
+
+def test_iter_chunks_matches_chunk_spans_across_segments():
+    text = " ".join(f"word{i}" for i in range(25))
+    spans = [materialize(text, start, end) for start, end in chunk_spans(text, chunk_size=6, overlap=2)]
+    segments = [text[i : i + 7] for i in range(0, len(text), 7)]
+    assert list(iter_chunks(segments, chunk_size=6, overlap=2)) == spans
+
+
+def test_stream_top_k_keeps_the_best_chunks_in_order():
+    results = stream_top_k(iter(DOCS), "create shipment label", top_k=2)
+    assert [source for _score, source, _chunk in results] == ["ship.md", "auth.md"]
+    assert stream_top_k(iter(DOCS), "anything", top_k=0) == []
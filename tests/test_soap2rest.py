@@ -0,0 +1,108 @@
+import json
+
+import pytest
+
+import soap2rest
+from llm_backend import LlmBackendError
+
+
+CALC_WSDL = """<?xml version="1.0"?>
+<wsdl:definitions xmlns:wsdl="http://schemas.xmlsoap.org/wsdl/"
+    xmlns:soap="http://schemas.xmlsoap.org/wsdl/soap/"
+    xmlns:s="http://www.w3.org/2001/XMLSchema"
+    xmlns:tns="http://example.com/calc" targetNamespace="http://example.com/calc">
+  <wsdl:types>
+    <s:schema elementFormDefault="qualified" targetNamespace="http://example.com/calc">
+      <s:element name="Add">
+        <s:complexType><s:sequence>
+          <s:element name="a" type="s:int"/><s:element name="b" type="s:int"/>
+        </s:sequence></s:complexType>
+      </s:element>
+      <s:element name="AddResponse">
+        <s:complexType><s:sequence><s:element name="AddResult" type="s:int"/></s:sequence></s:complexType>
+      </s:element>
+    </s:schema>
+  </wsdl:types>
+  <wsdl:message name="AddSoapIn"><wsdl:part name="parameters" element="tns:Add"/></wsdl:message>
+  <wsdl:message name="AddSoapOut"><wsdl:part name="parameters" element="tns:AddResponse"/></wsdl:message>
+  <wsdl:portType name="CalcSoap">
+    <wsdl:operation name="Add"><wsdl:input message="tns:AddSoapIn"/><wsdl:output message="tns:AddSoapOut"/></wsdl:operation>
+  </wsdl:portType>
+  <wsdl:binding name="CalcSoap" type="tns:CalcSoap">
+    <soap:binding transport="http://schemas.xmlsoap.org/soap/http"/>
+    <wsdl:operation name="Add">
+      <soap:operation soapAction="http://example.com/calc/Add" style="document"/>
+      <wsdl:input><soap:body use="literal"/></wsdl:input><wsdl:output><soap:body use="literal"/></wsdl:output>
+    </wsdl:operation>
+  </wsdl:binding>
+  <wsdl:service name="Calc">
+    <wsdl:port name="CalcSoap" binding="tns:CalcSoap"><soap:address location="http://example.com/calc.asmx"/></wsdl:port>
+  </wsdl:service>
+</wsdl:definitions>
+"""
+
+
+@pytest.fixture
+def cli(monkeypatch, tmp_path):
+    """
+    Runs `soap2rest convert` on tmp_path/wsdls into tmp_path/out and returns
+    the summary. The "gemini" backend is made unavailable so the runs stay
+    offline; "fake" answers without latency.
+    """
+    monkeypatch.setenv("SOAP2REST_FAKE_LATENCY_MS", "0")
+    monkeypatch.setenv("SOAP2REST_FAKE_CHUNK_MS", "0")
+    make_client = soap2rest.make_client
+
+    def offline_client(backend=None):
+        if backend == "gemini":
+            raise LlmBackendError("no Gemini in tests")
+        return make_client(backend)
+
+    monkeypatch.setattr(soap2rest, "make_client", offline_client)
+    wsdls, out = tmp_path / "wsdls", tmp_path / "out"
+    wsdls.mkdir()
+    (wsdls / "calc.wsdl").write_text(CALC_WSDL, encoding="utf-8")
+
+    def run(*args):
+        soap2rest.main(["convert", str(wsdls), "--out", str(out), *args])
+        with open(out / "summary.json", encoding="utf-8") as f:
+            return json.load(f)
+
+    run.wsdls, run.out = wsdls, out
+    return run
+
+
+def _statuses(summary):
+    return [s["status"] for s in summary["services"]]
+
+
+def test_finished_services_are_skipped(cli):
+    assert _statuses(cli("--backend", "fake")) == ["ok"]
+    assert _statuses(cli("--backend", "fake")) == ["skipped"]
+    assert _statuses(cli("--backend", "fake", "--no-resume")) == ["ok"]
+
+
+def test_backend_and_settings_changes_redo_the_service(cli):
+    assert _statuses(cli("--backend", "fake")) == ["ok"]
+    assert _statuses(cli("--backend", "gemini")) == ["ok"]
+    assert _statuses(cli("--backend", "gemini", "--rest-prefs", "kebab-case paths")) == ["ok"]
+    assert _statuses(cli("--backend", "gemini", "--rest-prefs", "kebab-case paths")) == ["skipped"]
+
+
+def test_degraded_runs_are_retried(cli):
+    summary = cli("--backend", "gemini", "--code-source", "template-todos")
+    assert _statuses(summary) == ["degraded"]
+    assert summary["services"][0]["degraded"]
+    assert _statuses(cli("--backend", "gemini", "--code-source", "template-todos")) == ["degraded"]
+    assert _statuses(cli("--backend", "fake", "--code-source", "template-todos")) == ["ok"]
+
+
+def test_colliding_service_names_get_their_own_directories(cli):
+    (cli.wsdls / "a").mkdir()
+    (cli.wsdls / "a" / "b.wsdl").write_text(CALC_WSDL, encoding="utf-8")
+    (cli.wsdls / "a__b.wsdl").write_text(CALC_WSDL, encoding="utf-8")
+    summary = cli("--backend", "fake")
+    assert _statuses(summary) == ["ok", "ok", "ok"]
+    results = sorted(cli.out.glob("*/result.json"))
+    assert len(results) == 3
+    assert {json.loads(p.read_text(encoding="utf-8"))["source"] for p in results} == {s["source"] for s in summary["services"]}
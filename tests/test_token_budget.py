@@ -0,0 +1,20 @@
+from token_budget import OUTPUT_RESERVE_TOKENS, PROMPT_OVERHEAD_TOKENS, context_budget, estimate_tokens, pack_chunks
+
+
+def test_context_budget_is_capped_and_never_negative():
+    budget = context_budget("gemini-2.5-flash", 1_000, {"soap_input": "x" * 400})
+    assert budget["soap_input"] == 100
+    assert budget["fedex_context_budget"] == 1_000
+
+    huge = context_budget("unknown-model", 10**9, {"soap_input": "x" * 8_000_000})
+    assert huge["fedex_context_budget"] == 0
+    assert huge["output_reserve"] == OUTPUT_RESERVE_TOKENS and huge["prompt_overhead"] == PROMPT_OVERHEAD_TOKENS
+
+
+def test_pack_skips_chunks_that_do_not_fit():
+    ranked = [(3.0, "a", "x" * 400), (2.0, "b", "y" * 40), (1.0, "c", "z" * 40), (0.0, "d", "w")]
+    picked, stats = pack_chunks(ranked, budget_tokens=40)
+    assert [source for _score, source, _chunk in picked] == ["b", "c"]
+    assert stats["used"] <= 40
+    assert stats["chunks"] == 2
+    assert estimate_tokens("") == 0
@@ -0,0 +1,45 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from llm import gemini_generate
+from tracing import Trace, current_trace, span
+
+
+def test_spans_need_an_active_trace():
+    assert current_trace() is None
+    with span("outside") as s:
+        s.bytes_out = 1
+    trace = Trace()
+    with trace.activate():
+        with span("inside", bytes_in=10, stage="hints") as s:
+            s.bytes_out = 4
+    assert current_trace() is None
+    [row] = trace.rows()
+    assert (row["span"], row["bytes_in"], row["bytes_out"], row["stage"]) == ("inside", 10, 4, "hints")
+
+
+def test_errors_are_recorded_and_reraised():
+    trace = Trace()
+    with trace.activate(), pytest.raises(KeyError):
+        with span("lookup"):
+            raise KeyError("x")
+    assert trace.rows()[0]["error"] == "KeyError"
+
+
+def test_gemini_calls_record_token_usage(tmp_path):
+    usage = SimpleNamespace(prompt_token_count=12, candidates_token_count=3, total_token_count=15)
+    client = SimpleNamespace(
+        models=SimpleNamespace(generate_content=lambda model, contents: SimpleNamespace(text="done", usage_metadata=usage))
+    )
+    trace = Trace()
+    with trace.activate():
+        assert gemini_generate(client, "test-model", "system", "user") == "done"
+    [row] = trace.rows()
+    assert row["span"] == "gemini.generate"
+    assert (row["prompt_tokens"], row["output_tokens"], row["total_tokens"]) == (12, 3, 15)
+
+    trace.export_jsonl(str(tmp_path / "trace.jsonl"), run="r1")
+    line = json.loads((tmp_path / "trace.jsonl").read_text())
+    assert line["run"] == "r1" and line["model"] == "test-model"
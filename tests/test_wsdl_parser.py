@@ -0,0 +1,76 @@
+import io
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from wsdl_parser import parse_wsdl
+
+
+CALC_WSDL = """<?xml version="1.0"?>
+<wsdl:definitions xmlns:wsdl="http://schemas.xmlsoap.org/wsdl/"
+    xmlns:soap="http://schemas.xmlsoap.org/wsdl/soap/"
+    xmlns:s="http://www.w3.org/2001/XMLSchema"
+    xmlns:tns="http://example.com/calc" targetNamespace="http://example.com/calc" name="Calc">
+  <wsdl:types>
+    <s:schema elementFormDefault="qualified" targetNamespace="http://example.com/calc">
+      <s:element name="Add">
+        <s:complexType><s:sequence>
+          <s:element name="a" type="s:int"/><s:element name="b" type="s:int"/>
+        </s:sequence></s:complexType>
+      </s:element>
+      <s:element name="AddResponse">
+        <s:complexType><s:sequence><s:element name="AddResult" type="s:int"/></s:sequence></s:complexType>
+      </s:element>
+    </s:schema>
+  </wsdl:types>
+  <wsdl:message name="AddSoapIn"><wsdl:part name="parameters" element="tns:Add"/></wsdl:message>
+  <wsdl:message name="AddSoapOut"><wsdl:part name="parameters" element="tns:AddResponse"/></wsdl:message>
+  <wsdl:portType name="CalcSoap">
+    <wsdl:operation name="Add"><wsdl:input message="tns:AddSoapIn"/><wsdl:output message="tns:AddSoapOut"/></wsdl:operation>
+  </wsdl:portType>
+  <wsdl:binding name="CalcSoap" type="tns:CalcSoap">
+    <soap:binding transport="http://schemas.xmlsoap.org/soap/http"/>
+    <wsdl:operation name="Add">
+      <soap:operation soapAction="http://example.com/calc/Add" style="document"/>
+      <wsdl:input><soap:body use="literal"/></wsdl:input><wsdl:output><soap:body use="literal"/></wsdl:output>
+    </wsdl:operation>
+  </wsdl:binding>
+  <wsdl:service name="Calc">
+    <wsdl:port name="CalcSoap" binding="tns:CalcSoap"><soap:address location="http://example.com/calc.asmx"/></wsdl:port>
+  </wsdl:service>
+</wsdl:definitions>
+"""
+
+ENVELOPE = """<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" xmlns:c="http://example.com/calc">
+  <soapenv:Body><c:Add><c:a>1</c:a><c:b>2</c:b></c:Add></soapenv:Body>
+</soapenv:Envelope>"""
+
+
+def test_wsdl_model():
+    model = parse_wsdl(CALC_WSDL)
+    assert model.is_wsdl and not model.is_soap_envelope
+    assert model.target_namespace == "http://example.com/calc"
+    assert ("tns", "http://example.com/calc") in model.namespaces
+
+    [(port_type, op)] = model.operations()
+    assert (port_type.name, op.name) == ("CalcSoap", "Add")
+    assert model.soap_action(port_type, "Add") == "http://example.com/calc/Add"
+    assert [p.element for p in model.message(op.input).parts] == ["{http://example.com/calc}Add"]
+    assert list(model.services) == ["Calc"]
+
+
+def test_streams_and_leading_whitespace_parse_the_same():
+    from_text = parse_wsdl("\ufeff\n  " + CALC_WSDL)
+    from_stream = parse_wsdl(io.BytesIO(CALC_WSDL.encode("utf-8")))
+    assert from_text.operation_names() == from_stream.operation_names() == ["Add"]
+
+
+def test_soap_envelope_body_operations():
+    model = parse_wsdl(ENVELOPE)
+    assert model.is_soap_envelope and not model.is_wsdl
+    assert model.envelope_operations == ["Add"]
+
+
+def test_malformed_xml_raises_parse_error():
+    with pytest.raises(ET.ParseError):
+        parse_wsdl("<definitions><unclosed></definitions>")
@@ -0,0 +1,69 @@
+import re
+
+from wsdl_parser import parse_wsdl
+from xsd_jsonschema import XsdJsonSchema
+
+
+def _converter(schema: str) -> XsdJsonSchema:
+    wsdl = f"""<definitions xmlns="http://schemas.xmlsoap.org/wsdl/"
+        xmlns:xs="http://www.w3.org/2001/XMLSchema" xmlns:tns="urn:t" targetNamespace="urn:t">
+      <types><xs:schema targetNamespace="urn:t">{schema}</xs:schema></types>
+    </definitions>"""
+    return XsdJsonSchema(parse_wsdl(wsdl))
+
+
+def _schema(restriction: str) -> dict:
+    converter = _converter(f'<xs:simpleType name="Zip"><xs:restriction base="xs:string">{restriction}</xs:restriction></xs:simpleType>')
+    ref = converter.type_ref("{urn:t}Zip")
+    return converter.components[ref["$ref"].rsplit("/", 1)[-1]]
+
+
+ADDRESS_TYPES = """
+  <xs:complexType name="Address"><xs:sequence>
+    <xs:element name="street" type="xs:string"/>
+    <xs:element name="unit" type="xs:string" minOccurs="0"/>
+  </xs:sequence></xs:complexType>
+  <xs:complexType name="Shipment"><xs:sequence>
+    <xs:element name="from" type="tns:Address"/>
+    <xs:element name="to" type="tns:Address"/>
+    <xs:element name="parcel" type="xs:int" maxOccurs="unbounded"/>
+  </xs:sequence></xs:complexType>
+"""
+
+
+def test_complex_types_become_object_components():
+    converter = _converter(ADDRESS_TYPES)
+    ref = converter.type_ref("{urn:t}Shipment")
+    shipment = converter.components[ref["$ref"].rsplit("/", 1)[-1]]
+    assert shipment["type"] == "object"
+    assert shipment["properties"]["parcel"]["type"] == "array"
+    assert shipment["properties"]["from"] == shipment["properties"]["to"]
+
+    address = converter.components["Address"]
+    assert address["required"] == ["street"]
+    assert list(address["properties"]) == ["street", "unit"]
+
+
+def test_named_types_are_converted_once():
+    converter = _converter(ADDRESS_TYPES)
+    assert converter.type_ref("{urn:t}Address") == converter.type_ref("{urn:t}Address")
+    converter.type_ref("{urn:t}Shipment")
+    assert sorted(converter.components) == ["Address", "Shipment"]
+
+
+def test_enumerations():
+    assert _schema('<xs:enumeration value="A"/><xs:enumeration value="B"/>')["enum"] == ["A", "B"]
+
+
+def test_pattern_is_anchored():
+    pattern = _schema('<xs:pattern value="[0-9]{5}"/>')["pattern"]
+    assert re.search(pattern, "12345")
+    assert not re.search(pattern, "x12345x")
+    assert not re.search(pattern, "123456")
+
+
+def test_several_patterns_are_alternatives():
+    pattern = _schema('<xs:pattern value="[0-9]{5}"/><xs:pattern value="[0-9]{5}-[0-9]{4}"/>')["pattern"]
+    assert re.search(pattern, "12345")
+    assert re.search(pattern, "12345-6789")
+    assert not re.search(pattern, "12345-")
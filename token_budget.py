@@ -0,0 +1,88 @@
+"""
+Token accounting for prompt assembly: how much room is left for FedEx context
+once the system prompt, SOAP input and output reserve are paid for.
+"""
+import math
+
+
+# Input token limits per model (Gemini 2.5 family: 1M input tokens).
+MODEL_INPUT_TOKENS = {
+    "gemini-2.5-flash": 1_048_576,
+    "gemini-2.5-flash-lite": 1_048_576,
+}
+DEFAULT_INPUT_TOKENS = 1_048_576
+
+# Room kept for the model's answer and for the fixed prompt template text.
+OUTPUT_RESERVE_TOKENS = 65_536
+PROMPT_OVERHEAD_TOKENS = 400
+
+CHUNK_SEPARATOR = "\n\n---\n\n"
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Local estimate (~4 characters per token for English/XML). No network.
+    """
+    return math.ceil(len(text) / 4) if text else 0
+
+
+def make_token_counter(client, model: str):
+    """
+    Counter backed by the SDK's count_tokens, falling back to the local
+    estimate if the call fails. One request per call: use for a few large
+    texts, not per chunk.
+    """
+    def count(text: str) -> int:
+        if not text:
+            return 0
+        try:
+            return client.models.count_tokens(model=model, contents=text).total_tokens
+        except Exception:
+            return estimate_tokens(text)
+
+    return count
+
+
+def context_budget(model: str, context_cap: int, fixed_texts: dict, count=estimate_tokens) -> dict:
+    """
+    Returns the per-stage budget: tokens used by each fixed input and the
+    number left for the FedEx context (never more than context_cap).
+    """
+    limit = MODEL_INPUT_TOKENS.get(model, DEFAULT_INPUT_TOKENS)
+    budget = {"model_input_limit": limit, "output_reserve": OUTPUT_RESERVE_TOKENS, "prompt_overhead": PROMPT_OVERHEAD_TOKENS}
+    used = OUTPUT_RESERVE_TOKENS + PROMPT_OVERHEAD_TOKENS
+    for name, text in fixed_texts.items():
+        budget[name] = count(text)
+        used += budget[name]
+    budget["fedex_context_budget"] = max(0, min(context_cap, limit - used))
+    return budget
+
+
+def pack_chunks(ranked, budget_tokens: int, count=estimate_tokens, max_misses: int = 50):
+    """
+    Greedily fills budget_tokens with the highest-scoring chunks from `ranked`
+    ((score, source, chunk) tuples, best first). Chunks that don't fit are
+    skipped so smaller, lower-ranked ones can still use the space; scanning
+    stops after max_misses consecutive misses.
+
+    Returns (picked, stats).
+    """
+    picked = []
+    used = 0
+    misses = 0
+    considered = 0
+    sep = count(CHUNK_SEPARATOR)
+    for score, source, chunk in ranked:
+        if score <= 0 or used >= budget_tokens:
+            break
+        considered += 1
+        cost = count(f"[SOURCE FILE: {source}]\n{chunk}") + (sep if picked else 0)
+        if used + cost > budget_tokens:
+            misses += 1
+            if misses >= max_misses:
+                break
+            continue
+        misses = 0
+        picked.append((score, source, chunk))
+        used += cost
+    return picked, {"budget": budget_tokens, "used": used, "chunks": len(picked), "considered": considered}
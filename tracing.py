@@ -0,0 +1,144 @@
+"""
+Lightweight spans for timing a conversion stage by stage.
+
+    trace = Trace()
+    with trace.activate():
+        with span("soap.hints", bytes_in=len(text)) as s:
+            ...
+            s.bytes_out = ...
+
+Each span records wall time, CPU time of the running thread, bytes in/out
+and, for Gemini calls, the SDK's usage_metadata token counts. The active
+trace lives in a context variable, which new threads and thread-pool workers
+don't inherit: submit work through contextvars.copy_context().run (as
+operation_design's pool and app.py's code-stream thread do) so its spans land
+in the caller's trace. Without an active trace, span() records nothing.
+
+A span around a generator (gemini.stream) stays open while the consumer
+handles each chunk, so its wall_ms and cpu_ms include the consumer's time;
+gemini.stream reports the wall time spent in the consumer as consumer_ms.
+"""
+import contextvars
+import json
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+
+# usage_metadata attribute -> column name
+USAGE_FIELDS = (
+    ("prompt_token_count", "prompt_tokens"),
+    ("candidates_token_count", "output_tokens"),
+    ("cached_content_token_count", "cached_tokens"),
+    ("total_token_count", "total_tokens"),
+)
+
+_current: contextvars.ContextVar["Trace | None"] = contextvars.ContextVar("soap2rest_trace", default=None)
+_EXPORT_LOCK = threading.Lock()
+
+
+@dataclass
+class Span:
+    name: str
+    start_ms: float = 0.0
+    wall_ms: float = 0.0
+    cpu_ms: float = 0.0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    attrs: dict = field(default_factory=dict)
+
+    def record_usage(self, usage_metadata) -> None:
+        if usage_metadata is None:
+            return
+        for attr, column in USAGE_FIELDS:
+            value = getattr(usage_metadata, attr, None)
+            if value is not None:
+                self.attrs[column] = value
+
+
+class Trace:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def activate(self):
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+    def bind(self) -> "Trace":
+        """
+        Makes this the active trace for the rest of the current context (e.g. a
+        Streamlit script run), until another trace is bound.
+        """
+        _current.set(self)
+        return self
+
+    def add(self, s: Span) -> None:
+        with self._lock:
+            self.spans.append(s)
+
+    def rows(self) -> list[dict]:
+        """
+        One dict per span, in start order.
+        """
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start_ms)
+        return [
+            {
+                "span": s.name,
+                "start_ms": round(s.start_ms, 1),
+                "wall_ms": round(s.wall_ms, 1),
+                "cpu_ms": round(s.cpu_ms, 1),
+                "bytes_in": s.bytes_in,
+                "bytes_out": s.bytes_out,
+                **s.attrs,
+            }
+            for s in spans
+        ]
+
+    def to_jsonl(self, **fields) -> str:
+        return "".join(json.dumps({**fields, **row}, default=str) + "\n" for row in self.rows())
+
+    def export_jsonl(self, path: str, **fields) -> None:
+        """
+        Appends the spans to path as JSON lines, with `fields` on every line.
+        """
+        text = self.to_jsonl(**fields)
+        with _EXPORT_LOCK, open(path, "a", encoding="utf-8") as f:
+            f.write(text)
+
+
+def current_trace() -> Trace | None:
+    return _current.get()
+
+
+@contextmanager
+def span(name: str, bytes_in: int = 0, **attrs):
+    """
+    Times the block into the active trace. Set bytes_out / attrs on the
+    yielded Span; exceptions are recorded by type and re-raised.
+    """
+    s = Span(name, bytes_in=bytes_in, attrs=attrs)
+    trace = _current.get()
+    if trace is None:
+        yield s
+        return
+
+    wall0 = time.perf_counter()
+    cpu0 = time.thread_time()
+    s.start_ms = (wall0 - trace.started) * 1000
+    try:
+        yield s
+    except BaseException as e:
+        s.attrs["error"] = type(e).__name__
+        raise
+    finally:
+        s.wall_ms = (time.perf_counter() - wall0) * 1000
+        s.cpu_ms = (time.thread_time() - cpu0) * 1000
+        trace.add(s)
@@ -0,0 +1,386 @@
+"""
+Streaming WSDL 1.1 / XSD parser.
+
+Builds a WsdlModel (types, messages, portTypes, bindings, services, SOAPAction
+values) in one pass with XMLPullParser. Each top-level component is turned
+into a small model object as soon as its end tag is seen and the element is
+dropped from the tree, so memory tracks the model rather than the document.
+
+Qualified attribute values (type="tns:Foo", message=..., binding=...) are
+resolved against the in-scope namespaces and stored in Clark notation
+("{uri}Foo").
+"""
+import os
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+
+
+WSDL_NS = "http://schemas.xmlsoap.org/wsdl/"
+WSDL2_NS = "http://www.w3.org/ns/wsdl"
+SOAP11_BINDING_NS = "http://schemas.xmlsoap.org/wsdl/soap/"
+SOAP12_BINDING_NS = "http://schemas.xmlsoap.org/wsdl/soap12/"
+XSD_NS = "http://www.w3.org/2001/XMLSchema"
+SOAP_ENV_NS = (
+    "http://schemas.xmlsoap.org/soap/envelope/",
+    "http://www.w3.org/2003/05/soap-envelope",
+)
+
+# Attributes whose values are QNames and must be resolved while the
+# declaring element's namespaces are still in scope.
+QNAME_ATTRS = ("type", "base", "ref", "element", "message", "binding", "itemType", "substitutionGroup")
+
+# Top-level schema components kept in the model.
+XSD_COMPONENTS = ("element", "complexType", "simpleType", "group", "attributeGroup")
+
+READ_SIZE = 64 * 1024
+
+
+def qname(ns: str | None, local: str) -> str:
+    return f"{{{ns}}}{local}" if ns else local
+
+
+def split_qname(name: str) -> tuple[str | None, str]:
+    if name and name[0] == "{":
+        ns, _, local = name[1:].partition("}")
+        return ns, local
+    return None, name
+
+
+def local_name(name: str | None) -> str:
+    return split_qname(name)[1] if name else ""
+
+
+# ------------------------------------------------------------
+# Model
+# ------------------------------------------------------------
+@dataclass(slots=True)
+class XsdNode:
+    """
+    Compact copy of an XSD element subtree (annotations folded into `doc`).
+    """
+    kind: str
+    attrs: dict
+    children: list = field(default_factory=list)
+    doc: str = ""
+
+
+@dataclass
+class MessagePart:
+    name: str
+    element: str | None = None
+    type: str | None = None
+
+
+@dataclass
+class Message:
+    name: str
+    parts: list[MessagePart] = field(default_factory=list)
+
+
+@dataclass
+class Operation:
+    name: str
+    input: str | None = None
+    output: str | None = None
+    faults: list[tuple[str, str]] = field(default_factory=list)
+    documentation: str = ""
+
+
+@dataclass
+class PortType:
+    name: str
+    # Keyed by name; overloads (WSDL 1.1 allows them) get "name#2", "name#3".
+    operations: dict[str, Operation] = field(default_factory=dict)
+
+
+@dataclass
+class BindingOperation:
+    name: str
+    soap_action: str | None = None
+    style: str | None = None
+    use: str | None = None
+
+
+@dataclass
+class Binding:
+    name: str
+    type: str | None = None
+    style: str | None = None
+    transport: str | None = None
+    soap_version: str | None = None
+    operations: dict[str, BindingOperation] = field(default_factory=dict)
+
+
+@dataclass
+class Port:
+    name: str
+    binding: str | None = None
+    address: str | None = None
+
+
+@dataclass
+class Service:
+    name: str
+    ports: list[Port] = field(default_factory=list)
+    documentation: str = ""
+
+
+@dataclass
+class WsdlModel:
+    name: str | None = None
+    target_namespace: str | None = None
+    is_wsdl: bool = False
+    is_soap_envelope: bool = False
+    namespaces: list[tuple[str, str]] = field(default_factory=list)
+    elements: dict[str, XsdNode] = field(default_factory=dict)
+    types: dict[str, XsdNode] = field(default_factory=dict)
+    groups: dict[str, XsdNode] = field(default_factory=dict)
+    messages: dict[str, Message] = field(default_factory=dict)
+    port_types: dict[str, PortType] = field(default_factory=dict)
+    bindings: dict[str, Binding] = field(default_factory=dict)
+    services: dict[str, Service] = field(default_factory=dict)
+    # Local names of Body children when the input is a SOAP envelope.
+    envelope_operations: list[str] = field(default_factory=list)
+
+    def operations(self) -> list[tuple[PortType, Operation]]:
+        return [(pt, op) for pt in self.port_types.values() for op in pt.operations.values()]
+
+    def operation_names(self) -> list[str]:
+        names = [op.name for _, op in self.operations()]
+        for b in self.bindings.values():
+            names.extend(b.operations)
+        names.extend(self.envelope_operations)
+        return list(dict.fromkeys(names))
+
+    def binding_for(self, port_type: PortType) -> Binding | None:
+        for b in self.bindings.values():
+            if local_name(b.type) == port_type.name:
+                return b
+        return None
+
+    def soap_action(self, port_type: PortType, op_name: str) -> str | None:
+        b = self.binding_for(port_type)
+        bop = b.operations.get(op_name) if b else None
+        return bop.soap_action if bop else None
+
+    def message(self, name: str | None) -> Message | None:
+        return self.messages.get(local_name(name)) if name else None
+
+
+# ------------------------------------------------------------
+# Parser
+# ------------------------------------------------------------
+def _text(elem) -> str:
+    return " ".join("".join(elem.itertext()).split()) if elem is not None else ""
+
+
+def _to_xsd_node(elem) -> XsdNode:
+    ns, kind = split_qname(elem.tag)
+    node = XsdNode(kind=kind, attrs=dict(elem.attrib))
+    for child in elem:
+        if not isinstance(child.tag, str):
+            continue
+        cns, ckind = split_qname(child.tag)
+        if ckind == "annotation":
+            node.doc = " ".join(filter(None, [node.doc, _text(child)]))
+        elif cns == XSD_NS:
+            node.children.append(_to_xsd_node(child))
+    return node
+
+
+class _Builder:
+    def __init__(self):
+        self.model = WsdlModel()
+        self.stack: list = []
+        self.scopes: list[dict] = [{}]
+        self.pending_ns: dict = {}
+        self.schema_tns: list[str | None] = []
+
+    def resolve(self, value: str) -> str:
+        prefix, sep, local = value.partition(":")
+        if not sep:
+            return qname(self.scopes[-1].get(""), value)
+        uri = self.scopes[-1].get(prefix)
+        return qname(uri, local) if uri else value
+
+    def feed(self, events) -> None:
+        for event, obj in events:
+            if event == "start-ns":
+                prefix, uri = obj
+                self.pending_ns[prefix] = uri
+                if prefix and (prefix, uri) not in self.model.namespaces:
+                    self.model.namespaces.append((prefix, uri))
+            elif event == "start":
+                self.start(obj)
+            elif event == "end":
+                self.end(obj)
+
+    def start(self, elem) -> None:
+        scope = self.scopes[-1]
+        if self.pending_ns:
+            scope = {**scope, **self.pending_ns}
+            self.pending_ns = {}
+        self.scopes.append(scope)
+
+        for attr in QNAME_ATTRS:
+            value = elem.attrib.get(attr)
+            if value:
+                elem.attrib[attr] = self.resolve(value)
+
+        ns, local = split_qname(elem.tag)
+        depth = len(self.stack)
+        if depth == 0:
+            if ns == WSDL_NS and local == "definitions":
+                self.model.is_wsdl = True
+                self.model.name = elem.get("name")
+                self.model.target_namespace = elem.get("targetNamespace")
+            elif ns == WSDL2_NS and local == "description":
+                self.model.is_wsdl = True
+                self.model.target_namespace = elem.get("targetNamespace")
+        if local == "Envelope" and ns in SOAP_ENV_NS:
+            self.model.is_soap_envelope = True
+        if ns == XSD_NS and local == "schema":
+            self.schema_tns.append(elem.get("targetNamespace"))
+
+        self.stack.append(elem)
+
+    def end(self, elem) -> None:
+        self.stack.pop()
+        self.scopes.pop()
+        parent = self.stack[-1] if self.stack else None
+        ns, local = split_qname(elem.tag)
+        pns, plocal = split_qname(parent.tag) if parent is not None else (None, "")
+
+        handled = False
+        if pns == XSD_NS and plocal == "schema" and ns == XSD_NS and local in XSD_COMPONENTS:
+            self._schema_component(elem, local)
+            handled = True
+        elif ns == XSD_NS and local == "schema":
+            self.schema_tns.pop()
+            handled = True
+        elif pns in SOAP_ENV_NS and plocal == "Body":
+            self.model.envelope_operations.append(local)
+        elif pns == WSDL_NS and plocal == "definitions":
+            handler = getattr(self, f"_wsdl_{local}", None)
+            if handler:
+                handler(elem)
+            handled = True
+        elif pns == WSDL2_NS and plocal == "description" and local == "interface":
+            self._wsdl2_interface(elem)
+            handled = True
+
+        # Drop processed components so the tree never holds the whole document.
+        if handled and parent is not None:
+            parent.remove(elem)
+
+    def _schema_component(self, elem, kind: str) -> None:
+        name = elem.get("name")
+        if not name:
+            return
+        key = qname(self.schema_tns[-1] if self.schema_tns else None, name)
+        node = _to_xsd_node(elem)
+        if kind == "element":
+            self.model.elements[key] = node
+        elif kind in ("complexType", "simpleType"):
+            self.model.types[key] = node
+        else:
+            self.model.groups[f"{kind}:{key}"] = node
+
+    def _wsdl_message(self, elem) -> None:
+        msg = Message(name=elem.get("name", ""))
+        for part in elem.findall(f"{{{WSDL_NS}}}part"):
+            msg.parts.append(MessagePart(name=part.get("name", ""), element=part.get("element"), type=part.get("type")))
+        self.model.messages[msg.name] = msg
+
+    def _wsdl_portType(self, elem) -> None:
+        pt = PortType(name=elem.get("name", ""))
+        for op_el in elem.findall(f"{{{WSDL_NS}}}operation"):
+            op = Operation(name=op_el.get("name", ""))
+            inp = op_el.find(f"{{{WSDL_NS}}}input")
+            out = op_el.find(f"{{{WSDL_NS}}}output")
+            op.input = inp.get("message") if inp is not None else None
+            op.output = out.get("message") if out is not None else None
+            for fault in op_el.findall(f"{{{WSDL_NS}}}fault"):
+                op.faults.append((fault.get("name", ""), fault.get("message", "")))
+            op.documentation = _text(op_el.find(f"{{{WSDL_NS}}}documentation"))
+            key, n = op.name, 1
+            while key in pt.operations:
+                n += 1
+                key = f"{op.name}#{n}"
+            pt.operations[key] = op
+        self.model.port_types[pt.name] = pt
+
+    def _wsdl_binding(self, elem) -> None:
+        b = Binding(name=elem.get("name", ""), type=elem.get("type"))
+        for soap_ns, version in ((SOAP11_BINDING_NS, "1.1"), (SOAP12_BINDING_NS, "1.2")):
+            sb = elem.find(f"{{{soap_ns}}}binding")
+            if sb is not None:
+                b.style = sb.get("style")
+                b.transport = sb.get("transport")
+                b.soap_version = version
+                break
+        for op_el in elem.findall(f"{{{WSDL_NS}}}operation"):
+            bop = BindingOperation(name=op_el.get("name", ""))
+            for soap_ns in (SOAP11_BINDING_NS, SOAP12_BINDING_NS):
+                so = op_el.find(f"{{{soap_ns}}}operation")
+                if so is not None:
+                    bop.soap_action = so.get("soapAction")
+                    bop.style = so.get("style") or b.style
+                body = op_el.find(f"{{{WSDL_NS}}}input/{{{soap_ns}}}body")
+                if body is not None:
+                    bop.use = body.get("use")
+            b.operations[bop.name] = bop
+        self.model.bindings[b.name] = b
+
+    def _wsdl_service(self, elem) -> None:
+        svc = Service(name=elem.get("name", ""), documentation=_text(elem.find(f"{{{WSDL_NS}}}documentation")))
+        for port_el in elem.findall(f"{{{WSDL_NS}}}port"):
+            port = Port(name=port_el.get("name", ""), binding=port_el.get("binding"))
+            for soap_ns in (SOAP11_BINDING_NS, SOAP12_BINDING_NS):
+                addr = port_el.find(f"{{{soap_ns}}}address")
+                if addr is not None:
+                    port.address = addr.get("location")
+            svc.ports.append(port)
+        self.model.services[svc.name] = svc
+
+    def _wsdl2_interface(self, elem) -> None:
+        # WSDL 2.0 is only recognised far enough to list its operations.
+        pt = PortType(name=elem.get("name", ""))
+        for op_el in elem.findall(f"{{{WSDL2_NS}}}operation"):
+            pt.operations[op_el.get("name", "")] = Operation(name=op_el.get("name", ""))
+        self.model.port_types[pt.name] = pt
+
+
+def _chunks(source):
+    if isinstance(source, (str, bytes)):
+        # Leading whitespace/BOM before an XML declaration is a parse error.
+        data = source.lstrip("\ufeff \t\r\n") if isinstance(source, str) else source.lstrip(b"\xef\xbb\xbf \t\r\n")
+        for i in range(0, len(data), READ_SIZE):
+            yield data[i : i + READ_SIZE]
+        return
+
+    f = open(source, "rb") if isinstance(source, os.PathLike) else source
+    try:
+        while True:
+            block = f.read(READ_SIZE)
+            if not block:
+                break
+            yield block
+    finally:
+        if f is not source:
+            f.close()
+
+
+def parse_wsdl(source) -> WsdlModel:
+    """
+    Parses WSDL/XSD/SOAP XML from a string, bytes, os.PathLike path or binary stream.
+    Raises xml.etree.ElementTree.ParseError if the input is not well-formed XML.
+    """
+    parser = ET.XMLPullParser(events=("start-ns", "start", "end"))
+    builder = _Builder()
+    for block in _chunks(source):
+        parser.feed(block)
+        builder.feed(parser.read_events())
+    parser.close()
+    builder.feed(parser.read_events())
+    return builder.model
@@ -0,0 +1,393 @@
+"""
+XSD -> JSON Schema (OpenAPI 3.0 dialect) conversion.
+
+Named types are resolved once and memoized as `$ref` components, so shared
+FedEx types (Address, Party, Weight, ...) appear once in components.schemas no
+matter how many operations use them. Recursive types terminate because the
+component name is reserved before its body is converted.
+
+Mapping conventions:
+  - sequence/all -> object properties; choice -> oneOf over required sets
+  - maxOccurs > 1 / unbounded -> array (minItems/maxItems from the occurs)
+  - minOccurs="0" -> not required; nillable="true" -> nullable
+  - complexContent extension -> allOf [base, own properties]
+  - simpleContent -> object with a `value` property plus attributes
+  - attributes -> properties of the same name
+"""
+import re
+
+from wsdl_parser import XSD_NS, WsdlModel, XsdNode, local_name, split_qname
+
+
+BUILTIN_TYPES = {
+    "string": {"type": "string"},
+    "normalizedString": {"type": "string"},
+    "token": {"type": "string"},
+    "language": {"type": "string"},
+    "Name": {"type": "string"},
+    "NCName": {"type": "string"},
+    "QName": {"type": "string"},
+    "ID": {"type": "string"},
+    "IDREF": {"type": "string"},
+    "NMTOKEN": {"type": "string"},
+    "anyURI": {"type": "string", "format": "uri"},
+    "boolean": {"type": "boolean"},
+    "decimal": {"type": "number"},
+    "float": {"type": "number", "format": "float"},
+    "double": {"type": "number", "format": "double"},
+    "integer": {"type": "integer"},
+    "int": {"type": "integer", "format": "int32"},
+    "long": {"type": "integer", "format": "int64"},
+    "short": {"type": "integer", "minimum": -32768, "maximum": 32767},
+    "byte": {"type": "integer", "minimum": -128, "maximum": 127},
+    "nonNegativeInteger": {"type": "integer", "minimum": 0},
+    "positiveInteger": {"type": "integer", "minimum": 1},
+    "nonPositiveInteger": {"type": "integer", "maximum": 0},
+    "negativeInteger": {"type": "integer", "maximum": -1},
+    "unsignedLong": {"type": "integer", "minimum": 0, "format": "int64"},
+    "unsignedInt": {"type": "integer", "minimum": 0},
+    "unsignedShort": {"type": "integer", "minimum": 0, "maximum": 65535},
+    "unsignedByte": {"type": "integer", "minimum": 0, "maximum": 255},
+    "date": {"type": "string", "format": "date"},
+    "dateTime": {"type": "string", "format": "date-time"},
+    "time": {"type": "string"},
+    "duration": {"type": "string"},
+    "gYear": {"type": "string"},
+    "gYearMonth": {"type": "string"},
+    "base64Binary": {"type": "string", "format": "byte"},
+    "hexBinary": {"type": "string"},
+    "anyType": {},
+    "anySimpleType": {},
+}
+
+# pattern is handled separately: XSD patterns are implicitly anchored and
+# several in one restriction are alternatives.
+FACETS = {
+    "minLength": ("minLength", int),
+    "maxLength": ("maxLength", int),
+    "length": (None, int),
+    "minInclusive": ("minimum", float),
+    "maxInclusive": ("maximum", float),
+    "minExclusive": ("minimum", float),
+    "maxExclusive": ("maximum", float),
+}
+
+
+class SchemaNames:
+    """
+    Assigns component names from XSD QNames, suffixing on clashes.
+    """
+
+    def __init__(self, reserved=("Error",)):
+        self.by_key: dict[tuple, str] = {}
+        self.used: set[str] = set(reserved)
+
+    def name_for(self, kind: str, qn: str) -> str:
+        key = (kind, qn)
+        if key in self.by_key:
+            return self.by_key[key]
+        base = re.sub(r"[^A-Za-z0-9_.-]", "_", local_name(qn)) or "Schema"
+        name, n = base, 2
+        while name in self.used:
+            name, n = f"{base}{n}", n + 1
+        self.used.add(name)
+        self.by_key[key] = name
+        return name
+
+
+def _ref(name: str) -> dict:
+    return {"$ref": f"#/components/schemas/{name}"}
+
+
+def _number(value: str, cast):
+    try:
+        n = cast(value)
+    except ValueError:
+        return None
+    return int(n) if cast is float and n.is_integer() else n
+
+
+def _anchored(patterns: list[str]) -> str:
+    # JSON Schema patterns match anywhere in the string.
+    if len(patterns) == 1:
+        return f"^(?:{patterns[0]})$"
+    return "^(?:" + "|".join(f"(?:{p})" for p in patterns) + ")$"
+
+
+class XsdJsonSchema:
+    def __init__(self, model: WsdlModel, names: SchemaNames | None = None):
+        self.model = model
+        self.names = names or SchemaNames()
+        self.components: dict[str, dict] = {}
+        self.unresolved: list[str] = []
+        self._type_refs: dict[str, dict] = {}
+        self._element_refs: dict[str, dict] = {}
+
+    # -- entry points -------------------------------------------------
+    def element_ref(self, qn: str) -> dict:
+        """
+        Schema for a global element: the $ref of its named type, or a
+        component built from its anonymous type.
+        """
+        if qn in self._element_refs:
+            return self._element_refs[qn]
+        node = self.model.elements.get(qn)
+        if node is None:
+            self.unresolved.append(f"element {local_name(qn)}")
+            schema = {"description": f"Unresolved XSD element {local_name(qn)}"}
+            self._element_refs[qn] = schema
+            return schema
+
+        type_qn = node.attrs.get("type")
+        if type_qn:
+            schema = self.type_ref(type_qn)
+        else:
+            name = self.names.name_for("element", qn)
+            schema = _ref(name)
+            self._element_refs[qn] = schema
+            self.components[name] = {}  # reserve, as in type_ref
+            self.components[name] = self._inline_type(node) or {}
+        if node.attrs.get("nillable") == "true":
+            schema = {"allOf": [schema], "nullable": True}
+        self._element_refs[qn] = schema
+        return schema
+
+    def type_ref(self, qn: str) -> dict:
+        """
+        Schema for a named type: builtin mapping, or a memoized $ref component.
+        """
+        ns, local = split_qname(qn)
+        if ns == XSD_NS:
+            if local not in BUILTIN_TYPES:
+                return {"type": "string", "description": f"xs:{local}"}
+            return dict(BUILTIN_TYPES[local])
+
+        if qn in self._type_refs:
+            return self._type_refs[qn]
+        node = self.model.types.get(qn)
+        if node is None:
+            self.unresolved.append(f"type {local}")
+            schema = {"description": f"Unresolved XSD type {local}"}
+            self._type_refs[qn] = schema
+            return schema
+
+        name = self.names.name_for("type", qn)
+        self._type_refs[qn] = _ref(name)
+        self.components[name] = {}  # reserve: recursive references resolve to the $ref
+        schema = self._complex(node) if node.kind == "complexType" else self._simple(node)
+        if node.doc:
+            schema.setdefault("description", node.doc)
+        self.components[name] = schema
+        return self._type_refs[qn]
+
+    # -- helpers ------------------------------------------------------
+    def _inline_type(self, node: XsdNode) -> dict | None:
+        for child in node.children:
+            if child.kind == "complexType":
+                schema = self._complex(child)
+            elif child.kind == "simpleType":
+                schema = self._simple(child)
+            else:
+                continue
+            if node.doc:
+                schema.setdefault("description", node.doc)
+            return schema
+        return None
+
+    def _simple(self, node: XsdNode) -> dict:
+        for child in node.children:
+            if child.kind == "restriction":
+                base = child.attrs.get("base")
+                schema = dict(self.type_ref(base)) if base else (self._inline_type(child) or {"type": "string"})
+                if "$ref" in schema:
+                    schema = {"allOf": [schema]}
+                enum = []
+                patterns = []
+                for facet in child.children:
+                    value = facet.attrs.get("value")
+                    if value is None:
+                        continue
+                    if facet.kind == "enumeration":
+                        enum.append(value)
+                    elif facet.kind == "pattern":
+                        patterns.append(value)
+                    elif facet.kind in FACETS:
+                        key, cast = FACETS[facet.kind]
+                        n = _number(value, cast)
+                        if n is None:
+                            continue
+                        if facet.kind == "length":
+                            schema["minLength"] = schema["maxLength"] = n
+                        else:
+                            schema[key] = n
+                            if facet.kind in ("minExclusive", "maxExclusive"):
+                                schema["exclusiveMinimum" if facet.kind == "minExclusive" else "exclusiveMaximum"] = True
+                if enum:
+                    schema["enum"] = enum
+                if patterns:
+                    schema["pattern"] = _anchored(patterns)
+                return schema
+            if child.kind == "list":
+                item = child.attrs.get("itemType")
+                items = self.type_ref(item) if item else (self._inline_type(child) or {"type": "string"})
+                return {"type": "array", "items": items}
+            if child.kind == "union":
+                members = [self._simple(m) for m in child.children if m.kind == "simpleType"]
+                return {"anyOf": members} if members else {"type": "string"}
+        return {"type": "string"}
+
+    def _complex(self, node: XsdNode) -> dict:
+        obj = {"type": "object", "properties": {}}
+        required: list[str] = []
+        choices: list[dict] = []
+
+        for child in node.children:
+            if child.kind in ("sequence", "all", "choice", "group"):
+                self._particle(child, obj, required, choices, optional=False)
+            elif child.kind in ("attribute", "attributeGroup"):
+                self._attribute(child, obj, required)
+            elif child.kind == "anyAttribute":
+                continue
+            elif child.kind == "simpleContent":
+                return self._simple_content(child, obj, required)
+            elif child.kind == "complexContent":
+                return self._complex_content(child, obj, required, choices)
+
+        return self._finish(obj, required, choices)
+
+    def _finish(self, obj: dict, required: list, choices: list) -> dict:
+        if required:
+            obj["required"] = list(dict.fromkeys(required))
+        if not obj["properties"]:
+            del obj["properties"]
+        if len(choices) == 1:
+            obj.update(choices[0])
+        elif choices:
+            obj["allOf"] = choices
+        return obj
+
+    def _simple_content(self, node: XsdNode, obj: dict, required: list) -> dict:
+        for deriv in node.children:
+            if deriv.kind not in ("extension", "restriction"):
+                continue
+            base = deriv.attrs.get("base")
+            value = self.type_ref(base) if base else {"type": "string"}
+            if deriv.kind == "restriction":
+                value = self._simple(XsdNode(kind="simpleType", attrs={}, children=[deriv]))
+            obj["properties"]["value"] = value
+            required.append("value")
+            for attr in deriv.children:
+                if attr.kind in ("attribute", "attributeGroup"):
+                    self._attribute(attr, obj, required)
+        return self._finish(obj, required, [])
+
+    def _complex_content(self, node: XsdNode, obj: dict, required: list, choices: list) -> dict:
+        for deriv in node.children:
+            if deriv.kind not in ("extension", "restriction"):
+                continue
+            for child in deriv.children:
+                if child.kind in ("sequence", "all", "choice", "group"):
+                    self._particle(child, obj, required, choices, optional=False)
+                elif child.kind in ("attribute", "attributeGroup"):
+                    self._attribute(child, obj, required)
+            own = self._finish(obj, required, choices)
+            base = deriv.attrs.get("base")
+            if deriv.kind == "extension" and base and split_qname(base)[1] != "anyType":
+                base_schema = self.type_ref(base)
+                return {"allOf": [base_schema, own]} if own.get("properties") or own.get("oneOf") or own.get("allOf") else base_schema
+            return own
+        return self._finish(obj, required, choices)
+
+    def _occurs(self, node: XsdNode) -> tuple[int, int | None]:
+        lo = node.attrs.get("minOccurs", "1")
+        hi = node.attrs.get("maxOccurs", "1")
+        return (int(lo) if lo.isdigit() else 1), (None if hi == "unbounded" else int(hi) if hi.isdigit() else 1)
+
+    def _particle(self, node: XsdNode, obj: dict, required: list, choices: list, optional: bool) -> None:
+        lo, hi = self._occurs(node)
+        optional = optional or lo == 0
+
+        if node.kind == "group":
+            ref = node.attrs.get("ref")
+            group = self.model.groups.get(f"group:{ref}") if ref else node
+            if group is None:
+                self.unresolved.append(f"group {local_name(ref)}")
+                return
+            for child in group.children:
+                if child.kind in ("sequence", "all", "choice"):
+                    self._particle(child, obj, required, choices, optional)
+            return
+
+        if node.kind == "choice":
+            alternatives = []
+            for child in node.children:
+                names_before = set(obj["properties"])
+                self._particle(child, obj, [], choices, optional=True)
+                added = [n for n in obj["properties"] if n not in names_before]
+                if added and child.kind == "element" and self._occurs(child)[0] > 0:
+                    alternatives.append({"required": added})
+            if alternatives and not optional and len(alternatives) > 1:
+                choices.append({"oneOf": alternatives})
+            return
+
+        if node.kind in ("sequence", "all"):
+            for child in node.children:
+                self._particle(child, obj, required, choices, optional)
+            return
+
+        if node.kind == "any":
+            obj["additionalProperties"] = True
+            return
+
+        if node.kind != "element":
+            return
+
+        ref = node.attrs.get("ref")
+        if ref:
+            name = local_name(ref)
+            schema = self.element_ref(ref)
+        else:
+            name = node.attrs.get("name", "")
+            type_qn = node.attrs.get("type")
+            if type_qn:
+                schema = self.type_ref(type_qn)
+            else:
+                schema = self._inline_type(node) or {}
+            if node.attrs.get("nillable") == "true":
+                schema = {**schema, "nullable": True} if "$ref" not in schema else {"allOf": [schema], "nullable": True}
+        if node.doc and "$ref" not in schema:
+            schema = {**schema, "description": node.doc}
+
+        if hi is None or hi > 1:
+            schema = {"type": "array", "items": schema}
+            if lo > 1:
+                schema["minItems"] = lo
+            if hi is not None:
+                schema["maxItems"] = hi
+
+        obj["properties"][name] = schema
+        if not optional and lo > 0:
+            required.append(name)
+
+    def _attribute(self, node: XsdNode, obj: dict, required: list) -> None:
+        if node.kind == "attributeGroup":
+            ref = node.attrs.get("ref")
+            group = self.model.groups.get(f"attributeGroup:{ref}") if ref else node
+            if group is None:
+                self.unresolved.append(f"attributeGroup {local_name(ref)}")
+                return
+            for child in group.children:
+                if child.kind in ("attribute", "attributeGroup"):
+                    self._attribute(child, obj, required)
+            return
+
+        name = node.attrs.get("name") or local_name(node.attrs.get("ref"))
+        if not name:
+            return
+        type_qn = node.attrs.get("type")
+        schema = self.type_ref(type_qn) if type_qn else (self._inline_type(node) or {"type": "string"})
+        if node.doc and "$ref" not in schema:
+            schema = {**schema, "description": node.doc}
+        obj["properties"][name] = schema
+        if node.attrs.get("use") == "required":
+            required.append(name)